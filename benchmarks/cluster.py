@@ -0,0 +1,160 @@
+"""
+Throughput and latency benchmarks of a whole cluster under the simulator.
+
+Every run is a konsensus.simulation.Simulation with a fixed seed, so the simulated results (commits per simulated
+second, latencies) are reproducible and any change in them means the protocol behaves differently. Wall-clock
+throughput measures the cost of the hot paths, like Node.receive and Replica.commit, on this machine.
+
+    python -m benchmarks.cluster --sizes 3 5 --drop-probs 0 0.05 --output results.json
+    python -m benchmarks.cluster --baseline results.json
+
+With --profile, the time spent in each role handler and timer callback is written as collapsed stacks, one file per
+run, which flamegraph.pl or speedscope turn into flame graphs. Profiling slows the runs down, so their wall-clock
+results are not comparable with unprofiled ones.
+
+With --baseline, the runs are compared with an earlier results file and the exit status is non-zero if wall-clock
+throughput dropped by more than --tolerance in any of them.
+"""
+from typing import Dict, List, Optional
+import argparse
+import itertools
+import json
+import sys
+import tracemalloc
+
+from konsensus.infra.profiler import Profiler
+from konsensus.simulation import Simulation
+
+PARAMETERS = ("seed", "size", "drop_prob", "prop_delay", "requests", "clients")
+# results that only depend on the parameters, and must not change unless the protocol does
+SIMULATED = ("commits", "commits_per_sim_second", "latency_p50", "latency_p99")
+
+
+# pylint: disable-next=too-many-arguments
+def run(
+    seed: int,
+    size: int,
+    drop_prob: float,
+    prop_delay: float,
+    requests: int,
+    clients: int,
+    memory: bool = False,
+    profile: Optional[str] = None,
+) -> Dict:
+    """
+    Runs one benchmark, returning its parameters and results. With profile, the collapsed stacks of the run are written
+    to that path
+    """
+    if memory:
+        tracemalloc.start()
+    profiler = Profiler() if profile else None
+    simulation = Simulation(
+        seed, size, drop_prob=drop_prob, prop_delay=prop_delay, profiler=profiler
+    )
+    if memory:
+        before = tracemalloc.get_traced_memory()[0]
+    simulation.run_requests(requests, clients=clients)
+    result = {
+        "seed": seed,
+        "size": size,
+        "drop_prob": drop_prob,
+        "prop_delay": prop_delay,
+        "requests": requests,
+        "clients": clients,
+    }
+    result.update(simulation.results())
+    if memory:
+        growth = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+        commits = result["commits"]
+        result["bytes_per_10k_commits"] = (
+            growth * 10000 / commits if commits else None
+        )
+    if profiler:
+        profiler.dump(profile)
+    return result
+
+
+def compare(results: List[Dict], baseline: List[Dict], tolerance: float) -> bool:
+    """
+    Reports differences from a baseline, returning False if wall-clock throughput regressed beyond tolerance
+    """
+    previous = {tuple(r[p] for p in PARAMETERS): r for r in baseline}
+    passed = True
+    for result in results:
+        key = tuple(result[p] for p in PARAMETERS)
+        before = previous.get(key)
+        if before is None:
+            continue
+        changed = [f for f in SIMULATED if result[f] != before[f]]
+        if changed:
+            print(f"{key}: simulated results changed: {changed}", file=sys.stderr)
+        if not before["commits_per_wall_second"]:
+            print(
+                f"{key}: wall throughput ratio n/a, the baseline has no commits",
+                file=sys.stderr,
+            )
+            continue
+        ratio = result["commits_per_wall_second"] / before["commits_per_wall_second"]
+        if ratio < 1 - tolerance:
+            print(f"{key}: wall throughput down to {ratio:.0%}", file=sys.stderr)
+            passed = False
+    return passed
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Runs the benchmarks given on the command line, returning the exit status
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--seeds", type=int, nargs="+", default=[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[3, 5, 7])
+    parser.add_argument("--drop-probs", type=float, nargs="+", default=[0.0, 0.05])
+    parser.add_argument("--prop-delays", type=float, nargs="+", default=[0.03])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument(
+        "--memory", action="store_true", help="measure memory growth (slower)"
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="PREFIX",
+        help="write collapsed stacks of each run to PREFIX-<seed>-<size>-<drop>-<delay>.folded",
+    )
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare with this results file")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    results = [
+        run(
+            seed,
+            size,
+            drop_prob,
+            prop_delay,
+            args.requests,
+            args.clients,
+            args.memory,
+            args.profile
+            and f"{args.profile}-{seed}-{size}-{drop_prob}-{prop_delay}.folded",
+        )
+        for seed, size, drop_prob, prop_delay in itertools.product(
+            args.seeds, args.sizes, args.drop_probs, args.prop_delays
+        )
+    ]
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            output.write(text + "\n")
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline:
+            if not compare(results, json.load(baseline), args.tolerance):
+                return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
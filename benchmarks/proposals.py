@@ -0,0 +1,89 @@
+"""
+Memory held in proposals by a whole cluster under the simulator.
+
+Runs a Simulation and then counts the Proposal objects still alive, and the bytes they take, per slot of the log, the
+slots being those decided on the replica that holds the most:
+
+    python -m benchmarks.proposals --requests 100000
+
+Every node keeps each decided proposal in its replica's decisions and its acceptor's accepted proposals, and the
+leader's node in the leader's proposals too, so the copies per slot show how many of those references point to
+separate objects.
+"""
+from typing import Dict, List, Optional
+import argparse
+import gc
+import json
+import sys
+
+from konsensus.entities.data_types import Proposal
+from konsensus.models.roles.replica import Replica
+from konsensus.simulation import Simulation
+
+
+# pylint: disable-next=too-many-arguments
+def run(
+    seed: int,
+    size: int,
+    drop_prob: float,
+    requests: int,
+    clients: int,
+    time_limit: float,
+) -> Dict:
+    """
+    Runs one simulation, returning its parameters and the proposals alive at its end
+    """
+    simulation = Simulation(seed, size, drop_prob=drop_prob)
+    completed = simulation.run_requests(
+        requests, clients=clients, time_limit=time_limit
+    )
+    gc.collect()
+    proposals = [obj for obj in gc.get_objects() if isinstance(obj, Proposal)]
+    slots = max(
+        len(role.decisions)
+        for node in simulation.nodes
+        for role in node.roles
+        if isinstance(role, Replica)
+    )
+    nbytes = sum(sys.getsizeof(proposal) for proposal in proposals)
+    return {
+        "seed": seed,
+        "size": size,
+        "drop_prob": drop_prob,
+        "requests": requests,
+        "clients": clients,
+        "completed": completed,
+        "slots": slots,
+        "proposals": len(proposals),
+        "proposal_bytes": nbytes,
+        "proposals_per_slot": len(proposals) / slots if slots else None,
+        "proposal_bytes_per_slot": nbytes / slots if slots else None,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Runs the benchmark given on the command line, returning the exit status
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--size", type=int, default=3)
+    parser.add_argument("--drop-prob", type=float, default=0.05)
+    parser.add_argument("--requests", type=int, default=10000)
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--time-limit", type=float, default=36000.0)
+    args = parser.parse_args(argv)
+    result = run(
+        args.seed,
+        args.size,
+        args.drop_prob,
+        args.requests,
+        args.clients,
+        args.time_limit,
+    )
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
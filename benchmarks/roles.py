@@ -0,0 +1,73 @@
+"""
+Cost of creating nodes, and the commanders and scouts a leader creates as it drives slots.
+
+    python -m benchmarks.roles --count 100000
+
+Reports how many of each are created per second of wall-clock time, and how many loggers the logging module has
+registered along the way; registered loggers are never freed, so they should not grow with the number of nodes or
+roles.
+"""
+from typing import Callable, Dict, List, Optional
+import argparse
+import json
+import logging
+import sys
+import time
+
+from konsensus.entities.data_types import Ballot, Proposal
+from konsensus.models.roles.commander import Commander
+from konsensus.models.roles.scout import Scout
+from konsensus.network import Network
+
+PEERS = ["N0", "N1", "N2"]
+PROPOSAL = Proposal("client", 100000, "input")
+
+
+def rate(count: int, create: Callable[[int], None]) -> float:
+    """
+    Calls create with 0 to count - 1, returning the calls per second
+    """
+    started = time.perf_counter()
+    for i in range(count):
+        create(i)
+    return count / (time.perf_counter() - started)
+
+
+def run(seed: int, count: int) -> Dict:
+    """
+    Creates count nodes, then count commanders and count scouts on one node, returning the rates and loggers
+    """
+    network = Network(seed)
+    loggers = len(logging.Logger.manager.loggerDict)
+    nodes_per_second = rate(count, lambda i: network.new_node(f"B{i}"))
+    node = network.new_node(PEERS[0])
+    ballot_num = Ballot(0, 0)
+    commanders_per_second = rate(
+        count,
+        lambda slot: Commander(node, ballot_num, slot, PROPOSAL, PEERS).stop(),
+    )
+    scouts_per_second = rate(count, lambda _: Scout(node, ballot_num, PEERS).stop())
+    return {
+        "seed": seed,
+        "count": count,
+        "nodes_per_second": nodes_per_second,
+        "commanders_per_second": commanders_per_second,
+        "scouts_per_second": scouts_per_second,
+        "loggers_registered": len(logging.Logger.manager.loggerDict) - loggers,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Runs the benchmark given on the command line, returning the exit status
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--count", type=int, default=100000)
+    args = parser.parse_args(argv)
+    print(json.dumps(run(args.seed, args.count), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
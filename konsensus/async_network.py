@@ -0,0 +1,115 @@
+"""
+Network running the protocol on an asyncio event loop
+"""
+from typing import Callable, Dict, Optional, Union
+from functools import partial
+import asyncio
+import itertools
+
+from .network import Network
+from .models.timer import Timer
+
+
+class AsyncNetwork(Network):
+    """
+    A Network whose timers are scheduled on an asyncio event loop with loop.call_at instead of being kept in a heap,
+    so that the protocol shares a thread with the application's coroutines and needs no thread of its own.
+
+    Time is the loop's clock, so timeouts and simulated message delays pass in real time; links still drop and delay
+    messages as configured. start binds the network to the running loop, and must be called from a coroutine on it
+    before any node sends a message or sets a timer. Cancelling a timer cancels its handle on the loop, and stop
+    cancels every timer that has not fired yet.
+
+    Threads such as a Replica's apply pipeline post callbacks with loop.call_soon_threadsafe, so expect_post is not
+    needed.
+    """
+
+    def __init__(self, seed, *args, **kwargs) -> None:
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        super().__init__(seed, *args, **kwargs)
+        # handles of the timers that have not fired or been cancelled, by key
+        self.pending: Dict[int, asyncio.TimerHandle] = {}
+        self.keys = itertools.count()
+        self.metrics.gauge("timer_heap_size", lambda: len(self.pending))
+        self.metrics.gauge("timer_tombstone_ratio", lambda: 0.0)
+
+    @property
+    def now(self) -> float:
+        return self.loop.time() if self.loop else 0.0
+
+    @now.setter
+    def now(self, value: float):
+        # the clock is the loop's; Network only sets it to start its simulated time
+        pass
+
+    def start(self):
+        """
+        Binds the network to the running event loop
+        """
+        if self.loop is None:
+            self.loop = asyncio.get_running_loop()
+        assert self.loop is asyncio.get_running_loop(), "already running on another loop"
+
+    def run(self):
+        """
+        Fails: an AsyncNetwork has no loop of its own to run, as its timers run on the event loop it is started on
+        """
+        raise RuntimeError(
+            "AsyncNetwork runs on an asyncio event loop: call start() from a coroutine on it instead of run()"
+        )
+
+    # pylint: disable=missing-function-docstring
+    def stop(self):
+        for handle in self.pending.values():
+            handle.cancel()
+        self.pending.clear()
+
+    # pylint: disable=missing-function-docstring
+    def post(self, callback: Callable):
+        self.loop.call_soon_threadsafe(self.fire, callback)
+
+    # pylint: disable=missing-function-docstring
+    def set_timer(
+        self, address, seconds: Union[int, float], callback: Callable
+    ) -> Timer:
+        timer = Timer(self.now + seconds, address, callback, seq=self.next_seq)
+        self.next_seq += 1
+        self.schedule(timer)
+        return timer
+
+    # pylint: disable=missing-function-docstring
+    def deliver(self, address, seconds: Union[int, float], sender, message):
+        node = self.nodes[address]
+        self.schedule(
+            Timer(self.now + seconds, address, partial(node.receive, sender, message))
+        )
+
+    def schedule(self, timer: Timer):
+        """
+        Schedules a timer on the loop
+        """
+        key = next(self.keys)
+        self.pending[key] = self.loop.call_at(
+            timer.expires, self.fire_timer, key, timer
+        )
+        timer.on_cancel = partial(self.cancel_timer, key)
+
+    def cancel_timer(self, key: int):
+        """
+        Cancels the handle of a timer that has not fired yet
+        """
+        handle = self.pending.pop(key, None)
+        if handle is not None:
+            handle.cancel()
+
+    def fire_timer(self, key: int, timer: Timer):
+        """
+        Runs a timer that came due, unless its node has gone
+        """
+        del self.pending[key]
+        timer.on_cancel = None
+        if timer.address and timer.address not in self.nodes:
+            return
+        if self.trace is not None:
+            self.trace.fired(self, timer)
+        self.fire(timer.callback)
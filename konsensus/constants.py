@@ -9,6 +9,29 @@ CATCHUP_INTERVAL = 0.6
 ACCEPT_RETRANSMIT = 1.0
 PREPARE_RETRANSMIT = 1.0
 INVOKE_RETRANSMIT = 0.5
+INVOKE_RETRANSMIT_MAX = 2.0  # requests are retried end to end, so their backoff is capped well below RTO_MAX
 LEADER_TIMEOUT = 1.0
-NULL_BALLOT = Ballot(-1, -1)  # sorts before real ballots
+DECISION_FLUSH_INTERVAL = 0.005  # how long a leader collects decisions into ranges before announcing them
+ALPHA = 10  # slots between the decision of a reconfiguration and the first slot it applies to
+MAX_OUTSTANDING_SLOTS = 256  # slots a replica proposes or learns of ahead of the slot it commits, before it queues
+MAX_PENDING_INVOKES = 1024  # invokes a replica queues for a slot, before it rejects them as overloaded
+# outputs of the latest requests of each caller kept to answer retries; a caller's requests all go to its own replica,
+# so this covers as many as the replica lets it have in flight
+SESSION_OUTPUTS = MAX_OUTSTANDING_SLOTS + MAX_PENDING_INVOKES
+SESSION_EXPIRY = 100000  # slots after which the session of a caller that made no requests is dropped
+MAX_COMMANDERS = 256  # commanders a leader runs at once, before it queues proposals
+OVERLOAD_RETRY_AFTER = 1.0  # how long a rejected requester waits before retrying
+# proposals a node remembers to share between its roles; copies of a proposal arrive while its slot is being decided,
+# so this only needs to cover the slots in flight
+INTERN_WINDOW = 4 * (MAX_OUTSTANDING_SLOTS + MAX_PENDING_INVOKES)
+NULL_BALLOT = Ballot(-1, 0)  # sorts before real ballots
 NOOP_PROPOSAL = Proposal(None, None, None)  # No-op to fill empty slots
+
+# retransmission timeout estimation, after RFC 6298. The *_RETRANSMIT values above are only used until a peer has
+# been measured
+RTT_ALPHA = 1 / 8  # gain of the smoothed round trip time
+RTT_BETA = 1 / 4  # gain of the round trip time variance
+RTO_K = 4  # weight of the variance in the retransmission timeout
+RTO_MIN = 0.05
+RTO_MAX = 10.0
+RETRANSMIT_JITTER = 0.1  # fraction by which a retransmission timeout is randomly shortened
@@ -3,6 +3,60 @@ Data Types in the system
 """
 from collections import namedtuple
 
+# leaders a ballot can tell apart, see Ballot
+BALLOT_LEADERS = 1 << 16
+
 
 Proposal = namedtuple("Proposal", ["caller", "client_id", "input"])
-Ballot = namedtuple("Ballot", ["n", "leader"])
+Reconfigure = namedtuple("Reconfigure", ["peers"])  # the input of a proposal that changes the peers of a cluster
+
+
+class Ballot(int):
+    """
+    A ballot number n of a leader, packed into one integer as n * BALLOT_LEADERS + leader, so that ballots compare by
+    n and then leader as plain integers.
+
+    The leader is the index of its node's address in the directory of the cluster's membership rather than the address
+    itself, which keeps ballots small on the wire (see Membership).
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, n: int, leader: int):
+        assert 0 <= leader < BALLOT_LEADERS, f"leader index {leader} out of range"
+        return super().__new__(cls, n * BALLOT_LEADERS + leader)
+
+    @classmethod
+    def unpack(cls, value: int) -> "Ballot":
+        """
+        Returns the ballot packed into an integer
+        """
+        return int.__new__(cls, value)
+
+    @property
+    def n(self) -> int:  # pylint: disable=invalid-name
+        """
+        The ballot number
+        """
+        return self // BALLOT_LEADERS
+
+    @property
+    def leader(self) -> int:
+        """
+        The index of the leader
+        """
+        return self % BALLOT_LEADERS
+
+    def __repr__(self) -> str:
+        return f"Ballot(n={self.n}, leader={self.leader})"
+
+    __str__ = __repr__
+
+    def __reduce__(self):
+        return Ballot, (self.n, self.leader)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
@@ -8,13 +8,22 @@ Accept = namedtuple("Accept", ["slot", "ballot_num", "proposal"])
 Decision = namedtuple("Decision", ["slot", "proposal"])
 Invoked = namedtuple("Invoked", ["client_id", "output"])
 Invoke = namedtuple("Invoke", ["caller", "client_id", "input_value"])
+Overloaded = namedtuple("Overloaded", ["client_id", "retry_after"])
 Join = namedtuple("Join", [])
 Active = namedtuple("Active", [])
 Prepare = namedtuple("Prepare", ["ballot_num"])
 Promise = namedtuple("Promise", ["ballot_num", "accepted_proposals"])
 Propose = namedtuple("Propose", ["slot", "proposal"])
-Welcome = namedtuple("Welcome", ["state", "slot", "decisions"])
+Welcome = namedtuple("Welcome", ["state", "slot", "decisions", "configs", "directory"])
 Decided = namedtuple("Decided", ["slot"])
 Preempted = namedtuple("Preempted", ["slot", "preempted_by"])
 Adopted = namedtuple("Adopted", ["ballot_num", "accepted_proposals"])
 Accepting = namedtuple("Accepting", ["leader"])
+DecisionRange = namedtuple("DecisionRange", ["first_slot", "last_slot", "ballot_num"])
+DecisionRequest = namedtuple("DecisionRequest", ["slots"])
+PreVote = namedtuple("PreVote", ["ballot_num"])
+PreVoteReply = namedtuple("PreVoteReply", ["ballot_num", "granted", "leader"])
+PreVoted = namedtuple("PreVoted", ["granted", "leader"])
+Learn = namedtuple("Learn", [])
+Subscribe = namedtuple("Subscribe", [])
+Expired = namedtuple("Expired", ["client_id"])
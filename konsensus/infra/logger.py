@@ -6,18 +6,28 @@ import logging
 
 class SimTimeLogger(logging.LoggerAdapter):
     """
-    SimTimeLogger is a LoggerAdapter
+    SimTimeLogger is a LoggerAdapter that prefixes messages with the network's time and the address of the node they
+    come from.
+
+    Loggers registered with the logging module are never freed, so they are named after classes rather than nodes: a
+    node logs to konsensus.node and its roles to children of it named after their classes, such as
+    konsensus.node.Replica. The node and role go on every record as the contextual fields node and role instead, for
+    formatters and filters to use.
     """
 
+    # pylint: disable-next=missing-function-docstring
+    def __init__(self, logger: logging.Logger, extra) -> None:
+        super().__init__(logger, extra)
+        self.fields = {"node": extra.get("node"), "role": extra.get("role")}
+
     # pylint: disable-next=missing-function-docstring
     def process(self, msg, kwargs):
-        return f"T={self.extra['network'].now} {msg}", kwargs
+        kwargs["extra"] = self.fields
+        return f"T={self.extra['network'].now} {self.fields['node']} {msg}", kwargs
 
     # pylint: disable-next=invalid-name
     def getChild(self, name):
         """
         Get Child logger
         """
-        return self.__class__(
-            self.logger.getChild(name), {"network": self.extra["network"]}
-        )
+        return self.__class__(self.logger.getChild(name), {**self.extra, "role": name})
@@ -0,0 +1,198 @@
+"""
+Metrics registry
+"""
+from bisect import bisect_left
+from typing import Callable, Dict, List, Sequence, Tuple
+
+# latency buckets in seconds, from a fast local commit to a request that needed several retransmissions
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def series(name: str, labels: Labels) -> str:
+    """
+    Returns the name of a series in the Prometheus exposition format, e.g. messages_sent{type="Accept"}
+    """
+    if not labels:
+        return name
+    pairs = ",".join(f'{key}="{value}"' for key, value in labels)
+    return f"{name}{{{pairs}}}"
+
+
+class Histogram:
+    """
+    Counts of observed values in fixed buckets, along with their sum
+    """
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.buckets = buckets
+        self.counts: List[int] = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        """
+        Records a value in the first bucket whose upper bound is not below it
+        """
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """
+        Returns the cumulative count for each upper bound, ending with +Inf
+        """
+        total = 0
+        result = []
+        for bound, count in zip(list(self.buckets) + ["+Inf"], self.counts):
+            total += count
+            result.append((str(bound), total))
+        return result
+
+
+class Metrics:
+    """
+    Registry of the counters, gauges and histograms reported by the network, the nodes and their roles.
+
+    Series are identified by a name and keyword labels. Counters and histograms are updated on the hot path, so they
+    are plain dictionary updates without locking; they are only written from the protocol thread. Gauges that can be
+    read from existing state, like the size of the timer heap, are registered as functions and only evaluated when
+    the metrics are exported.
+
+    The network uses NullMetrics unless it is given a Metrics instance, so that instrumentation costs no more than a
+    method call when it is disabled. Callers on the hottest paths, which send and receive every message, check
+    enabled first, so that they do not even build the labels of a counter that is not recorded.
+    """
+
+    enabled = True
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counters: Dict[Tuple[str, Labels], float] = {}
+        self.gauges: Dict[Tuple[str, Labels], float] = {}
+        self.gauge_fns: Dict[Tuple[str, Labels], Callable[[], float]] = {}
+        self.histograms: Dict[Tuple[str, Labels], Histogram] = {}
+
+    def inc(self, name: str, amount: float = 1, **labels):
+        """
+        Adds amount to a counter
+        """
+        key = (name, tuple(sorted(labels.items())))
+        self.counters[key] = self.counters.get(key, 0) + amount
+
+    def set(self, name: str, value: float, **labels):
+        """
+        Sets a gauge
+        """
+        self.gauges[(name, tuple(sorted(labels.items())))] = value
+
+    def gauge(self, name: str, value_fn: Callable[[], float], **labels):
+        """
+        Registers a gauge whose value is read from value_fn when the metrics are exported
+        """
+        self.gauge_fns[(name, tuple(sorted(labels.items())))] = value_fn
+
+    def remove_gauge(self, name: str, value_fn: Callable[[], float], **labels):
+        """
+        Unregisters a gauge registered with value_fn, so that the registry no longer keeps what value_fn refers to.
+        A gauge registered since with another function is left alone
+        """
+        key = (name, tuple(sorted(labels.items())))
+        if self.gauge_fns.get(key) == value_fn:
+            del self.gauge_fns[key]
+
+    def observe(self, name: str, value: float, **labels):
+        """
+        Records a value in a histogram
+        """
+        key = (name, tuple(sorted(labels.items())))
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram(self.buckets)
+        histogram.observe(value)
+
+    def read_gauges(self) -> Dict[Tuple[str, Labels], float]:
+        """
+        Returns the values of all gauges, including those read from functions
+        """
+        gauges = dict(self.gauges)
+        for key, value_fn in self.gauge_fns.items():
+            gauges[key] = value_fn()
+        return gauges
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """
+        Returns the current values of all series, keyed by series name
+        """
+        return {
+            "counters": {
+                series(name, labels): value
+                for (name, labels), value in sorted(self.counters.items())
+            },
+            "gauges": {
+                series(name, labels): value
+                for (name, labels), value in sorted(self.read_gauges().items())
+            },
+            "histograms": {
+                series(name, labels): {
+                    "buckets": dict(histogram.cumulative()),
+                    "sum": histogram.sum,
+                    "count": histogram.count,
+                }
+                for (name, labels), histogram in sorted(self.histograms.items())
+            },
+        }
+
+    def prometheus(self, prefix: str = "konsensus_") -> str:
+        """
+        Returns all series in the Prometheus text exposition format
+        """
+        lines: List[str] = []
+        for kind, suffix, values in (
+            ("counter", "_total", self.counters),
+            ("gauge", "", self.read_gauges()),
+        ):
+            family = None
+            for (name, labels), value in sorted(values.items()):
+                if name != family:
+                    family = name
+                    lines.append(f"# TYPE {prefix}{name}{suffix} {kind}")
+                lines.append(f"{series(prefix + name + suffix, labels)} {value}")
+
+        family = None
+        for (name, labels), histogram in sorted(self.histograms.items()):
+            name = prefix + name
+            if name != family:
+                family = name
+                lines.append(f"# TYPE {name} histogram")
+            for bound, count in histogram.cumulative():
+                bucket = series(name + "_bucket", labels + (("le", bound),))
+                lines.append(f"{bucket} {count}")
+            lines.append(f"{series(name + '_sum', labels)} {histogram.sum}")
+            lines.append(f"{series(name + '_count', labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+class NullMetrics(Metrics):
+    """
+    Metrics that record nothing, used when metrics are disabled
+    """
+
+    enabled = False
+
+    # pylint: disable-next=missing-function-docstring
+    def inc(self, name: str, amount: float = 1, **labels):
+        pass
+
+    # pylint: disable-next=missing-function-docstring
+    def set(self, name: str, value: float, **labels):
+        pass
+
+    # pylint: disable-next=missing-function-docstring
+    def gauge(self, name: str, value_fn: Callable[[], float], **labels):
+        pass
+
+    # pylint: disable-next=missing-function-docstring
+    def observe(self, name: str, value: float, **labels):
+        pass
@@ -0,0 +1,90 @@
+"""
+Profiler attributes wall-clock time to protocol steps
+"""
+from functools import partial
+from typing import Callable, Dict, List, Optional, Tuple
+import time
+
+Stack = Tuple[str, ...]
+
+
+def describe(callback: Callable) -> str:
+    """
+    Returns the frame name of a timer callback: the message type for deliveries, the callback for role timers
+    """
+    if isinstance(callback, partial):
+        func = callback.func
+        if getattr(func, "__name__", None) == "receive" and len(callback.args) == 2:
+            return f"receive:{type(callback.args[1]).__name__}"
+        if getattr(func, "__name__", None) == "fire_timer" and callback.args:
+            return f"timer:{describe(callback.args[0])}"
+        callback = func
+    return getattr(callback, "__qualname__", type(callback).__name__)
+
+
+class Profiler:
+    """
+    Records the wall-clock time spent in each timer callback run by the network, and in each do_* handler that
+    Node.receive calls, by role class.
+
+    Frames nest: a message delivery is a "receive:<type>" frame, with a "<Role>.do_<type>" frame for every role that
+    handles it, and a role timer is a "timer:<callback>" frame. Time is recorded per stack of frames, excluding the time
+    of nested frames, both in total and per simulated second, which is the layout of collapsed stacks as read by
+    flamegraph tools.
+
+    Profiling is opt-in: pass a Profiler to Network, which otherwise keeps its profiler as None and skips all timing.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter) -> None:
+        self.clock = clock
+        self.totals: Dict[Stack, float] = {}
+        self.per_second: Dict[int, Dict[Stack, float]] = {}
+        # frames being timed: name, simulated second, start time and time spent in nested frames
+        self.frames: List[List] = []
+
+    def enter(self, frame: str, now: float):
+        """
+        Starts timing a frame nested in the current one, at simulated time now
+        """
+        self.frames.append([frame, int(now), self.clock(), 0.0])
+
+    def exit(self):
+        """
+        Stops timing the current frame and records its own time
+        """
+        stack = tuple(frame[0] for frame in self.frames)
+        _, second, started, nested = self.frames.pop()
+        elapsed = self.clock() - started
+        if self.frames:
+            self.frames[-1][3] += elapsed
+        own = elapsed - nested
+        self.totals[stack] = self.totals.get(stack, 0.0) + own
+        per_second = self.per_second.setdefault(second, {})
+        per_second[stack] = per_second.get(stack, 0.0) + own
+
+    def collapsed(self, second: Optional[int] = None) -> str:
+        """
+        Returns the recorded time in microseconds as collapsed stacks, one "frame;frame;frame value" line per stack,
+        either in total or for one simulated second
+        """
+        samples = self.totals if second is None else self.per_second.get(second, {})
+        return "".join(
+            f"{';'.join(stack)} {round(seconds * 1e6)}\n"
+            for stack, seconds in sorted(samples.items())
+        )
+
+    def dump(self, path: str, second: Optional[int] = None):
+        """
+        Writes the collapsed stacks to a file, e.g. for flamegraph.pl or speedscope
+        """
+        with open(path, "w", encoding="utf-8") as output:
+            output.write(self.collapsed(second))
+
+    def handlers(self) -> Dict[str, float]:
+        """
+        Returns the own time of each frame summed over all stacks it appears in, largest first
+        """
+        totals: Dict[str, float] = {}
+        for stack, seconds in self.totals.items():
+            totals[stack[-1]] = totals.get(stack[-1], 0.0) + seconds
+        return dict(sorted(totals.items(), key=lambda item: -item[1]))
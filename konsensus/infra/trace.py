@@ -0,0 +1,212 @@
+"""
+Trace recording of simulated runs
+"""
+from __future__ import annotations
+from typing import BinaryIO, Dict, Iterator, List, NamedTuple, Optional, TYPE_CHECKING
+import io
+import pickle
+import struct
+
+# pylint: disable-next=relative-beyond-top-level
+from ..entities import messages_types
+
+if TYPE_CHECKING:
+    from ..models.timer import Timer
+    from ..network import Network
+
+# record kinds
+STRING, DELIVERY, TIMER, CHECKPOINT = range(4)
+
+HEADER = struct.Struct("<Bd")  # kind, simulated time
+STRING_ID = struct.Struct("<H")
+DELIVERY_IDS = struct.Struct("<HHHI")  # sender, destination, message type, length of the pickled fields
+TIMER_SEQ = struct.Struct("<I")
+LENGTH = struct.Struct("<I")
+
+
+class Delivery(NamedTuple):
+    """
+    A message delivered to a node
+    """
+
+    time: float
+    sender: str
+    destination: str
+    message: tuple
+
+
+class TimerFired(NamedTuple):
+    """
+    A timer that fired, identified by the order in which the network created it
+    """
+
+    time: float
+    seq: int
+
+
+class Checkpoint(NamedTuple):
+    """
+    The pickled state of the network's nodes and timers, taken before the events that follow it
+    """
+
+    time: float
+    state: bytes
+
+
+class NetworkPickler(pickle.Pickler):
+    """
+    Pickles a network's state, referring to the network itself by name so that it can be swapped on load
+    """
+
+    def __init__(self, file: BinaryIO, network: "Network") -> None:
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.network = network
+
+    # pylint: disable-next=missing-function-docstring
+    def persistent_id(self, obj):
+        return "network" if obj is self.network else None
+
+
+class NetworkUnpickler(pickle.Unpickler):
+    """
+    Loads a state pickled by NetworkPickler into another network
+    """
+
+    def __init__(self, file: BinaryIO, network: "Network") -> None:
+        super().__init__(file)
+        self.network = network
+
+    # pylint: disable-next=missing-function-docstring
+    def persistent_load(self, pid):
+        assert pid == "network", f"unknown persistent id {pid}"
+        return self.network
+
+
+def dump_state(network: "Network", firing: Optional["Timer"] = None) -> bytes:
+    """
+    Pickles the nodes of a network along with its live timers that do not deliver messages, keyed by sequence number,
+    including the timer being fired, which has already left the heap
+    """
+    output = io.BytesIO()
+    timers = {
+        timer.seq: timer
+        for timer in network.timers + ([firing] if firing else [])
+        if not timer.cancelled and timer.seq is not None
+    }
+    NetworkPickler(output, network).dump(
+        {"nodes": network.nodes, "timers": timers, "next_seq": network.next_seq}
+    )
+    return output.getvalue()
+
+
+def load_state(state: bytes, network: "Network") -> Dict:
+    """
+    Unpickles a state dumped by dump_state, with references to the recorded network pointing at network
+    """
+    return NetworkUnpickler(io.BytesIO(state), network).load()
+
+
+class TraceRecorder:
+    """
+    Writes every message delivery and timer firing of a Network to a binary file, in the order they happen.
+
+    Deliveries record the sender, the destination and the message; addresses and message types are written once and
+    referred to by number after that. Timers are recorded by their sequence number, the order in which the network
+    created them, which is the same in a replay because roles create timers in response to the same events. With a
+    checkpoint_interval, the state of every node is pickled into the trace every checkpoint_interval simulated
+    seconds, so that ReplayNetwork.seek can start from the latest checkpoint instead of the beginning.
+
+    Checkpoints require the roles' state to be picklable, so roles keep bound methods rather than closures in their
+    timers and callbacks. Callbacks posted from other threads, such as a Replica's apply pipeline, are not recorded.
+    """
+
+    def __init__(
+        self, output: BinaryIO, checkpoint_interval: Optional[float] = None
+    ) -> None:
+        self.output = output
+        self.checkpoint_interval = checkpoint_interval
+        self.next_checkpoint: Optional[float] = None
+        self.strings: Dict[str, int] = {}
+
+    def string(self, value: str) -> int:
+        """
+        Returns the number of a string, writing it to the trace the first time
+        """
+        string_id = self.strings.get(value)
+        if string_id is None:
+            string_id = self.strings[value] = len(self.strings)
+            encoded = value.encode()
+            self.output.write(HEADER.pack(STRING, 0.0))
+            self.output.write(STRING_ID.pack(string_id) + LENGTH.pack(len(encoded)))
+            self.output.write(encoded)
+        return string_id
+
+    def fired(self, network: "Network", timer: "Timer"):
+        """
+        Records a timer that the network is about to run, after a checkpoint if one is due
+        """
+        if self.checkpoint_interval is not None:
+            if self.next_checkpoint is None or network.now >= self.next_checkpoint:
+                self.checkpoint(network, timer)
+                self.next_checkpoint = network.now + self.checkpoint_interval
+        if timer.seq is not None:
+            self.output.write(HEADER.pack(TIMER, network.now))
+            self.output.write(TIMER_SEQ.pack(timer.seq))
+            return
+        sender, message = timer.callback.args
+        fields = pickle.dumps(tuple(message), protocol=pickle.HIGHEST_PROTOCOL)
+        ids = DELIVERY_IDS.pack(
+            self.string(sender),
+            self.string(timer.address),
+            self.string(type(message).__name__),
+            len(fields),
+        )
+        self.output.write(HEADER.pack(DELIVERY, network.now) + ids)
+        self.output.write(fields)
+
+    def checkpoint(self, network: "Network", firing: Optional["Timer"] = None):
+        """
+        Writes the state of the network's nodes and timers
+        """
+        state = dump_state(network, firing)
+        self.output.write(HEADER.pack(CHECKPOINT, network.now))
+        self.output.write(LENGTH.pack(len(state)))
+        self.output.write(state)
+
+
+def iter_trace(source: BinaryIO) -> Iterator:
+    """
+    Yields the events of a trace written by TraceRecorder
+    """
+    strings: List[str] = []
+    while True:
+        header = source.read(HEADER.size)
+        if not header:
+            return
+        kind, time = HEADER.unpack(header)
+        if kind == STRING:
+            _, length = struct.unpack("<HI", source.read(STRING_ID.size + LENGTH.size))
+            strings.append(source.read(length).decode())
+        elif kind == DELIVERY:
+            sender, dest, kind_id, length = DELIVERY_IDS.unpack(
+                source.read(DELIVERY_IDS.size)
+            )
+            message_type = getattr(messages_types, strings[kind_id])
+            message = message_type(*pickle.loads(source.read(length)))
+            yield Delivery(time, strings[sender], strings[dest], message)
+        elif kind == TIMER:
+            (seq,) = TIMER_SEQ.unpack(source.read(TIMER_SEQ.size))
+            yield TimerFired(time, seq)
+        elif kind == CHECKPOINT:
+            (length,) = LENGTH.unpack(source.read(LENGTH.size))
+            yield Checkpoint(time, source.read(length))
+        else:
+            raise ValueError(f"unknown trace record kind {kind}")
+
+
+def read_trace(path: str) -> List:
+    """
+    Returns the events of a trace file
+    """
+    with open(path, "rb") as source:
+        return list(iter_trace(source))
@@ -0,0 +1,69 @@
+"""
+Link models describe how the simulated network delivers messages between two nodes
+"""
+from random import Random
+from typing import Callable, NamedTuple, Optional
+import pickle
+
+
+class UniformLatency:
+    """
+    Latency spread uniformly by up to jitter around delay, the network's original model
+    """
+
+    def __init__(self, delay: float, jitter: float) -> None:
+        self.delay = delay
+        self.jitter = jitter
+
+    def __call__(self, rnd: Random) -> float:
+        return self.delay + rnd.uniform(-self.jitter, self.jitter)
+
+
+class ExponentialLatency:
+    """
+    Latency of at least minimum, with an exponentially distributed extra delay averaging mean_extra: mostly fast, with
+    occasional stragglers
+    """
+
+    def __init__(self, minimum: float, mean_extra: float) -> None:
+        self.minimum = minimum
+        self.mean_extra = mean_extra
+
+    def __call__(self, rnd: Random) -> float:
+        return self.minimum + rnd.expovariate(1.0 / self.mean_extra)
+
+
+class LogNormalLatency:
+    """
+    Log-normally distributed latency with the given median, a common fit for round trips across a WAN; sigma sets the
+    length of the tail
+    """
+
+    def __init__(self, median: float, sigma: float) -> None:
+        self.median = median
+        self.sigma = sigma
+
+    def __call__(self, rnd: Random) -> float:
+        return self.median * rnd.lognormvariate(0.0, self.sigma)
+
+
+def pickled_size(message: tuple) -> int:
+    """
+    Estimates the size of a message on the wire as the length of its pickle
+    """
+    return len(pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+class Link(NamedTuple):
+    """
+    Delivery parameters of a one-way link: the probability that a message is lost, a function drawing the latency of a
+    message from the network's random generator, and the bandwidth in bytes per second, if limited
+    """
+
+    drop_prob: float
+    latency: Callable[[Random], float]
+    bandwidth: Optional[float] = None
+
+
+# a link that loses every message, used for partitions
+CUT = Link(drop_prob=1.0, latency=UniformLatency(0.0, 0.0))
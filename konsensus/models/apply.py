@@ -0,0 +1,130 @@
+"""
+Apply pipeline runs the state machine off the protocol thread
+"""
+from __future__ import annotations
+from typing import Callable, List, Tuple, TYPE_CHECKING
+from functools import partial
+from queue import Queue
+import threading
+
+# pylint: disable-next=relative-beyond-top-level
+from ..entities.data_types import Proposal
+
+if TYPE_CHECKING:
+    from .node import Node
+
+
+class ApplyPipeline:
+    """
+    Executes decided proposals on a dedicated worker thread, so that a slow state machine never holds up the protocol.
+
+    The Replica submits proposals in slot order and the worker executes them in that order, handing every result back
+    to the protocol thread through Network.post, where on_applied(slot, proposal, state, output) is called. Proposals
+    that are waiting in the queue when the worker picks up work are executed together if the state machine has an
+    execute_batch method.
+
+    The worker owns the state while proposals are in flight. At most maxsize proposals are in flight at a time: the
+    Replica checks full before submitting and keeps the remaining decisions until results come back, so the protocol
+    thread never blocks on the queue.
+
+    An exception raised by the state machine is re-raised on the protocol thread, as it would be without the pipeline.
+    """
+
+    # pylint: disable-next=too-many-arguments
+    def __init__(
+        self,
+        node: "Node",
+        execute_fn: Callable,
+        state,
+        on_applied: Callable,
+        maxsize: int,
+    ) -> None:
+        assert maxsize > 0, "the apply queue must hold at least one proposal"
+        self.node = node
+        self.execute_fn = execute_fn
+        self.state = state
+        self.on_applied = on_applied
+        self.maxsize = maxsize
+        self.inflight = 0
+        self.queue: Queue = Queue()
+        self.thread = threading.Thread(
+            target=self.work, name=f"{node.address}-apply", daemon=True
+        )
+        self.thread.start()
+
+    def full(self) -> bool:
+        """
+        Whether maxsize proposals are already in flight
+        """
+        return self.inflight >= self.maxsize
+
+    def idle(self) -> bool:
+        """
+        Whether every submitted proposal has been applied
+        """
+        return not self.inflight
+
+    def submit(self, slot: int, proposal: Proposal):
+        """
+        Queues a decided proposal for execution. Only called from the protocol thread
+        """
+        assert not self.full(), "apply queue is full"
+        self.inflight += 1
+        self.node.network.expect_post()
+        self.queue.put((slot, proposal))
+
+    def stop(self):
+        """
+        Stops the worker once it has executed the proposals already queued
+        """
+        self.queue.put(None)
+
+    # pylint: disable-next=missing-function-docstring
+    def applied(self, slot: int, proposal: Proposal, state, output):
+        self.inflight -= 1
+        self.on_applied(slot, proposal, state, output)
+
+    def work(self):
+        """
+        Worker thread loop
+        """
+        while True:
+            batch: List[Tuple[int, Proposal]] = [self.queue.get()]
+            while not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            stopping = batch[-1] is None
+            batch = [item for item in batch if item is not None]
+            try:
+                results = self.execute(batch)
+            # pylint: disable-next=broad-exception-caught
+            except Exception as error:
+                self.node.network.post(partial(self.raise_error, error))
+                return
+            for (slot, proposal), (state, output) in zip(batch, results):
+                self.node.network.post(
+                    partial(self.applied, slot, proposal, state, output)
+                )
+            if stopping:
+                return
+
+    def execute(self, batch: List[Tuple[int, Proposal]]) -> List[Tuple]:
+        """
+        Executes a batch of proposals on the worker thread, returning the state after each of them and its output.
+        Proposals executed with execute_batch all report the state after the whole batch
+        """
+        execute_batch = getattr(self.execute_fn, "execute_batch", None)
+        if execute_batch and len(batch) > 1:
+            self.state, outputs = execute_batch(
+                self.state, [proposal.input for _, proposal in batch]
+            )
+            return [(self.state, output) for output in outputs]
+        results = []
+        for _, proposal in batch:
+            self.state, output = self.execute_fn(self.state, proposal.input)
+            results.append((self.state, output))
+        return results
+
+    @staticmethod
+    # pylint: disable-next=missing-function-docstring
+    def raise_error(error: Exception):
+        raise error
@@ -0,0 +1,73 @@
+"""
+AsyncMember Model
+"""
+from asyncio import CancelledError, Future
+from functools import partial
+from typing import Callable
+
+# pylint: disable-next=import-error
+from .member import Member
+
+# pylint: disable-next=import-error
+from .roles.client import Client
+
+# pylint: disable-next=import-error
+from .roles.requester import ExpiredError, OverloadedError
+
+# pylint: disable-next=relative-beyond-top-level
+from ..entities.data_types import Reconfigure
+
+
+def set_result(future: Future, output):
+    """
+    Resolves a future with the output of a request, unless its caller stopped waiting for it
+    """
+    if not future.done():
+        future.set_result(output)
+
+
+class AsyncMember(Member):
+    """
+    A Member for asyncio applications. It runs the protocol on the application's event loop through an AsyncNetwork
+    rather than on a thread of its own, and invoke is a coroutine.
+
+    Requests are made through one Client role, which resolves a future when the output of a request arrives, so any
+    number of coroutines can await requests at once on the one thread, without the one-request-at-a-time limit of
+    Member.invoke. A request whose invoke is cancelled, e.g. by asyncio.wait_for timing out, is cancelled with it.
+
+    read is a plain method: the application already runs on the protocol thread, so the local replica's state is read
+    directly instead of through Network.post, which would wait for the loop the caller is blocking.
+    """
+
+    # pylint: disable-next=missing-function-docstring
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.client = Client(self.node)
+
+    # pylint: disable-next=missing-function-docstring
+    def start(self):
+        self.network.start()
+        self.startup_role.start()
+
+    # pylint: disable-next=missing-function-docstring
+    async def invoke(self, input_value, fail_fast: bool = False):
+        future = self.network.loop.create_future()
+        request = self.client.request(
+            input_value, partial(set_result, future), fail_fast=fail_fast
+        )
+        try:
+            output = await future
+        except CancelledError:
+            self.client.cancel(request)
+            raise
+        if isinstance(output, (ExpiredError, OverloadedError)):
+            raise output
+        return output
+
+    # pylint: disable-next=missing-function-docstring
+    def read(self, fn: Callable):
+        return self.replica().read(fn)
+
+    # pylint: disable-next=missing-function-docstring
+    async def reconfigure(self, peers):
+        return await self.invoke(Reconfigure(list(peers)))
@@ -0,0 +1,109 @@
+"""
+Parallel execution of commuting state machine commands
+"""
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+
+class ParallelExecution:
+    """
+    Wraps a state machine so that a Replica can execute runs of decided commands concurrently.
+
+    keys_fn(input_value) returns the keys a command reads or writes, or None if it may touch anything. Commands whose
+    key sets are disjoint commute, so a batch of decided commands is split into waves: each command is placed in the
+    wave after the last one that holds a conflicting key, and a command without keys is placed alone after everything
+    before it. Waves run one after the other and the commands within a wave run on the executor, which gives the same
+    state as executing the batch in slot order. Outputs are returned in slot order.
+
+    Commands that run in the same wave share the state and must update it in place, returning the state they were
+    given. Waves of a single command run on the calling thread and may return a new state, so functional state
+    machines still work, just without the concurrency.
+
+    The executor must run commands on threads of this process, as they share the state: a ThreadPoolExecutor, which
+    is created with max_workers when none is given. A ProcessPoolExecutor is rejected, since its workers would update
+    copies of the state.
+
+    The wrapper is itself a state machine and can be passed anywhere an execute_fn is expected; the Replica only uses
+    execute_batch when it has more than one command to commit.
+    """
+
+    def __init__(
+        self,
+        execute_fn: Callable,
+        keys_fn: Callable[[Any], Optional[Iterable[Hashable]]],
+        executor: Optional[ThreadPoolExecutor] = None,
+        max_workers: Optional[int] = None,
+    ) -> None:
+        if isinstance(executor, ProcessPoolExecutor):
+            raise TypeError(
+                "commands executed in parallel share the state, so they need a thread pool, not a process pool"
+            )
+        self.execute_fn = execute_fn
+        self.keys_fn = keys_fn
+        self.executor = executor
+        self.owns_executor = False
+        self.max_workers = max_workers
+
+    def __call__(self, state, input_value):
+        return self.execute_fn(state, input_value)
+
+    def waves(self, inputs: List) -> List[List[int]]:
+        """
+        Returns the indexes of inputs grouped into waves of commuting commands, in the order the waves must run
+        """
+        waves: List[List[int]] = []
+        last_wave: Dict[Hashable, int] = {}
+        barrier = -1
+        for idx, input_value in enumerate(inputs):
+            keys = self.keys_fn(input_value)
+            if keys is None:
+                wave = len(waves)
+            else:
+                keys = set(keys)
+                wave = max((last_wave.get(key, -1) for key in keys), default=-1)
+                wave = max(wave, barrier) + 1
+                for key in keys:
+                    last_wave[key] = wave
+            if wave == len(waves):
+                waves.append([])
+            waves[wave].append(idx)
+            if keys is None:
+                # nothing may join the wave of a command that can touch any key
+                barrier = wave
+        return waves
+
+    def execute_batch(self, state, inputs: List) -> Tuple[Any, List]:
+        """
+        Executes the inputs as if one after the other, returning the final state and the outputs in input order
+        """
+        outputs: List = [None] * len(inputs)
+        for wave in self.waves(inputs):
+            if len(wave) == 1:
+                idx = wave[0]
+                state, outputs[idx] = self.execute_fn(state, inputs[idx])
+                continue
+
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="konsensus-exec"
+                )
+                self.owns_executor = True
+            futures = [
+                (idx, self.executor.submit(self.execute_fn, state, inputs[idx]))
+                for idx in wave
+            ]
+            for idx, future in futures:
+                new_state, outputs[idx] = future.result()
+                assert (
+                    new_state is state
+                ), "commands executed in parallel must update the state in place"
+        return state, outputs
+
+    def shutdown(self):
+        """
+        Shuts down the executor, if this wrapper created one
+        """
+        if self.owns_executor:
+            self.executor.shutdown()
+            self.executor = None
+            self.owns_executor = False
@@ -0,0 +1,50 @@
+"""
+Interning keeps one copy of each proposal on a node
+"""
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+# pylint: disable-next=relative-beyond-top-level
+from ..constants import INTERN_WINDOW
+
+# pylint: disable-next=relative-beyond-top-level
+from ..entities.data_types import Proposal
+
+
+class Interner:
+    """
+    Shares proposals between the roles of a node.
+
+    Every message a node receives is its own copy, so a proposal held by the acceptor, the replica and the leader of a
+    node would otherwise be three objects, each kept for as long as the log. Roles intern the proposals they keep:
+    a proposal is identified by its caller and client id, and interning one returns the copy seen first, so the roles
+    reference a single object.
+
+    Only the INTERN_WINDOW most recently interned proposals are remembered, since the copies of a proposal arrive
+    while its slot is being decided; a copy arriving later is kept as it is. A proposal whose contents differ from the
+    remembered one is never replaced by it.
+    """
+
+    def __init__(self, size: int = INTERN_WINDOW) -> None:
+        self.size = size
+        # proposals by caller and client id, least recently interned first
+        self.proposals: "OrderedDict[Tuple[Optional[str], Optional[int]], Proposal]" = (
+            OrderedDict()
+        )
+
+    def __len__(self) -> int:
+        return len(self.proposals)
+
+    def intern(self, proposal: Proposal) -> Proposal:
+        """
+        Returns the remembered copy of a proposal, remembering the proposal if there is none
+        """
+        key = (proposal.caller, proposal.client_id)
+        known = self.proposals.get(key)
+        if known is not None:
+            self.proposals.move_to_end(key)
+            return known if known is proposal or known == proposal else proposal
+        self.proposals[key] = proposal
+        if len(self.proposals) > self.size:
+            self.proposals.popitem(last=False)
+        return proposal
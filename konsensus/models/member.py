@@ -1,7 +1,8 @@
 """
 Member Model
 """
-from typing import Optional
+from functools import partial
+from typing import Callable, Optional
 import threading
 from queue import Queue
 
@@ -12,11 +13,17 @@ from .roles.seed import Seed
 from .roles.bootstrap import Bootstrap
 
 # pylint: disable-next=import-error
-from .roles.requester import Requester
+from .roles.requester import ExpiredError, OverloadedError, Requester
+
+# pylint: disable-next=import-error
+from .roles.replica import Replica
 
 # pylint: disable-next=relative-beyond-top-level
 from ..network import Network
 
+# pylint: disable-next=relative-beyond-top-level
+from ..entities.data_types import Reconfigure
+
 
 class Member:
     """
@@ -28,6 +35,17 @@ class Member:
     transition.
     Once that proposal is decided and the state machine runs, invoke returns the machine's output.
     The method uses a simple synchronized Queue to wait for the result from the protocol thread.
+    If the request was committed but its output was lost before it reached the caller, invoke raises an ExpiredError.
+    When the cluster is overloaded, the request backs off and retries on its own; with fail_fast, invoke raises an
+    OverloadedError carrying the time to wait instead, so that the caller can back off or shed the request.
+
+    A learner member joins without counting towards quorums (see Bootstrap), to add read capacity without slowing down
+    writes. read evaluates a function against the state of the replica on this node, on the protocol thread, without
+    going through the log or the leader; the state is that of the last slot the replica applied, so reads are cheap
+    but may be stale (see Replica).
+
+    reconfigure changes the peers of the cluster through the log in the same way; a new member is then started without
+    a seed and with the new peers, and joins once the change is committed.
     """
 
     # pylint: disable-next=missing-function-docstring
@@ -40,11 +58,17 @@ class Member:
         seed=None,
         seed_cls=Seed,
         bootstrap=Bootstrap,
+        learner: bool = False,
     ) -> None:
         self.thread: Optional[threading.Thread] = None
         self.network = network
         self.node = network.new_node()
-        if seed is not None:
+        if learner:
+            assert seed is None, "a learner cannot seed a cluster"
+            self.startup_role = bootstrap(
+                self.node, execute_fn=state_machine, peers=peers, learner=True
+            )
+        elif seed is not None:
             self.startup_role = seed_cls(
                 self.node, initial_state=seed, peers=peers, execute_fn=state_machine
             )
@@ -61,11 +85,47 @@ class Member:
         self.thread.start()
 
     # pylint: disable-next=missing-function-docstring
-    def invoke(self, input_value, request_cls=Requester):
+    def invoke(self, input_value, request_cls=Requester, fail_fast: bool = False):
         assert self.requester is None
+        if fail_fast:
+            request_cls = partial(request_cls, fail_fast=True)
         queue = Queue()
         self.requester = request_cls(self.node, input_value, queue.put)
         self.requester.start()
         output = queue.get()
         self.requester = None
+        if isinstance(output, (ExpiredError, OverloadedError)):
+            raise output
         return output
+
+    def replica(self) -> Replica:
+        """
+        Returns the replica running on this node, once it has joined the cluster
+        """
+        for role in self.node.roles:
+            if isinstance(role, Replica):
+                return role
+        raise RuntimeError(f"{self.node.address} has not joined the cluster yet")
+
+    def read(self, fn: Callable):
+        """
+        Returns fn applied to the local replica's state, waiting for the protocol thread to evaluate it
+        """
+        queue = Queue()
+
+        def evaluate():
+            try:
+                queue.put((True, self.replica().read(fn)))
+            # pylint: disable-next=broad-exception-caught
+            except Exception as error:
+                queue.put((False, error))
+
+        self.network.post(evaluate)
+        succeeded, result = queue.get()
+        if not succeeded:
+            raise result
+        return result
+
+    # pylint: disable-next=missing-function-docstring
+    def reconfigure(self, peers, request_cls=Requester):
+        return self.invoke(Reconfigure(list(peers)), request_cls=request_cls)
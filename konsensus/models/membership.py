@@ -0,0 +1,125 @@
+"""
+Membership tracks the peers of a cluster as they change through the log
+"""
+from typing import Dict, List, Optional, Tuple
+
+# pylint: disable-next=relative-beyond-top-level
+from ..constants import ALPHA
+
+
+class Membership:
+    """
+    The peers of a cluster for each slot of its log.
+
+    Membership changes are proposals like any other, whose input is a Reconfigure. A reconfiguration decided at slot s
+    takes over from slot s + ALPHA, so the peers that decide a slot are known once every slot ALPHA or more before it
+    has been committed: a leader never commands a slot past that horizon, which bounds how far it runs ahead of its
+    replica.
+
+    A replica keeps the membership of its node, recording reconfigurations as it commits them and its next slot to
+    commit, and shares it with the leader. A membership without a slot, such as the one a leader makes when it is not
+    given one, has no horizon.
+
+    A joining node is given the configurations of the node that welcomes it. Its own peers are those of the latest
+    configuration, but the slots before that one takes over are still decided by the peers of the earlier ones.
+
+    The directory lists every address that has been a peer, in the order they first were, and ballots name their leader
+    by its index in it. Addresses are only ever appended, as reconfigurations are committed, so every node that has
+    committed the same slots has the same directory; a joining node is given the directory of the node that welcomes
+    it. Asking for the index of an address that was never a peer, such as that of a leader wired up by hand, appends
+    it on this node only.
+    """
+
+    def __init__(
+        self,
+        peers: List[str],
+        slot: Optional[int] = None,
+        configs: Optional[List[Tuple[int, List[str]]]] = None,
+        directory: Optional[List[str]] = None,
+    ) -> None:
+        # (first slot, peers) of each configuration, in slot order
+        self.configs: List[Tuple[int, List[str]]] = [
+            (first_slot, list(config))
+            for first_slot, config in (configs or [(0, peers)])
+        ]
+        self.slot = slot
+        self.directory: List[str] = []
+        self.indexes: Dict[str, int] = {}
+        if directory is None:
+            directory = [address for _, config in self.configs for address in config]
+        for address in directory:
+            self.index(address)
+
+    def reconfigure(self, slot: int, peers: List[str]):
+        """
+        Records a reconfiguration decided at slot, in slot order
+        """
+        self.configs.append((slot + ALPHA, list(peers)))
+        for address in peers:
+            self.index(address)
+
+    def index(self, address: str) -> int:
+        """
+        Returns the index of an address in the directory, appending it if it is not there yet
+        """
+        index = self.indexes.get(address)
+        if index is None:
+            index = self.indexes[address] = len(self.directory)
+            self.directory.append(address)
+        return index
+
+    def address(self, index: int) -> Optional[str]:
+        """
+        Returns the address at an index of the directory, or None if this node has not heard of it
+        """
+        return self.directory[index] if 0 <= index < len(self.directory) else None
+
+    @property
+    def horizon(self) -> Optional[int]:
+        """
+        The first slot whose peers are not known yet, if any
+        """
+        return None if self.slot is None else self.slot + ALPHA
+
+    def known(self, slot: int) -> bool:
+        """
+        Whether the peers that decide slot are known
+        """
+        return self.slot is None or slot < self.horizon
+
+    def peers_at(self, slot: int) -> List[str]:
+        """
+        Returns the peers that decide slot, as far as is known
+        """
+        peers = self.configs[0][1]
+        for first_slot, config in self.configs:
+            if first_slot > slot:
+                break
+            peers = config
+        return peers
+
+    def latest(self) -> List[str]:
+        """
+        Returns the peers of the latest configuration
+        """
+        return self.configs[-1][1]
+
+    def window(self, slot: Optional[int] = None) -> List[List[str]]:
+        """
+        Returns the configurations that decide slot, by default the next slot to commit, and the slots after it
+        """
+        slot = (self.slot or 0) if slot is None else slot
+        configs = [self.peers_at(slot)]
+        configs.extend(
+            config for first_slot, config in self.configs if first_slot > slot
+        )
+        return configs
+
+    def everyone(self, slot: Optional[int] = None) -> List[str]:
+        """
+        Returns the peers of every configuration in the window, in order and without repeats
+        """
+        peers: List[str] = []
+        for config in self.window(slot):
+            peers.extend(peer for peer in config if peer not in peers)
+        return peers
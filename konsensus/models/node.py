@@ -2,13 +2,18 @@
 Node represents a node on the network
 """
 from __future__ import annotations
-from typing import List, TYPE_CHECKING
+from typing import Dict, List, TYPE_CHECKING
 from itertools import count
 from functools import partial
 import logging
 
 # pylint: disable-next=relative-beyond-top-level
 from ..infra.logger import SimTimeLogger
+from .interning import Interner
+from .rtt import RttEstimator
+
+# pylint: disable-next=relative-beyond-top-level
+from ..constants import INVOKE_RETRANSMIT_MAX
 
 if TYPE_CHECKING:
     from .roles import Role
@@ -23,20 +28,43 @@ class Node:
     These do_ methods receive the message's attributes as keyword arguments for easy access. The Node class also
     provides a send method as a convenience, using functools.partial to supply some arguments to the same methods of
     the Network class
+
+    Every node logs to the same logger, and keeps an adapter of its child logger for each class of role, so that
+    creating a node or a role registers no logger (see SimTimeLogger)
     """
 
     unique_ids = count()
+    log = logging.getLogger("konsensus.node")
 
     # pylint: disable-next=missing-function-docstring
     def __init__(self, network: "Network", address) -> None:
         self.network = network
         self.address = address or f"N{next(self.unique_ids)}"
         self.logger = SimTimeLogger(
-            logging.getLogger(self.address), {"network": self.network}
+            self.log, {"network": self.network, "node": self.address}
         )
         self.logger.info("starting")
+        self.role_loggers: Dict[type, SimTimeLogger] = {}
         self.roles: List["Role"] = []
         self.send = partial(self.network.send, self)
+        # round trips to peers, and from Invoke to Invoked for requests made on this node
+        self.rtt = RttEstimator()
+        self.invoke_rtt = RttEstimator(max_rto=INVOKE_RETRANSMIT_MAX)
+        # client ids of requests made on this node; proposals are told apart by caller and client id
+        self.next_client_id = 100000
+        # one copy of each proposal for the roles that keep them
+        self.interner = Interner()
+
+    def role_logger(self, role_cls: type) -> SimTimeLogger:
+        """
+        Returns the logger for roles of a class on this node
+        """
+        logger = self.role_loggers.get(role_cls)
+        if logger is None:
+            logger = self.role_loggers[role_cls] = self.logger.getChild(
+                role_cls.__name__
+            )
+        return logger
 
     # pylint: disable-next=missing-function-docstring
     def register(self, role: "Role"):
@@ -48,11 +76,22 @@ class Node:
 
     # pylint: disable-next=missing-function-docstring
     def receive(self, sender, message):
-        handler_name = f"do_{type(message).__name__}".lower()
+        kind = type(message).__name__
+        if self.network.metrics.enabled:
+            self.network.metrics.inc("messages_received", type=kind)
+        handler_name = f"do_{kind}".lower()
 
         for comp in self.roles[:]:
             if not hasattr(comp, handler_name):
                 continue
             comp.logger.debug(f"received {message} from {sender}")
             handler = getattr(comp, handler_name)
-            handler(sender=sender, **message._asdict())
+            profiler = self.network.profiler
+            if profiler is None:
+                handler(sender=sender, **message._asdict())
+                continue
+            profiler.enter(f"{type(comp).__name__}.{handler_name}", self.network.now)
+            try:
+                handler(sender=sender, **message._asdict())
+            finally:
+                profiler.exit()
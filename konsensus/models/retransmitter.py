@@ -0,0 +1,113 @@
+"""
+Retransmitter sends a message until it is acknowledged
+"""
+from __future__ import annotations
+from typing import Callable, Dict, Iterable, List, Optional, TYPE_CHECKING
+
+# pylint: disable-next=relative-beyond-top-level
+from ..constants import RETRANSMIT_JITTER
+from .rtt import RttEstimator
+from .timer import Timer
+
+if TYPE_CHECKING:
+    from .roles import Role
+
+
+# pylint: disable-next=too-many-instance-attributes
+class Retransmitter:
+    """
+    Sends a message on behalf of a role and re-sends it to the destinations that have not acknowledged it yet.
+
+    Each destination has its own attempt count, so the timeout before the next retransmission is the retransmission
+    timeout of the slowest outstanding destination, doubled for every attempt that went unanswered and shortened by a
+    random jitter of up to `jitter` so that roles which started together do not retransmit together. Round trips are
+    sampled into the node's RttEstimator, except for destinations that were sent the message more than once (Karn's
+    algorithm).
+
+    The timer is cancelled as soon as every destination has acknowledged the message or the role cancels it, so
+    finished roles leave no timers behind. Roles that send to one destination at a time, like Bootstrap, pass a select
+    function returning the destinations for the next attempt.
+    """
+
+    # pylint: disable-next=too-many-arguments
+    def __init__(
+        self,
+        role: "Role",
+        message,
+        destinations: Iterable[str],
+        timeout: float,
+        rtt: Optional[RttEstimator] = None,
+        select: Optional[Callable[[], List[str]]] = None,
+        jitter: float = RETRANSMIT_JITTER,
+    ) -> None:
+        self.role = role
+        self.message = message
+        self.destinations = list(destinations)
+        self.outstanding = set(self.destinations)
+        self.timeout = timeout
+        self.rtt = rtt or role.node.rtt
+        self.select = select
+        self.jitter = jitter
+        self.sent_at: Dict[str, float] = {}
+        self.attempts: Dict[str, int] = {}
+        self.timer: Optional[Timer] = None
+
+    def start(self):
+        """
+        Sends the message for the first time
+        """
+        self.transmit()
+
+    def transmit(self):
+        """
+        Sends the message to the outstanding destinations and schedules the next retransmission
+        """
+        if self.select:
+            destinations = self.select()
+        else:
+            destinations = [d for d in self.destinations if d in self.outstanding]
+        if not destinations:
+            self.timer = None
+            return
+
+        network = self.role.node.network
+        timeout = 0.0
+        for dest in destinations:
+            attempt = self.attempts.get(dest, 0)
+            if not attempt:
+                self.sent_at[dest] = network.now
+            else:
+                network.metrics.inc("retransmits", role=type(self.role).__name__)
+            self.attempts[dest] = attempt + 1
+            timeout = max(timeout, self.rtt.rto(dest, self.timeout, attempt))
+        self.role.node.send(destinations, self.message)
+
+        if self.jitter:
+            timeout *= 1 - self.jitter * network.rnd.random()
+        self.timer = self.role.set_timer(timeout, self.transmit)
+
+    def ack(self, destination: str):
+        """
+        Records the acknowledgement of a destination, cancelling the timer once no destination is outstanding
+        """
+        sent_at = self.sent_at.pop(destination, None)
+        if sent_at is not None and self.attempts[destination] == 1:
+            self.rtt.sample(destination, self.role.node.network.now - sent_at)
+        self.outstanding.discard(destination)
+        if not self.outstanding:
+            self.cancel()
+
+    def cancel(self):
+        """
+        Stops retransmitting
+        """
+        if self.timer:
+            self.timer.cancel()
+            self.timer = None
+
+    def pause(self, seconds: float):
+        """
+        Stops retransmitting for a while, sending again to the outstanding destinations after seconds
+        """
+        self.cancel()
+        self.timer = self.role.set_timer(seconds, self.transmit)
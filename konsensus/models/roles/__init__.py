@@ -3,6 +3,7 @@ Base Role
 """
 from __future__ import annotations
 from typing import Callable
+from functools import partial
 from ..node import Node
 
 
@@ -14,14 +15,19 @@ class Role:
         self.node = node
         self.node.register(self)
         self.running = True
-        self.logger = node.logger.getChild(type(self).__name__)
+        self.logger = node.role_logger(type(self))
 
     # pylint: disable-next=missing-function-docstring)
     def set_timer(self, seconds: int, callback: Callable):
         return self.node.network.set_timer(
-            self.node.address, seconds, lambda: self.running and callback()
+            self.node.address, seconds, partial(self.fire_timer, callback)
         )
 
+    # pylint: disable-next=missing-function-docstring)
+    def fire_timer(self, callback: Callable):
+        if self.running:
+            callback()
+
     # pylint: disable-next=missing-function-docstring)
     def stop(self):
         self.running = False
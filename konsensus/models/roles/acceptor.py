@@ -4,8 +4,15 @@ Acceptor Role
 from . import Role
 
 # pylint: disable-next=relative-beyond-top-level
-from ...entities.messages_types import Accepting, Promise, Accepted
+from ...entities.messages_types import (
+    Accepting,
+    Promise,
+    Accepted,
+    Decision,
+    DecisionRequest,
+)
 from ..node import Node
+from ..slot_log import BallotLog
 
 # pylint: disable-next=relative-beyond-top-level
 from ...constants import NULL_BALLOT
@@ -18,6 +25,9 @@ class Acceptor(Role):
     and Accept messages according to the protocol
 
     This looks like a Simple Paxos with the addition of slot numbers to the messages
+
+    Since it holds the accepted proposals, the acceptor also resolves the compact DecisionRange announcements of the
+    leader into Decisions for the local replica
     """
 
     # pylint: disable-next=missing-function-docstring
@@ -25,7 +35,7 @@ class Acceptor(Role):
         super().__init__(node)
         self.ballot_num = NULL_BALLOT
         # {slot: (ballot_num, proposal)}
-        self.accepted_proposals = {}
+        self.accepted_proposals = BallotLog()
 
     # pylint: disable-next=missing-function-docstring
     def do_prepare(self, sender, ballot_num: NULL_BALLOT):
@@ -45,8 +55,26 @@ class Acceptor(Role):
     def do_accept(self, sender, ballot_num, slot, proposal):
         if ballot_num >= self.ballot_num:
             self.ballot_num = ballot_num
-            acc = self.accepted_proposals
-            if slot not in acc or acc[slot][0] < ballot_num:
-                acc[slot] = (ballot_num, proposal)
+            accepted = self.accepted_proposals.get(slot)
+            if accepted is None or accepted[0] < ballot_num:
+                self.accepted_proposals[slot] = (
+                    ballot_num,
+                    self.node.interner.intern(proposal),
+                )
 
         self.node.send([sender], Accepted(slot=slot, ballot_num=self.ballot_num))
+
+    # pylint: disable-next=missing-function-docstring
+    def do_decisionrange(self, sender, first_slot: int, last_slot: int, ballot_num):
+        missing = []
+        for slot in range(first_slot, last_slot + 1):
+            accepted = self.accepted_proposals.get(slot)
+            # a proposal accepted at the deciding ballot or later is the decided one
+            if accepted and accepted[0] >= ballot_num:
+                self.node.send(
+                    [self.node.address], Decision(slot=slot, proposal=accepted[1])
+                )
+            else:
+                missing.append(slot)
+        if missing:
+            self.node.send([sender], DecisionRequest(slots=missing))
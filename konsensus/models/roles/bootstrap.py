@@ -2,10 +2,9 @@
 Bootstrap role
 """
 from typing import List, Callable
-from itertools import cycle
 
 # pylint: disable-next=relative-beyond-top-level)
-from ...entities.messages_types import Join
+from ...entities.messages_types import Join, Learn
 
 # pylint: disable-next=relative-beyond-top-level)
 from ...constants import JOIN_RETRANSMIT
@@ -16,6 +15,7 @@ from .leader import Leader
 from .commander import Commander
 from .scout import Scout
 from ..node import Node
+from ..retransmitter import Retransmitter
 
 
 # pylint: disable-next=too-many-instance-attributes
@@ -23,6 +23,9 @@ class Bootstrap(Role):
     """
     When a node joins the cluster, it must determine the current cluster state before it can participate.
     The bootstrap role handles this by sending Join messages to each peer in turn until it receives a Welcome.
+
+    A learner sends Learn messages instead, and only starts a replica: with no acceptor or leader, it takes no part in
+    quorums, and follows the decisions that the leaders send it (see Replica).
     """
 
     # pylint: disable-next=missing-function-docstring
@@ -37,11 +40,21 @@ class Bootstrap(Role):
         leader: Leader = Leader,
         commander: Commander = Commander,
         scout: Scout = Scout,
+        learner: bool = False,
     ) -> None:
         super().__init__(node)
         self.execute_fn = execute_fn
         self.peers = peers
-        self.peers_cycle = cycle(peers)
+        self.join_turn = 0
+        self.learner = learner
+        # Joins go to one peer at a time, each backing off on its own
+        self.retransmitter = Retransmitter(
+            self,
+            Learn() if learner else Join(),
+            peers,
+            JOIN_RETRANSMIT,
+            select=self.next_peer,
+        )
         self.replica = replica
         self.acceptor = acceptor
         self.leader = leader
@@ -52,24 +65,54 @@ class Bootstrap(Role):
     def start(self):
         self.join()
 
+    def next_peer(self) -> List:
+        """
+        Returns the peer to send the next Join to, going round the peers in turn
+        """
+        peer = self.peers[self.join_turn % len(self.peers)]
+        self.join_turn += 1
+        return [peer]
+
     # pylint: disable-next=missing-function-docstring
     def join(self):
-        self.node.send([next(self.peers_cycle)], Join())
-        self.set_timer(JOIN_RETRANSMIT, self.join)
+        self.retransmitter.start()
 
     # pylint: disable-next=missing-function-docstring
-    def do_welcome(self, sender, state, slot: int, decisions):
+    def do_welcome(self, sender, state, slot: int, decisions, configs, directory):
         self.logger.info(f"Welcome received from {sender}")
+        self.retransmitter.ack(sender)
+        self.retransmitter.cancel()
+        if self.learner:
+            self.replica(
+                self.node,
+                execute_fn=self.execute_fn,
+                peers=self.peers,
+                state=state,
+                slot=slot,
+                decisions=decisions,
+                configs=configs,
+                directory=directory,
+                learner=True,
+            )
+            self.stop()
+            return
         self.acceptor(self.node)
-        self.replica(
+        replica = self.replica(
             self.node,
             execute_fn=self.execute_fn,
             peers=self.peers,
             state=state,
             slot=slot,
             decisions=decisions,
+            configs=configs,
+            directory=directory,
         )
+        # the leader follows the membership as the replica commits it
         self.leader(
-            self.node, peers=self.peers, commander=self.commander, scout=self.scout
+            self.node,
+            peers=self.peers,
+            commander=self.commander,
+            scout=self.scout,
+            membership=replica.membership,
         ).start()
         self.stop()
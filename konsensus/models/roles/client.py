@@ -0,0 +1,117 @@
+"""
+Client role
+"""
+from typing import Callable, Dict
+
+# pylint: disable-next=relative-beyond-top-level)
+from ...constants import RETRANSMIT_JITTER
+from . import Role
+from .requester import ExpiredError, OverloadedError, invoke_retransmitter
+from ..node import Node
+
+
+class Request:
+    """
+    A request of a Client: its input, what to call back with its output, and the Invoke retransmitted until it arrives,
+    under its current client id
+    """
+
+    __slots__ = (
+        "n",
+        "callback",
+        "fail_fast",
+        "started_at",
+        "client_id",
+        "retransmitter",
+    )
+
+    # pylint: disable-next=too-many-arguments
+    def __init__(
+        self,
+        n,
+        callback: Callable,
+        fail_fast: bool,
+        started_at: float,
+        client_id: int,
+        retransmitter,
+    ) -> None:
+        # pylint: disable-next=invalid-name
+        self.n = n
+        self.callback = callback
+        self.fail_fast = fail_fast
+        self.started_at = started_at
+        self.client_id = client_id
+        self.retransmitter = retransmitter
+
+
+class Client(Role):
+    """
+    The client role makes any number of concurrent requests from one node, each behaving like a Requester.
+
+    A node dispatches every message to each of its roles, so a Requester per request makes every Invoked cost as much
+    as there are requests in flight. The client instead keeps its requests by client id, each with its own
+    Retransmitter, and looks up the one an Invoked, Expired or Overloaded is for.
+
+    A request can be cancelled, e.g. when its caller stops waiting for it. It is then no longer retransmitted and is
+    not called back, but an Invoke that already reached the replica may still be executed.
+    """
+
+    # pylint: disable-next=missing-function-docstring
+    def __init__(self, node: Node) -> None:
+        super().__init__(node)
+        self.requests: Dict[int, Request] = {}
+
+    def request(self, n, callback: Callable, fail_fast: bool = False) -> Request:
+        """
+        Starts a request for the state machine to execute n, calling back with its output, and returns it
+        """
+        client_id, retransmitter = invoke_retransmitter(self, n)
+        request = self.requests[client_id] = Request(
+            n, callback, fail_fast, self.node.network.now, client_id, retransmitter
+        )
+        retransmitter.start()
+        return request
+
+    def cancel(self, request: Request):
+        """
+        Stops retransmitting a request, which will not be called back
+        """
+        if self.requests.get(request.client_id) is request:
+            del self.requests[request.client_id]
+            request.retransmitter.cancel()
+
+    # pylint: disable-next=missing-function-docstring
+    def do_invoked(self, sender, client_id, output):
+        request = self.requests.pop(client_id, None)
+        if request is None:
+            return
+        request.retransmitter.ack(self.node.address)
+        self.node.network.metrics.observe(
+            "commit_latency_seconds", self.node.network.now - request.started_at
+        )
+        request.callback(output)
+
+    # pylint: disable-next=missing-function-docstring
+    def do_expired(self, sender, client_id):
+        request = self.requests.pop(client_id, None)
+        if request is None:
+            return
+        request.retransmitter.cancel()
+        request.callback(ExpiredError(f"the output of request {client_id} expired"))
+
+    # pylint: disable-next=missing-function-docstring
+    def do_overloaded(self, sender, client_id, retry_after):
+        request = self.requests.pop(client_id, None)
+        if request is None:
+            return
+        self.node.network.metrics.inc("requests_overloaded")
+        request.retransmitter.cancel()
+        if request.fail_fast:
+            request.callback(OverloadedError(retry_after))
+            return
+        # retried under a new client id, like a Requester
+        retry = invoke_retransmitter(self, request.n)
+        request.client_id, request.retransmitter = retry
+        self.requests[request.client_id] = request
+        jitter = 1 + RETRANSMIT_JITTER * self.node.network.rnd.random()
+        request.retransmitter.pause(retry_after * jitter)
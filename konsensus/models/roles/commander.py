@@ -8,20 +8,21 @@ from math import floor
 from ...entities.data_types import Ballot, Proposal
 
 # pylint: disable-next=relative-beyond-top-level)
-from ...entities.messages_types import Preempted, Accept, Decided, Decision
+from ...entities.messages_types import Preempted, Accept, Decided
 
 # pylint: disable-next=relative-beyond-top-level)
 from ...constants import ACCEPT_RETRANSMIT
 from . import Role
 from ..node import Node
+from ..retransmitter import Retransmitter
 
 
 class Commander(Role):
     """
     The leader creates a commander role for each slot where it has an active proposal. Like a scout, a
     commander sends and re-sends Accept messages and waits for a majority of acceptors to reply with
-    Accepted or for news of its preemption. When a proposal is accepted, the commander broadcasts a
-    Decision message to all nodes. It responds to the leader with Decided or Preempted
+    Accepted or for news of its preemption. It responds to the leader with Decided or Preempted, and the leader
+    announces the decision to all nodes
     """
 
     # pylint: disable-next=too-many-arguments
@@ -38,21 +39,24 @@ class Commander(Role):
         self.acceptors = set([])
         self.peers = peers
         self.quorum = floor(len(peers) / 2 + 1)
+        self.retransmitter = Retransmitter(
+            self,
+            Accept(slot=self.slot, ballot_num=self.ballot_num, proposal=self.proposal),
+            peers,
+            ACCEPT_RETRANSMIT,
+        )
 
     def start(self):
         """
-        Starts the Commander role
+        Starts the Commander role, re-sending the Accept to the peers which have not responded
         """
-        self.node.send(
-            set(self.peers) - self.acceptors,
-            Accept(slot=self.slot, ballot_num=self.ballot_num, proposal=self.proposal),
-        )
-        self.set_timer(ACCEPT_RETRANSMIT, self.start)
+        self.retransmitter.start()
 
     def finished(self, ballot_num: Ballot, preempted: bool):
         """
         Handles finished process and stops the node before unregistering it
         """
+        self.retransmitter.cancel()
         if preempted:
             self.node.send(
                 [self.node.address], Preempted(slot=self.slot, preempted_by=ballot_num)
@@ -69,9 +73,9 @@ class Commander(Role):
             return
         if ballot_num == self.ballot_num:
             self.acceptors.add(sender)
+            self.retransmitter.ack(sender)
             if len(self.acceptors) < self.quorum:
                 return
-            self.node.send(self.peers, Decision(slot=self.slot, proposal=self.proposal))
             self.finished(ballot_num, False)
         else:
             self.finished(ballot_num, True)
@@ -1,20 +1,23 @@
 """
 Leader Role
 """
-from typing import Dict, List
+from typing import Dict, List, Optional, Set, Tuple
 
 # pylint: disable-next=relative-beyond-top-level)
 from ...entities.data_types import Ballot, Proposal
 
 # pylint: disable-next=relative-beyond-top-level)
-from ...entities.messages_types import Active
+from ...entities.messages_types import Active, Decision, DecisionRange, Propose
 
 # pylint: disable-next=relative-beyond-top-level)
-from ...constants import LEADER_TIMEOUT
+from ...constants import LEADER_TIMEOUT, DECISION_FLUSH_INTERVAL, MAX_COMMANDERS
 from . import Role
 from .commander import Commander
 from .scout import Scout
+from .prevoter import PreVoter
 from ..node import Node
+from ..membership import Membership
+from ..slot_log import SlotLog
 
 
 class Leader(Role):
@@ -25,38 +28,121 @@ class Leader(Role):
 
     In keeping with the class-per-role model, the leader delegates to the scout and commander roles to carry out each
     portion of the protocol.
+
+    Decisions reached by its commanders are announced by the leader itself. Acceptors already hold the accepted
+    proposals, so the leader only sends the slots and the ballot they were decided at, coalescing consecutive slots
+    decided within DECISION_FLUSH_INTERVAL into a single DecisionRange. Nodes that are missing a proposal ask for it
+    with a DecisionRequest, which the replica on the leader's node answers.
+
+    A decided slot and its ballot are forgotten once the slot is announced, and the ballots of slots whose commanders
+    are given up on when the leader is preempted, so neither grows with the log. The proposal the leader holds for an
+    announced slot is the one decided for it, so a Propose from a replica that missed the announcement drives the slot
+    again with it. Once the leader's replica has committed a slot its proposal is dropped too, and Proposes for it are
+    answered by the replica instead.
+
+    An eager leader starts scouting as soon as it starts instead of waiting for a Propose. Its Prepare messages make
+    the replicas adopt it as their leader, which lets ShardedMember choose where the leader of each group runs.
+
+    Otherwise, an inactive leader only scouts once a majority of its peers has granted it a pre-vote (see PreVoter),
+    which they only do after losing touch with their own leader. When the pre-vote is refused, or when the leader is
+    preempted, it sticks to the leader the others follow: for LEADER_TIMEOUT it forwards the proposals it receives to
+    that leader instead of competing with it, and only holds another pre-vote after that.
+
+    An active leader's Accept and DecisionRange messages tell its peers that it is alive as well as heartbeats do, so
+    the Active heartbeat is only sent when neither went out to the peers within the last heartbeat interval.
+
+    The leader shares the Membership of its node's replica. Each commander asks the peers that decide its slot, and
+    proposals for slots past the membership's horizon wait until the replica catches up; they are retried every
+    DECISION_FLUSH_INTERVAL, about as often as the replica commits the leader's decisions. A scout asks the peers
+    of every configuration from the replica's next slot on and needs a majority of each; when a reconfiguration brings
+    a slot under peers the ballot was not adopted by, the leader scouts again at the same ballot before commanding it.
+
+    Learners that subscribed are sent every heartbeat, since they get no Accepts, and the decisions themselves, since
+    they have no acceptor to resolve a DecisionRange with.
+
+    At most max_commanders commanders run at once. Proposals that arrive while that many are running wait until one of
+    them finishes, lowest slot first. Waiting proposals are dropped if the leader is preempted, as the replicas
+    propose them again.
     """
 
+    # pylint: disable-next=too-many-arguments
     def __init__(
-        self, node: Node, peers: List, commander=Commander, scout=Scout
+        self,
+        node: Node,
+        peers: List,
+        commander=Commander,
+        scout=Scout,
+        eager: bool = False,
+        prevoter=PreVoter,
+        membership: Optional[Membership] = None,
+        max_commanders: int = MAX_COMMANDERS,
     ) -> None:
         """
         Creates a new Leader Role instance
         """
         super().__init__(node)
-        self.ballot_num = Ballot(0, node.address)
+        self.membership = membership or Membership(peers)
+        self.ballot_num = Ballot(0, self.membership.index(node.address))
         self.active = False
-        self.proposals: Dict[int, Proposal] = {}
+        self.proposals = SlotLog()
+        # ballot at which a commander was last spawned for each slot
+        self.commanded: Dict[int, Ballot] = {}
+        self.decided: Set[int] = set()
+        # slots with a running commander, and the sender and proposal waiting for one by slot
+        self.commanding: Set[int] = set()
+        self.waiting: Dict[int, Tuple[str, Proposal]] = {}
+        self.waiting_timer = None
+        self.max_commanders = max_commanders
+        self.unannounced: List[int] = []
+        self.flush_timer = None
         self.commander = commander
         self.scout = scout
         self.scouting = False
-        self.peers = peers
+        # the configurations that the scout asked, and that adopted the ballot
+        self.scouted_configs: List[List] = []
+        self.adopted_configs: List[List] = []
+        self.eager = eager
+        self.prevoter = prevoter
+        self.prevoting = False
+        # the leader that refused pre-votes and preemptions point to, and until when proposals are forwarded to it
+        self.leader_hint: Optional[str] = None
+        self.leader_hint_expires = 0.0
+        # when the peers were last sent an Accept, DecisionRange or Active
+        self.broadcast_at = float("-inf")
+        # learner nodes that subscribed to decisions
+        self.learners: List[str] = []
 
     def start(self):
         """
         Starts the leader role
         """
 
-        # remind others we are active before LEADER_TIMEOUT expires
-        def active():
-            """
-            Sets a timeout and sends out an Active message
-            """
-            if self.active:
-                self.node.send(self.peers, Active())
-            self.set_timer(LEADER_TIMEOUT / 2.0, active)
+        self.heartbeat()
+        if self.eager:
+            self.spawn_scout()
 
-        active()
+    def heartbeat(self):
+        """
+        Sends out an Active message if active and nothing else was sent to the peers within the last heartbeat
+        interval, reminding others we are active before LEADER_TIMEOUT expires
+        """
+        interval = LEADER_TIMEOUT / 2.0
+        now = self.node.network.now
+        if self.active:
+            if now - self.broadcast_at >= interval:
+                self.node.send(
+                    self.membership.everyone() + self.learners, Active()
+                )
+                self.broadcast_at = now
+            else:
+                self.node.network.metrics.inc(
+                    "heartbeats_suppressed", node=self.node.address
+                )
+                if self.learners:
+                    self.node.send(self.learners, Active())
+            self.set_timer(self.broadcast_at + interval - now, self.heartbeat)
+        else:
+            self.set_timer(interval, self.heartbeat)
 
     def spawn_scout(self):
         """
@@ -64,7 +150,41 @@ class Leader(Role):
         """
         assert not self.scouting
         self.scouting = True
-        self.scout(self.node, self.ballot_num, self.peers).start()
+        self.node.network.metrics.inc("scouts", node=self.node.address)
+        self.scouted_configs = self.membership.window()
+        self.scout(
+            self.node,
+            self.ballot_num,
+            self.membership.everyone(),
+            configs=self.scouted_configs,
+        ).start()
+
+    def spawn_prevoter(self):
+        """
+        Asks the peers whether they would follow this leader before scouting
+        """
+        assert not self.prevoting
+        self.prevoting = True
+        self.prevoter(self.node, self.ballot_num, self.membership.latest()).start()
+
+    def do_prevoted(self, sender, granted: bool, leader: Optional[str]):
+        """
+        Scouts once a pre-vote is granted, or sticks to the leader the peers follow
+        """
+        self.prevoting = False
+        if granted:
+            self.spawn_scout()
+        else:
+            self.node.network.metrics.inc("prevotes_refused", node=self.node.address)
+            self.follow(leader)
+
+    def follow(self, leader: Optional[str]):
+        """
+        Forwards proposals to another leader for the next LEADER_TIMEOUT
+        """
+        if leader and leader != self.node.address:
+            self.leader_hint = leader
+            self.leader_hint_expires = self.node.network.now + LEADER_TIMEOUT
 
     def do_adopted(
         self, sender, ballot_num: Ballot, accepted_proposals: Dict[int, Proposal]
@@ -73,7 +193,11 @@ class Leader(Role):
         Performs an Adopted action
         """
         self.scouting = False
-        self.proposals.update(accepted_proposals)
+        self.adopted_configs = self.scouted_configs
+        intern = self.node.interner.intern
+        self.proposals.update(
+            (slot, intern(proposal)) for slot, proposal in accepted_proposals.items()
+        )
         # note that we don't re-spawn commanders here; if there are undecided proposals, the replicas will re-propose
         self.logger.info(
             f"leader becoming active. Sender: {sender}. Ballot: {ballot_num}"
@@ -85,7 +209,101 @@ class Leader(Role):
         Spawn a new commander
         """
         proposal = self.proposals[slot]
-        self.commander(self.node, ballot_num, slot, proposal, self.peers).start()
+        self.commanded[slot] = ballot_num
+        self.commanding.add(slot)
+        peers = self.membership.peers_at(slot)
+        self.commander(self.node, ballot_num, slot, proposal, peers).start()
+        self.broadcast_at = self.node.network.now
+
+    def do_decided(self, sender, slot: int):
+        """
+        Collects a slot decided by one of our commanders, to be announced with the next flush. A slot that is already
+        waiting for the flush, or whose commander was given up on, is ignored
+        """
+        if slot in self.commanded and slot not in self.decided:
+            self.decided.add(slot)
+            self.unannounced.append(slot)
+            if not self.flush_timer:
+                self.flush_timer = self.set_timer(
+                    DECISION_FLUSH_INTERVAL, self.flush_decisions
+                )
+        self.commanding.discard(slot)
+        self.command_waiting()
+
+    def command_waiting(self):
+        """
+        Drives the waiting proposals, lowest slot first, while fewer than max_commanders are running and their slots
+        are within the horizon
+        """
+        for slot in sorted(self.waiting):
+            if (
+                not self.active
+                or len(self.commanding) >= self.max_commanders
+                or not self.membership.known(slot)
+            ):
+                break
+            sender, proposal = self.waiting.pop(slot)
+            self.do_propose(sender, slot, proposal)
+
+    def wait(self, sender, slot: int, proposal: Proposal):
+        """
+        Holds a proposal until it can be commanded, retrying periodically while any is past the horizon
+        """
+        self.waiting.setdefault(slot, (sender, proposal))
+        self.node.network.metrics.inc("proposals_waiting", node=self.node.address)
+        if not self.waiting_timer and not self.membership.known(slot):
+            self.waiting_timer = self.set_timer(
+                DECISION_FLUSH_INTERVAL, self.retry_waiting
+            )
+
+    def retry_waiting(self):
+        """
+        Drives the proposals that have come within the horizon since they started waiting
+        """
+        self.waiting_timer = None
+        self.command_waiting()
+        if self.waiting and not self.membership.known(max(self.waiting)):
+            self.waiting_timer = self.set_timer(
+                DECISION_FLUSH_INTERVAL, self.retry_waiting
+            )
+
+    def flush_decisions(self):
+        """
+        Announces the collected decisions to all peers, one DecisionRange per run of consecutive slots decided at the
+        same ballot, sends them to the learners, and then forgets them along with the proposals the replica has committed
+        """
+        self.flush_timer = None
+        slots, self.unannounced = sorted(self.unannounced), []
+        first = last = slots[0]
+        for slot in slots[1:] + [None]:
+            if slot == last + 1 and self.commanded[slot] == self.commanded[last]:
+                last = slot
+                continue
+            self.node.send(
+                self.membership.everyone(),
+                DecisionRange(
+                    first_slot=first, last_slot=last, ballot_num=self.commanded[first]
+                ),
+            )
+            self.broadcast_at = self.node.network.now
+            first = last = slot
+        for slot in slots:
+            if self.learners:
+                self.node.send(
+                    self.learners, Decision(slot=slot, proposal=self.proposals[slot])
+                )
+            del self.commanded[slot]
+        self.decided.difference_update(slots)
+        if self.membership.slot is not None:
+            self.proposals.truncate(self.membership.slot)
+
+    def do_subscribe(self, sender):
+        """
+        Sends decisions to a learner from now on
+        """
+        if sender not in self.learners:
+            self.logger.info(f"sending decisions to learner {sender}")
+            self.learners.append(sender)
 
     def do_preempted(self, sender, slot, preempted_by):
         """
@@ -93,31 +311,73 @@ class Leader(Role):
         """
         if not slot:  # from the scout
             self.scouting = False
-        self.logger.info(f"leader preempted by {preempted_by.leader}. Sender: {sender}")
+        self.commanding.discard(slot)
+        self.waiting.clear()
+        preempted_by_leader = (
+            self.membership.address(preempted_by.leader) if preempted_by else None
+        )
+        self.logger.info(f"leader preempted by {preempted_by_leader}. Sender: {sender}")
+        self.node.network.metrics.inc("preemptions", node=self.node.address)
         self.active = False
         self.ballot_num = Ballot(
             (preempted_by or self.ballot_num).n + 1, self.ballot_num.leader
         )
+        # only the decided slots still need the ballot they were commanded at, to be announced
+        self.commanded = {slot: self.commanded[slot] for slot in self.decided}
+        self.follow(preempted_by_leader)
 
     def do_propose(self, sender, slot: int, proposal: Proposal):
         """
         Sends a proposal
         """
-        if slot not in self.proposals:
-            if self.active:
-                self.proposals[slot] = proposal
+        if self.membership.slot is not None and slot < self.membership.slot:
+            # the replica on this node answers with the decision, and the proposal may be gone
+            self.logger.debug(f"got PROPOSE from {sender} for committed slot {slot} - ignored")
+        elif slot in self.decided:
+            # the sender missed this decision
+            self.node.send([sender], Decision(slot=slot, proposal=self.proposals[slot]))
+        # a slot that was adopted, or whose commander was preempted, is driven again with the proposal already held
+        elif self.commanded.get(slot) != self.ballot_num:
+            if self.active and not self.membership.known(slot):
+                self.logger.info(
+                    f"got PROPOSE from {sender} for slot {slot} past the horizon - waiting"
+                )
+                self.wait(sender, slot, proposal)
+            elif (
+                self.active
+                and self.membership.peers_at(slot) not in self.adopted_configs
+            ):
+                self.logger.info(
+                    f"got PROPOSE from {sender} for slot {slot} under new peers - scouting"
+                )
+                self.active = False
+                self.spawn_scout()
+            elif self.active and len(self.commanding) >= self.max_commanders:
+                self.logger.info(
+                    f"got PROPOSE from {sender} for slot {slot} with every commander busy - waiting"
+                )
+                self.wait(sender, slot, proposal)
+            elif self.active:
+                self.proposals.setdefault(slot, self.node.interner.intern(proposal))
                 self.logger.info(f"spawning commander for slot {slot} from {sender}")
                 self.spawn_commander(self.ballot_num, slot)
+            elif (
+                self.leader_hint not in (None, sender)
+                and self.node.network.now < self.leader_hint_expires
+            ):
+                self.logger.info(
+                    f"got PROPOSE from {sender} when not active - to {self.leader_hint}"
+                )
+                self.node.send(
+                    [self.leader_hint], Propose(slot=slot, proposal=proposal)
+                )
+            elif not self.scouting and not self.prevoting:
+                self.logger.info(
+                    f"got PROPOSE from {sender} when not active - holding a pre-vote"
+                )
+                self.spawn_prevoter()
             else:
-                if not self.scouting:
-                    self.logger.info(
-                        f"got PROPOSE from {sender} when not active - scouting"
-                    )
-                    self.spawn_scout()
-                else:
-                    self.logger.info(
-                        f"got PROPOSE from {sender} while scouting; ignored"
-                    )
+                self.logger.info(f"got PROPOSE from {sender} while electing; ignored")
         else:
             self.logger.info(
                 f"got PROPOSE from {sender} for a slot already being proposed"
@@ -0,0 +1,71 @@
+"""
+PreVoter role
+"""
+from typing import Dict, List, Optional, Set
+
+# pylint: disable-next=relative-beyond-top-level)
+from ...entities.data_types import Ballot
+
+# pylint: disable-next=relative-beyond-top-level)
+from ...entities.messages_types import PreVote, PreVoted
+
+# pylint: disable-next=relative-beyond-top-level)
+from ...constants import PREPARE_RETRANSMIT
+from . import Role
+from ..node import Node
+from ..retransmitter import Retransmitter
+
+
+class PreVoter(Role):
+    """
+    Before an inactive leader starts Phase 1, it spawns a pre-voter to ask its peers whether they would follow it. The
+    pre-voter sends (and re-sends, if necessary) a PreVote, and each peer's replica grants it only if it has no leader,
+    already follows the candidate, or has stopped hearing from its leader. Acceptors are not involved, so a pre-vote
+    changes no ballot and cannot preempt anyone.
+
+    Once a majority has granted the pre-vote, the pre-voter tells the leader with a PreVoted message and the leader
+    spawns a scout. Once so many peers have refused that a majority can no longer grant it, the PreVoted carries the
+    leader most of them follow instead, so that a node that only briefly lost touch with a healthy leader goes back to
+    it rather than disrupting it with a higher ballot.
+    """
+
+    def __init__(self, node: Node, ballot_num: Ballot, peers: List) -> None:
+        super().__init__(node)
+        self.ballot_num = ballot_num
+        self.peers = peers
+        self.quorum = len(peers) // 2 + 1
+        self.granted: Set[str] = set()
+        self.refused: Dict[str, Optional[str]] = {}
+        self.retransmitter = Retransmitter(
+            self, PreVote(ballot_num=ballot_num), peers, PREPARE_RETRANSMIT
+        )
+
+    # pylint: disable-next=missing-function-docstring
+    def start(self):
+        self.retransmitter.start()
+
+    # pylint: disable-next=missing-function-docstring
+    def do_prevotereply(self, sender, ballot_num: Ballot, granted: bool, leader):
+        if ballot_num != self.ballot_num:
+            return
+        self.retransmitter.ack(sender)
+        if granted:
+            self.granted.add(sender)
+            self.refused.pop(sender, None)
+        else:
+            self.refused[sender] = leader
+            self.granted.discard(sender)
+
+        if len(self.granted) >= self.quorum:
+            self.finish(True, None)
+        elif len(self.refused) > len(self.peers) - self.quorum:
+            leaders = sorted(addr for addr in self.refused.values() if addr)
+            leader = max(leaders, key=leaders.count) if leaders else None
+            self.finish(False, leader)
+
+    # pylint: disable-next=missing-function-docstring
+    def finish(self, granted: bool, leader: Optional[str]):
+        self.logger.info(f"pre-vote {'granted' if granted else 'refused'}")
+        self.node.send([self.node.address], PreVoted(granted=granted, leader=leader))
+        self.retransmitter.cancel()
+        self.stop()
@@ -1,18 +1,41 @@
 """
 Replica Role
 """
-from typing import Dict, Callable, List
+from collections import OrderedDict
+from typing import Dict, Callable, List, Optional, Tuple
 
 # pylint: disable-next=relative-beyond-top-level)
-from ...entities.data_types import Proposal
+from ...entities.data_types import Proposal, Reconfigure
 
 # pylint: disable-next=relative-beyond-top-level)
-from ...entities.messages_types import Propose, Invoked, Welcome
+from ...entities.messages_types import (
+    Propose,
+    Invoked,
+    Overloaded,
+    Welcome,
+    Decision,
+    DecisionRequest,
+    PreVoteReply,
+    Subscribe,
+    Expired,
+)
 
 # pylint: disable-next=relative-beyond-top-level)
-from ...constants import LEADER_TIMEOUT
+from ...constants import (
+    ALPHA,
+    LEADER_TIMEOUT,
+    CATCHUP_INTERVAL,
+    NOOP_PROPOSAL,
+    MAX_OUTSTANDING_SLOTS,
+    MAX_PENDING_INVOKES,
+    OVERLOAD_RETRY_AFTER,
+)
 from . import Role
 from ..node import Node
+from ..membership import Membership
+from ..sessions import EXPIRED, UNKNOWN, SessionTable
+from ..slot_log import SlotLog
+from ..apply import ApplyPipeline
 
 
 # pylint: disable-next=too-many-instance-attributes
@@ -21,8 +44,50 @@ class Replica(Role):
     Replica has the following roles to play
     - Making new proposals;
     - Invoking the local state machine when proposals are decided;
-    - Tracking the current leader; and
-    - Adding newly started nodes to the cluster.
+    - Tracking the current leader;
+    - Adding newly started nodes to the cluster;
+    - Catching up on decisions it missed; and
+    - Tracking the membership of the cluster.
+
+    A replica suspects its leader once it has not heard from it within the leader timeout, and only then grants the
+    pre-votes of other nodes; heartbeats from an active leader end the suspicion, even if the replica had moved on to
+    the next peer. The leader's Accept and DecisionRange messages count as heartbeats, and each one only pushes back
+    the deadline of the leader timeout: its timer is re-armed when it fires early rather than replaced every time.
+
+    Every CATCHUP_INTERVAL, a replica that holds decisions beyond a slot it has not heard the decision for asks its
+    peers in turn for the missing slots with a DecisionRequest. Replicas answer DecisionRequests from their decisions,
+    including those coming from acceptors that could not resolve a DecisionRange.
+
+    A committed proposal whose input is a Reconfigure changes the peers of the cluster from ALPHA slots later (see
+    Membership). Its caller gets the new peers as output. A replica is welcomed with the configurations of the cluster
+    so far; without them, the membership is rebuilt from the decisions it is given. Nodes are welcomed once they are
+    peers of the latest configuration, so a node is added by committing a Reconfigure that includes it and then
+    starting its Bootstrap.
+
+    A learner replica runs on a node without an acceptor or leader, so it serves reads of the state without counting
+    towards any quorum. It is welcomed in answer to a Learn rather than a Join, and asks every peer with a Subscribe to
+    send it decisions and heartbeats, again whenever it has not heard from a leader within the leader timeout.
+
+    Reads (see read) are evaluated against the local state without any message to the leader, on learners and voting
+    replicas alike. They see the state as of the last slot this replica applied, which lags the cluster by the
+    decisions it has not received or applied yet, so a read may miss a write that was already answered elsewhere.
+
+    Committed requests are recorded in a SessionTable, which answers retried Invokes with the cached output and keeps
+    a request that was decided twice from being executed twice. A retry whose output the session no longer holds is
+    answered with Expired. Proposals are forgotten once they are committed.
+
+    Admission is bounded: once max_outstanding slots are proposed or decided ahead of the slot being committed, new
+    invokes wait in a queue, in arrival order, and are proposed as slots are committed. Once max_pending invokes are
+    waiting, further ones are rejected straight away with an Overloaded response telling the caller when to retry.
+
+    When a decision makes several slots ready to commit and the state machine has an execute_batch method (see
+    ParallelExecution), they are executed as one batch.
+
+    With an apply_queue_size, decided proposals are executed by an ApplyPipeline on its own thread instead, and Invoked
+    responses are sent as results come back, so a slow state machine cannot delay heartbeats, Accepted replies or
+    leader timeouts. Joining nodes are welcomed once the pipeline has drained, so that the state they receive matches
+    the slot. It is off by default, which keeps simulations deterministic; enable it by passing
+    partial(Replica, apply_queue_size=...) as Bootstrap's replica.
     """
 
     # pylint: disable-next=missing-function-docstring
@@ -35,95 +100,283 @@ class Replica(Role):
         slot,
         decisions: Dict[int, Proposal],
         peers: List,
+        apply_queue_size: Optional[int] = None,
+        configs: Optional[List[Tuple[int, List[str]]]] = None,
+        learner: bool = False,
+        max_outstanding: int = MAX_OUTSTANDING_SLOTS,
+        max_pending: int = MAX_PENDING_INVOKES,
+        directory: Optional[List[str]] = None,
     ) -> None:
         super().__init__(node)
         self.execute_fn = execute_fn
         self.state = state
         self.slot = slot
-        self.decisions = decisions
+        self.decisions = (
+            decisions if isinstance(decisions, SlotLog) else SlotLog(decisions)
+        )
         self.peers = peers
-        self.proposals: Dict[int, Proposal] = {}
+        self.membership = Membership(peers, slot, configs, directory)
+        self.sessions = SessionTable()
+        for decided_slot, decided in self.decisions.range(last=slot - 1):
+            if decided.caller is not None:
+                self.sessions.commit(decided.caller, decided.client_id, decided_slot)
+            if configs is None and isinstance(decided.input, Reconfigure):
+                self.membership.reconfigure(decided_slot, decided.input.peers)
+        # proposals not committed yet, and the slot of each by caller and client id
+        self.proposals = SlotLog()
+        self.proposal_slots: Dict[Tuple[str, int], int] = {}
         self.next_slot: int = slot
+        # invokes waiting for the number of outstanding slots to drop, by caller and client id
+        self.pending: "OrderedDict[Tuple[str, int], Proposal]" = OrderedDict()
+        self.max_outstanding = max_outstanding
+        self.max_pending = max_pending
         self.latest_leader = None
         self.latest_leader_timeout = None
+        self.latest_leader_deadline = 0.0
+        self.leader_suspected = False
+        self.catchup_turn = 0
+        self.set_timer(CATCHUP_INTERVAL, self.catchup)
+        for name, value_fn in self.gauges():
+            node.network.metrics.gauge(name, value_fn, node=node.address)
+        self.pipeline: Optional[ApplyPipeline] = None
+        if apply_queue_size:
+            self.pipeline = ApplyPipeline(
+                node, execute_fn, state, self.applied, apply_queue_size
+            )
+        self.pending_welcomes: List[str] = []
+        self.learner = learner
+        if learner:
+            self.subscribe()
 
-    # pylint: disable-next=missing-function-docstring)
+    # pylint: disable-next=missing-function-docstring
     def do_invoke(self, sender, caller, client_id, input_value):
         self.logger.info(
             f"Invoke received. Caller: {caller}, client_id: {client_id}, input_value: {input_value} sender {sender}"
         )
+        committed, output = self.sessions.lookup(caller, client_id)
+        if committed:
+            # a retry: answer it from the session, unless the output is still being computed
+            if output is EXPIRED:
+                self.node.send([caller], Expired(client_id=client_id))
+            elif output is not UNKNOWN:
+                self.node.send([caller], Invoked(client_id=client_id, output=output))
+            return
         # making proposals
         proposal = Proposal(caller=caller, client_id=client_id, input=input_value)
-        slot = next((s for s, p in self.proposals.items() if p == proposal), None)
+        slot = self.proposal_slots.get((caller, client_id))
+        if slot is None and not self.admits():
+            self.enqueue(proposal)
+            return
         # propose or re-propose if this proposal already has a slot
         self.propose(proposal, slot)
 
+    def admits(self) -> bool:
+        """Whether a new invoke may be proposed now, rather than wait behind the queued ones"""
+        return not self.pending and self.next_slot - self.slot < self.max_outstanding
+
+    def enqueue(self, proposal: Proposal):
+        """Queue an invoke until a slot is free for it, or reject it if the queue is full"""
+        key = (proposal.caller, proposal.client_id)
+        if key in self.pending:
+            return  # a retry of a queued invoke
+        if len(self.pending) >= self.max_pending:
+            self.logger.info(f"overloaded, rejecting {proposal}")
+            self.node.network.metrics.inc("invokes_rejected", node=self.node.address)
+            self.node.send(
+                [proposal.caller],
+                Overloaded(
+                    client_id=proposal.client_id, retry_after=OVERLOAD_RETRY_AFTER
+                ),
+            )
+            return
+        self.pending[key] = proposal
+
+    def propose_pending(self):
+        """Propose queued invokes while the number of outstanding slots allows"""
+        while self.pending and self.next_slot - self.slot < self.max_outstanding:
+            _, proposal = self.pending.popitem(last=False)
+            self.propose(proposal)
+
     def propose(self, proposal: Proposal, slot=None):
         """Send (or resend if slot is specified) a proposal to the leader"""
         if not slot:
             slot, self.next_slot = self.next_slot, self.next_slot + 1
-        self.proposals[slot] = proposal
+        proposal = self.proposals[slot] = self.node.interner.intern(proposal)
+        if proposal.caller is not None:
+            self.proposal_slots[(proposal.caller, proposal.client_id)] = slot
         # find a leader we think is working - either the latest we know of, or
         # ourselves(which may trigger a scout to make use the leader)
         leader = self.latest_leader or self.node.address
         self.logger.info(f"proposing {proposal} at slot {slot} to leader {leader}")
         self.node.send([leader], Propose(slot=slot, proposal=proposal))
 
-    # pylint: disable-next=missing-function-docstring)
+    # pylint: disable-next=missing-function-docstring
     def do_decision(self, sender, slot, proposal: Proposal):
         self.logger.info(
             f"Decision received. Slot: {slot}, proposal: {proposal} from sender {sender}"
         )
 
-        # handling deciding proposals
-        assert not self.decisions.get(
+        # handling deciding proposals. Decided slots may wait for room in the apply pipeline
+        assert self.pipeline or not self.decisions.get(
             self.slot, None
         ), "next slot to commit is already decided"
 
         if slot in self.decisions:
             assert (
-                self.decisions[slot] == Proposal
+                self.decisions[slot] == proposal
             ), f"slot {slot} already decided with {self.decisions[slot]}"
             return
 
-        self.decisions[slot] = proposal
+        self.decisions[slot] = self.node.interner.intern(proposal)
         self.next_slot = max(self.next_slot, slot + 1)
 
-        # re-propose our proposal in a new slot if it lost its slot and was not a no-op
+        # re-propose our proposal in a new slot if it lost its slot and was not a no-op. The lost slot is forgotten so
+        # that retransmitted invokes re-propose it in its new slot
         our_proposal = self.proposals.get(slot)
-        if (
-            our_proposal is not None
-            and our_proposal != proposal
-            and our_proposal.caller
-        ):
-            self.propose(our_proposal)
+        if our_proposal is not None and our_proposal != proposal:
+            del self.proposals[slot]
+            if our_proposal.caller:
+                self.propose(our_proposal)
+
+        self.commit_ready()
 
-        # execute any pending decided proposals
+    def commit_ready(self):
+        """Execute any pending decided proposals, or hand them to the apply pipeline"""
+        if self.pipeline:
+            self.submit_ready()
+            return
+
+        ready = []
         while True:
+            commit_proposal = self.decisions.get(self.slot)
+            if not commit_proposal:
+                break  # not yet decided
+            ready.append((self.slot, commit_proposal))
+            self.forget(self.slot)
+            self.slot += 1
+        self.membership.slot = self.slot
+
+        execute_batch = getattr(self.execute_fn, "execute_batch", None)
+        if execute_batch and len(ready) > 1:
+            self.commit_batch(ready, execute_batch)
+        else:
+            for commit_slot, commit_proposal in ready:
+                self.commit(commit_slot, commit_proposal)
+        self.propose_pending()
+
+    def submit_ready(self):
+        """Hand decided proposals to the apply pipeline while it has room and no joining node is waiting"""
+        while not self.pipeline.full() and not self.pending_welcomes:
             commit_proposal = self.decisions.get(self.slot)
             if not commit_proposal:
                 break  # not yet decided
             commit_slot, self.slot = self.slot, self.slot + 1
+            self.membership.slot = self.slot
+            self.forget(commit_slot)
+            if self.is_duplicate(commit_slot, commit_proposal):
+                continue
+            self.logger.info(f"committing {commit_proposal} at slot {commit_slot}")
+            if isinstance(commit_proposal.input, Reconfigure):
+                self.reconfigure(commit_slot, commit_proposal)
+            elif commit_proposal.caller is not None:
+                self.pipeline.submit(commit_slot, commit_proposal)
+        self.propose_pending()
 
-            self.commit(commit_slot, commit_proposal)
+    def applied(self, slot: int, proposal: Proposal, state, output):
+        """Called on the protocol thread when the apply pipeline has executed a proposal, unless it was stopped since"""
+        if not self.running:
+            return
+        self.logger.debug(f"applied {proposal} at slot {slot}")
+        self.state = state
+        self.sessions.output(proposal.caller, proposal.client_id, output)
+        self.node.send(
+            [proposal.caller], Invoked(client_id=proposal.client_id, output=output)
+        )
+        if self.pipeline.idle() and self.pending_welcomes:
+            welcomes, self.pending_welcomes = self.pending_welcomes, []
+            self.node.send(
+                welcomes,
+                Welcome(
+                    state=self.state,
+                    slot=self.slot,
+                    decisions=self.decisions,
+                    configs=self.membership.configs,
+                    directory=self.membership.directory,
+                ),
+            )
+        self.submit_ready()
+
+    def forget(self, slot: int):
+        """Drop our proposal for a slot that is being committed"""
+        proposal = self.proposals.pop(slot, None)
+        if proposal is not None and proposal.caller is not None:
+            self.proposal_slots.pop((proposal.caller, proposal.client_id), None)
+
+    def is_duplicate(self, slot: int, proposal: Proposal) -> bool:
+        """Whether the proposal was already committed, recording it in its caller's session otherwise"""
+        if proposal.caller is None or self.sessions.commit(
+            proposal.caller, proposal.client_id, slot
+        ):
+            return False
+        self.logger.info(f"not committing duplicate proposal {proposal}, slot {slot}")
+        return True
 
     def commit(self, slot: int, proposal: Proposal):
         """Actually commit a proposal that is decided and in sequence"""
-        decided_proposals = [p for s, p in self.decisions.items() if s < slot]
-        if proposal in decided_proposals:
-            self.logger.info(
-                f"not committing duplicate proposal {proposal}, slot {slot}"
-            )
-            return  # duplicate
+        if self.is_duplicate(slot, proposal):
+            return
 
         self.logger.info(f"committing {proposal} at slot {slot}")
-        if proposal.caller is not None:
+        if isinstance(proposal.input, Reconfigure):
+            self.reconfigure(slot, proposal)
+        elif proposal.caller is not None:
             # perform a client operation
             self.state, output = self.execute_fn(self.state, proposal.input)
+            self.sessions.output(proposal.caller, proposal.client_id, output)
             self.node.send(
                 [proposal.caller], Invoked(client_id=proposal.client_id, output=output)
             )
 
+    def commit_batch(self, ready: List[Tuple[int, Proposal]], execute_batch: Callable):
+        """
+        Commit a run of decided proposals at once, letting the state machine execute commuting commands concurrently.
+        Invoked responses are still sent in slot order
+        """
+        commands = []
+        for slot, proposal in ready:
+            if self.is_duplicate(slot, proposal):
+                continue
+            self.logger.info(f"committing {proposal} at slot {slot}")
+            if isinstance(proposal.input, Reconfigure):
+                self.reconfigure(slot, proposal)
+            elif proposal.caller is not None:
+                commands.append(proposal)
+
+        if not commands:
+            return
+        self.state, outputs = execute_batch(
+            self.state, [proposal.input for proposal in commands]
+        )
+        for proposal, output in zip(commands, outputs):
+            self.sessions.output(proposal.caller, proposal.client_id, output)
+            self.node.send(
+                [proposal.caller], Invoked(client_id=proposal.client_id, output=output)
+            )
+
+    def reconfigure(self, slot: int, proposal: Proposal):
+        """Record a committed change of peers and answer its caller"""
+        peers = list(proposal.input.peers)
+        self.logger.info(f"peers change to {peers} from slot {slot + ALPHA}")
+        self.membership.reconfigure(slot, peers)
+        self.sessions.output(proposal.caller, proposal.client_id, peers)
+        self.node.send(
+            [proposal.caller], Invoked(client_id=proposal.client_id, output=peers)
+        )
+        if self.latest_leader == self.node.address:
+            # fill the window with no-ops, so that the new peers take over even if the cluster is idle
+            while self.next_slot < slot + ALPHA:
+                self.propose(NOOP_PROPOSAL)
+
     # pylint: disable-next=missing-function-docstring)
     def do_adopted(self, sender, ballot_num, accepted_proposals):
         self.logger.info(
@@ -133,38 +386,167 @@ class Replica(Role):
         self.latest_leader = self.node.address
         self.leader_alive()
 
-    # pylint: disable-next=missing-function-docstring)
+    # pylint: disable-next=missing-function-docstring
     def do_accepting(self, sender, leader):
         self.logger.info(f"Accepting from sender {sender}")
         self.latest_leader = leader
         self.leader_alive()
 
-    # pylint: disable-next=missing-function-docstring)
+    # pylint: disable-next=missing-function-docstring
     def do_active(self, sender):
+        if self.latest_leader is None or self.leader_suspected:
+            # a node that joined after the leader scouted learns of it from its heartbeats, and a node that gave up on
+            # a leader goes back to it if it is still active
+            self.latest_leader = sender
         if sender != self.latest_leader:
             return
         self.leader_alive()
 
     # pylint: disable-next=missing-function-docstring)
+    def do_accept(self, sender, ballot_num, slot, proposal):
+        self.do_active(sender)
+
+    # pylint: disable-next=missing-function-docstring)
+    def do_decisionrange(self, sender, first_slot, last_slot, ballot_num):
+        self.do_active(sender)
+
+    # pylint: disable-next=missing-function-docstring)
+    def do_prevote(self, sender, ballot_num):
+        granted = self.leader_suspected or self.latest_leader in (None, sender)
+        self.node.send(
+            [sender],
+            PreVoteReply(
+                ballot_num=ballot_num, granted=granted, leader=self.latest_leader
+            ),
+        )
+
+    # pylint: disable-next=missing-function-docstring
     def leader_alive(self):
-        if self.latest_leader_timeout:
-            self.latest_leader_timeout.cancel()
-
-        # pylint: disable-next=missing-function-docstring)
-        def reset_leader():
-            idx = self.peers.index(self.latest_leader)
-            self.latest_leader = self.peers[(idx + 1) % len(self.peers)]
-            self.logger.debug(
-                f"leader timed out; trying the next one, {self.latest_leader}"
-            )
+        self.leader_suspected = False
+        # allow for a heartbeat interval plus the retransmission timeout of the leader, but never less than
+        # LEADER_TIMEOUT so that a single lost heartbeat does not start an election
+        timeout = max(
+            LEADER_TIMEOUT,
+            LEADER_TIMEOUT / 2.0
+            + self.node.rtt.rto(self.latest_leader, LEADER_TIMEOUT / 2.0),
+        )
+        self.latest_leader_deadline = self.node.network.now + timeout
+        if self.latest_leader_timeout is None:
+            self.latest_leader_timeout = self.set_timer(timeout, self.leader_timeout)
 
-        self.latest_leader_timeout = self.set_timer(LEADER_TIMEOUT, reset_leader)
+    # pylint: disable-next=missing-function-docstring)
+    def leader_timeout(self):
+        remaining = self.latest_leader_deadline - self.node.network.now
+        if remaining > 0:
+            self.latest_leader_timeout = self.set_timer(remaining, self.leader_timeout)
+            return
+        self.latest_leader_timeout = None
+        self.reset_leader()
 
     # pylint: disable-next=missing-function-docstring)
+    def reset_leader(self):
+        self.leader_suspected = True
+        peers = self.membership.latest()
+        if self.latest_leader in peers:
+            idx = peers.index(self.latest_leader)
+            self.latest_leader = peers[(idx + 1) % len(peers)]
+        else:
+            self.latest_leader = peers[0]
+        self.logger.debug(
+            f"leader timed out; trying the next one, {self.latest_leader}"
+        )
+
+    def gauges(self) -> List[Tuple[str, Callable[[], float]]]:
+        """
+        The gauges the replica registers while it runs: the slots proposed or decided but not yet committed, and the
+        invokes waiting to be proposed
+        """
+        return [
+            ("replica_slot_gap", self.slot_gap),
+            ("replica_pending_invokes", self.pending_invokes),
+        ]
+
+    # pylint: disable-next=missing-function-docstring
+    def slot_gap(self) -> int:
+        return self.next_slot - self.slot
+
+    # pylint: disable-next=missing-function-docstring
+    def pending_invokes(self) -> int:
+        return len(self.pending)
+
+    def catchup(self):
+        """Ask a peer for the decisions of the slots missing before the latest decision"""
+        latest = self.decisions.last(default=0)
+        missing = [s for s in range(self.slot, latest) if s not in self.decisions]
+        peers = [peer for peer in self.membership.latest() if peer != self.node.address]
+        if missing and peers:
+            peer = peers[self.catchup_turn % len(peers)]
+            self.catchup_turn += 1
+            self.logger.info(f"catching up on slots {missing} from {peer}")
+            self.node.send([peer], DecisionRequest(slots=missing))
+        self.set_timer(CATCHUP_INTERVAL, self.catchup)
+
+    def do_decisionrequest(self, sender, slots: List[int]):
+        """Send the decisions held for the requested slots, walking the log over their span in slot order"""
+        if not slots:
+            return
+        wanted = set(slots)
+        for slot, proposal in self.decisions.range(min(wanted), max(wanted)):
+            if slot in wanted:
+                self.node.send([sender], Decision(slot=slot, proposal=proposal))
+
+    def do_propose(self, sender, slot: int, proposal: Proposal):
+        """Answer a proposal for a slot committed here with its decision, which the sender missed"""
+        if slot < self.slot and slot in self.decisions:
+            self.node.send([sender], Decision(slot=slot, proposal=self.decisions[slot]))
+
+    # pylint: disable-next=missing-function-docstring
     def do_join(self, sender):
-        if sender in self.peers:
+        if sender in self.membership.latest():
             # adding new cluster members
-            self.node.send(
-                [sender],
-                Welcome(state=self.state, slot=self.slot, decisions=self.decisions),
+            self.welcome(sender)
+
+    # pylint: disable-next=missing-function-docstring
+    def do_learn(self, sender):
+        self.welcome(sender)
+
+    def welcome(self, sender):
+        """Send the state and decisions to a joining node"""
+        if self.pipeline and not self.pipeline.idle():
+            # the state is still being updated; welcome the node once it has caught up with the slot
+            if sender not in self.pending_welcomes:
+                self.pending_welcomes.append(sender)
+            return
+        self.node.send(
+            [sender],
+            Welcome(
+                state=self.state,
+                slot=self.slot,
+                decisions=self.decisions,
+                configs=self.membership.configs,
+                directory=self.membership.directory,
+            ),
+        )
+
+    def subscribe(self):
+        """Ask the leaders for decisions, unless one has been heard from recently"""
+        if self.node.network.now >= self.latest_leader_deadline:
+            self.node.send(self.membership.latest(), Subscribe())
+        self.set_timer(LEADER_TIMEOUT, self.subscribe)
+
+    def read(self, fn: Callable):
+        """
+        Returns fn applied to the state as of the last slot applied, which may be stale; only called from the protocol
+        thread
+        """
+        return fn(self.state)
+
+    # pylint: disable-next=missing-function-docstring
+    def stop(self):
+        if self.pipeline:
+            self.pipeline.stop()
+        for name, value_fn in self.gauges():
+            self.node.network.metrics.remove_gauge(
+                name, value_fn, node=self.node.address
             )
+        super().stop()
@@ -1,52 +1,119 @@
 """
 Requester role
 """
-from typing import Callable, Optional
-from itertools import count
+from typing import Callable, Tuple
 
 # pylint: disable-next=relative-beyond-top-level)
 from ...entities.messages_types import Invoke
 
 # pylint: disable-next=relative-beyond-top-level)
-from ...constants import INVOKE_RETRANSMIT
-from ..timer import Timer
+from ...constants import INVOKE_RETRANSMIT, RETRANSMIT_JITTER
 from . import Role
 from ..node import Node
+from ..retransmitter import Retransmitter
+
+
+class ExpiredError(Exception):
+    """
+    The request was committed, but its output was dropped from the caller's session before the caller got it (see
+    SessionTable)
+    """
+
+
+class OverloadedError(Exception):
+    """
+    The cluster rejected a request as overloaded; it may be retried after retry_after seconds
+    """
+
+    def __init__(self, retry_after: float) -> None:
+        super().__init__(f"cluster overloaded, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+def invoke_retransmitter(role: Role, n) -> Tuple[int, Retransmitter]:
+    """
+    Draws a client id from the role's node for a request to execute n, returning it with a Retransmitter for the
+    request's Invoke to the local replica
+    """
+    node = role.node
+    client_id = node.next_client_id
+    node.next_client_id += 1
+    retransmitter = Retransmitter(
+        role,
+        Invoke(caller=node.address, client_id=client_id, input_value=n),
+        [node.address],
+        INVOKE_RETRANSMIT,
+        rtt=node.invoke_rtt,
+    )
+    return client_id, retransmitter
 
 
 class Requester(Role):
     """
     The requester role manages a request to the distributed state machine.
     The role class simply sends Invoke messages to the local replica until it receives a corresponding Invoked.
-    """
+    Client ids are drawn from the node, so that they only depend on the requests made on it.
+    When the replica answers with Expired, the request was executed but its output is lost, so the requester gives up
+    and calls back with an ExpiredError.
 
-    client_ids = count(start=100000)
+    When the replica answers with Overloaded, the requester stops retransmitting and tries again once the retry_after
+    it was given has passed, stretched by a random jitter so that rejected requesters do not all come back together.
+    The retry gets a new client id: the rejected request never reached the log, and a new id keeps a caller's client
+    ids in the order the replica admits them, as its session (see SessionTable) expects. A fail_fast requester gives
+    up instead, calling back with an OverloadedError.
+    """
 
     # pylint: disable-next=missing-function-docstring
-    def __init__(self, node: Node, n, callback: Callable) -> None:
+    def __init__(
+        self, node: Node, n, callback: Callable, fail_fast: bool = False
+    ) -> None:
         super().__init__(node)
-        self.invoke_timer: Optional[Timer] = None
-        self.client_id = next(self.client_ids)
         # pylint: disable-next=invalid-name
         self.n = n
         self.output = None
         self.callback = callback
+        self.fail_fast = fail_fast
+        self.started_at = None
+        self.client_id, self.retransmitter = invoke_retransmitter(self, n)
 
     # pylint: disable-next=missing-function-docstring
     def start(self):
-        self.node.send(
-            [self.node.address],
-            Invoke(
-                caller=self.node.address, client_id=self.client_id, input_value=self.n
-            ),
-        )
-        self.invoke_timer = self.set_timer(INVOKE_RETRANSMIT, self.start)
+        self.started_at = self.node.network.now
+        self.retransmitter.start()
 
     # pylint: disable-next=missing-function-docstring
     def do_invoked(self, sender, client_id, output):
         if client_id != self.client_id:
             return
         self.logger.debug(f"received output {output} from sender: {sender}")
-        self.invoke_timer.cancel()
+        self.retransmitter.ack(self.node.address)
+        self.node.network.metrics.observe(
+            "commit_latency_seconds", self.node.network.now - self.started_at
+        )
         self.callback(output)
         self.stop()
+
+    # pylint: disable-next=missing-function-docstring
+    def do_expired(self, sender, client_id):
+        if client_id != self.client_id:
+            return
+        self.logger.info(f"request {client_id} was committed but its output expired")
+        self.retransmitter.cancel()
+        self.callback(ExpiredError(f"the output of request {client_id} expired"))
+        self.stop()
+
+    # pylint: disable-next=missing-function-docstring
+    def do_overloaded(self, sender, client_id, retry_after):
+        if client_id != self.client_id:
+            return
+        self.logger.debug(f"overloaded, retrying after {retry_after}")
+        self.node.network.metrics.inc("requests_overloaded")
+        if self.fail_fast:
+            self.retransmitter.cancel()
+            self.callback(OverloadedError(retry_after))
+            self.stop()
+            return
+        self.retransmitter.cancel()
+        self.client_id, self.retransmitter = invoke_retransmitter(self, self.n)
+        jitter = 1 + RETRANSMIT_JITTER * self.node.network.rnd.random()
+        self.retransmitter.pause(retry_after * jitter)
@@ -1,7 +1,7 @@
 """
 Scout Node role
 """
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
 
 # pylint: disable-next=relative-beyond-top-level)
 from ...entities.data_types import Ballot, Proposal
@@ -13,6 +13,7 @@ from ...entities.messages_types import Prepare, Adopted, Preempted
 from ...constants import PREPARE_RETRANSMIT
 from . import Role
 from ..node import Node
+from ..retransmitter import Retransmitter
 
 
 class Scout(Role):
@@ -21,16 +22,28 @@ class Scout(Role):
     inactive. The scout sends(and re-sends, if necessary) a Prepare message, and collects Promise responses until it
     has heard from a majority of its peers or until it has been preempted. It communicates back to the leader with
     Adopted or Preempted, respectively.
+
+    While the cluster's membership is changing, the leader passes the configurations of the slots it may command, and
+    the scout waits for a majority of the peers of each of them.
     """
 
-    def __init__(self, node: Node, ballot_num: Ballot, peers: List) -> None:
+    def __init__(
+        self,
+        node: Node,
+        ballot_num: Ballot,
+        peers: List,
+        configs: Optional[List[List]] = None,
+    ) -> None:
         super().__init__(node)
         self.ballot_num = ballot_num
         self.accepted_proposals: Dict[int, Tuple[Ballot, Proposal]] = {}
         self.acceptors = set([])
         self.peers = peers
         self.quorum = len(peers) / 2 + 1
-        self.retransmit_timer = None
+        self.configs = configs or [peers]
+        self.retransmitter = Retransmitter(
+            self, Prepare(ballot_num=self.ballot_num), peers, PREPARE_RETRANSMIT
+        )
 
     # pylint: disable-next=missing-function-docstring
     def start(self):
@@ -39,8 +52,8 @@ class Scout(Role):
 
     # pylint: disable-next=missing-function-docstring
     def send_prepare(self):
-        self.node.send(self.peers, Prepare(ballot_num=self.ballot_num))
-        self.retransmit_timer = self.set_timer(PREPARE_RETRANSMIT, self.send_prepare)
+        # re-sent to the peers which have not promised yet
+        self.retransmitter.start()
 
     # pylint: disable-next=missing-function-docstring
     def update_accepted(self, accepted_proposals: Dict[int, Tuple[Ballot, Proposal]]):
@@ -49,6 +62,15 @@ class Scout(Role):
             if slot not in acc or acc[slot][0] < ballot_num:
                 acc[slot] = (ballot_num, proposal)
 
+    def adopted(self) -> bool:
+        """
+        Whether a majority of the peers of every configuration has promised
+        """
+        return all(
+            len(self.acceptors.intersection(config)) >= len(config) / 2 + 1
+            for config in self.configs
+        )
+
     # pylint: disable-next=missing-function-docstring
     def do_promise(
         self,
@@ -60,7 +82,8 @@ class Scout(Role):
             self.logger.info(f"got matching promise; need {self.quorum}")
             self.update_accepted(accepted_proposals)
             self.acceptors.add(sender)
-            if len(self.acceptors) >= self.quorum:
+            self.retransmitter.ack(sender)
+            if self.adopted():
                 # strip ballot numbers from self.accepted_proposals, now that it represents a majority
                 accepted_proposals = dict(
                     (s, p) for s, (b, p) in self.accepted_proposals.items()
@@ -73,6 +96,7 @@ class Scout(Role):
                         ballot_num=ballot_num, accepted_proposals=accepted_proposals
                     ),
                 )
+                self.retransmitter.cancel()
                 self.stop()
 
         else:
@@ -80,4 +104,5 @@ class Scout(Role):
             self.node.send(
                 [self.node.address], Preempted(slot=None, preempted_by=ballot_num)
             )
+            self.retransmitter.cancel()
             self.stop()
@@ -10,6 +10,7 @@ from ...entities.messages_types import Welcome
 from ...constants import JOIN_RETRANSMIT
 from . import Role
 from ..node import Node
+from ..membership import Membership
 from .bootstrap import Bootstrap
 
 
@@ -22,6 +23,7 @@ class Seed(Role):
     is restored can be challenging.
     In the Multi-Paxos case, the healed network would be hosting two clusters with different decisions for the same slot
     numbers.
+    The simulated network can reproduce this with Network.partition and Network.heal.
 
     To avoid this outcome, creating a new cluster is a user-specified operation. Exactly one node in the cluster runs
     the seed role, with the others running bootstrap as usual.
@@ -52,6 +54,11 @@ class Seed(Role):
         self.seen_peers = set([])
         self.exit_timer = None
 
+    def start(self):
+        """
+        Nothing to start: the seed waits for Join messages from its peers
+        """
+
     def do_join(self, sender):
         """
         Handles Join Process. This adds the sender to the already seen peers in the cluster
@@ -61,9 +68,17 @@ class Seed(Role):
             return
 
         # cluster is ready - welcome everyone
+        # in a fixed order, so that simulations do not depend on the hash seed
+        membership = Membership(self.peers)
         self.node.send(
-            list(self.seen_peers),
-            Welcome(state=self.initial_state, slot=1, decisions={}),
+            sorted(self.seen_peers),
+            Welcome(
+                state=self.initial_state,
+                slot=1,
+                decisions={},
+                configs=membership.configs,
+                directory=membership.directory,
+            ),
         )
 
         # stick around for long enough that we don't hear any new JOINs from newly formed cluster
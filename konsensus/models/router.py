@@ -0,0 +1,33 @@
+"""
+Router maps requests to consensus groups
+"""
+from bisect import bisect_right
+from typing import Any, Callable, Sequence
+
+
+class KeyRangeRouter:
+    """
+    Routes requests to consensus groups by key range.
+
+    key_fn(input_value) returns the key of a request, and split_keys are the sorted keys at which each group after the
+    first starts, so n split keys make n + 1 groups: group 0 owns the keys below split_keys[0], group i owns the keys
+    from split_keys[i - 1] up to split_keys[i], and the last group owns the rest.
+    """
+
+    def __init__(self, split_keys: Sequence, key_fn: Callable[[Any], Any]) -> None:
+        assert list(split_keys) == sorted(split_keys), "split keys must be sorted"
+        self.split_keys = list(split_keys)
+        self.key_fn = key_fn
+
+    @property
+    def groups(self) -> int:
+        """
+        Number of groups the key space is split into
+        """
+        return len(self.split_keys) + 1
+
+    def route(self, input_value) -> int:
+        """
+        Returns the group that owns the key of a request
+        """
+        return bisect_right(self.split_keys, self.key_fn(input_value))
@@ -0,0 +1,77 @@
+"""
+Round trip time estimation
+"""
+from typing import Dict, Optional, Union
+
+# pylint: disable-next=relative-beyond-top-level
+from ..constants import RTT_ALPHA, RTT_BETA, RTO_K, RTO_MIN, RTO_MAX
+
+
+class PeerRtt:
+    """
+    Round trip time state kept for a single peer
+    """
+
+    def __init__(self) -> None:
+        self.srtt: Optional[float] = None
+        self.rttvar: Optional[float] = None
+
+
+class RttEstimator:
+    """
+    Estimates a retransmission timeout for each peer in the style of TCP (RFC 6298).
+
+    Every round trip measured to a peer updates a smoothed round trip time (srtt) and its variance (rttvar). The
+    retransmission timeout is then srtt + k * rttvar, bounded by min_rto and max_rto, and doubled for every attempt
+    that has already expired without a response.
+
+    Peers that have not been measured yet use the default timeout given by the caller, which lets each role keep its
+    own *_RETRANSMIT constant as the initial value.
+
+    Callers are responsible for Karn's algorithm: round trips of retransmitted messages are ambiguous and must not
+    be sampled.
+    """
+
+    # pylint: disable-next=too-many-arguments
+    def __init__(
+        self,
+        alpha: float = RTT_ALPHA,
+        beta: float = RTT_BETA,
+        k: Union[int, float] = RTO_K,
+        min_rto: float = RTO_MIN,
+        max_rto: float = RTO_MAX,
+    ) -> None:
+        self.alpha = alpha
+        self.beta = beta
+        # pylint: disable-next=invalid-name
+        self.k = k
+        self.min_rto = min_rto
+        self.max_rto = max_rto
+        self.peers: Dict[str, PeerRtt] = {}
+
+    def sample(self, peer: str, rtt: float):
+        """
+        Records a measured round trip time to a peer
+        """
+        state = self.peers.setdefault(peer, PeerRtt())
+        if state.srtt is None:
+            state.srtt = rtt
+            state.rttvar = rtt / 2
+        else:
+            state.rttvar = (1 - self.beta) * state.rttvar + self.beta * abs(
+                state.srtt - rtt
+            )
+            state.srtt = (1 - self.alpha) * state.srtt + self.alpha * rtt
+
+    def rto(self, peer: str, default: float, attempt: int = 0) -> float:
+        """
+        Returns the retransmission timeout of a peer, falling back to default while the peer has not been measured.
+        attempt is the number of earlier transmissions of the same message that went unanswered
+        """
+        state = self.peers.get(peer)
+        if state is None:
+            base = default
+        else:
+            base = max(self.min_rto, state.srtt + self.k * state.rttvar)
+        # the backoff is capped by max_rto long before 2**64, which keeps the multiplication within float range
+        return min(self.max_rto, base * 2 ** min(attempt, 64))
@@ -0,0 +1,103 @@
+"""
+Sessions remember the requests a replica has committed for each client
+"""
+from collections import OrderedDict
+from typing import Any, Dict, Tuple
+
+# pylint: disable-next=relative-beyond-top-level
+from ..constants import SESSION_EXPIRY, SESSION_OUTPUTS
+
+# output of a request that was committed but whose output is not known, such as one committed before a node joined
+UNKNOWN = object()
+
+# output of a request that was committed, but whose output was dropped from its session to make room for later ones
+EXPIRED = object()
+
+
+class Session:
+    """
+    The requests committed for one caller: the outputs of the SESSION_OUTPUTS of them with the highest client ids, the
+    highest client id that has been dropped from those, and the slot the caller was last committed at
+    """
+
+    __slots__ = ("outputs", "floor", "last_slot")
+
+    def __init__(self, last_slot: int) -> None:
+        self.outputs: Dict[int, Any] = {}
+        self.floor = -1
+        self.last_slot = last_slot
+
+
+class SessionTable:
+    """
+    Deduplicates requests by caller and client id.
+
+    Each caller gets a session that caches the outputs of its latest requests, so a retried request is answered from
+    the cache without going through the log again, and a request decided twice is only executed once. A caller's
+    client ids only grow, so a request older than the cached ones has been committed before. Several requests of a
+    caller may be in flight at once, which is why more than the last output is kept: this holds as long as fewer than
+    SESSION_OUTPUTS later requests of a caller are committed while one of its requests is in flight. A retry of a request
+    whose output was dropped is looked up as EXPIRED: it cannot be executed again, and its output cannot be given, so
+    the replica tells the caller so instead of leaving it waiting.
+
+    Sessions of callers that have not been committed for SESSION_EXPIRY slots are dropped. The table only changes as
+    proposals are committed, in slot order, so every replica keeps the same sessions and makes the same choices; a
+    retry that arrives after its session expired is executed again.
+    """
+
+    def __init__(self) -> None:
+        # sessions by caller, least recently committed first
+        self.sessions: "OrderedDict[str, Session]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    def lookup(self, caller: str, client_id: int) -> Tuple[bool, Any]:
+        """
+        Returns whether a request was committed, and its output if it is still cached, EXPIRED if it was dropped, or
+        UNKNOWN
+        """
+        session = self.sessions.get(caller)
+        if session is None:
+            return False, None
+        if client_id in session.outputs:
+            return True, session.outputs[client_id]
+        if client_id <= session.floor:
+            return True, EXPIRED
+        return False, UNKNOWN
+
+    def commit(self, caller: str, client_id: int, slot: int) -> bool:
+        """
+        Records that a request is being committed at slot, returning False if it was committed before
+        """
+        self.expire(slot)
+        session = self.sessions.pop(caller, None) or Session(slot)
+        # re-inserted as the most recently committed
+        self.sessions[caller] = session
+        session.last_slot = slot
+        if client_id in session.outputs or client_id <= session.floor:
+            return False
+        session.outputs[client_id] = UNKNOWN
+        if len(session.outputs) > SESSION_OUTPUTS:
+            dropped = min(session.outputs)
+            del session.outputs[dropped]
+            session.floor = max(session.floor, dropped)
+        return True
+
+    def output(self, caller: str, client_id: int, output):
+        """
+        Caches the output of a committed request
+        """
+        session = self.sessions.get(caller)
+        if session is not None and client_id in session.outputs:
+            session.outputs[client_id] = output
+
+    def expire(self, slot: int):
+        """
+        Drops the sessions last committed more than SESSION_EXPIRY slots before slot
+        """
+        while self.sessions:
+            caller, session = next(iter(self.sessions.items()))
+            if session.last_slot >= slot - SESSION_EXPIRY:
+                break
+            del self.sessions[caller]
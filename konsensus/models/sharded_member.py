@@ -0,0 +1,113 @@
+"""
+Sharded Member Model
+"""
+from typing import Dict, List, Optional
+from copy import deepcopy
+from functools import partial
+import threading
+from queue import Queue
+
+# pylint: disable-next=import-error
+from .roles.seed import Seed
+
+# pylint: disable-next=import-error
+from .roles.bootstrap import Bootstrap
+
+# pylint: disable-next=import-error
+from .roles.leader import Leader
+
+# pylint: disable-next=import-error
+from .roles.requester import ExpiredError, OverloadedError, Requester
+from .router import KeyRangeRouter
+from .node import Node
+
+# pylint: disable-next=relative-beyond-top-level
+from ..network import Network
+
+
+def group_address(address: str, group: int) -> str:
+    """
+    Returns the address of the node that runs a consensus group on a member
+    """
+    return f"{address}/g{group}"
+
+
+class ShardedMember:
+    """
+    Represents a member of a cluster that runs one consensus group per key range.
+
+    Each group is an independent Multi-Paxos cluster with its own log, state and leader. A member hosts one node per
+    group, addressed as "<address>/g<group>", on the same network, so all the groups share the transport and the timer
+    loop of the protocol thread. Groups are seeded and bootstrapped like a Member, each with its own copy of the
+    seed state.
+
+    The leader of group g is started eagerly on peer g modulo the number of peers, so that leadership, and with it
+    the work of driving proposals, is spread across the members rather than concentrated on one.
+
+    invoke routes a request to the group that owns its key and waits for its output, like Member.invoke.
+    """
+
+    # pylint: disable-next=missing-function-docstring
+    # pylint: disable-next=too-many-arguments
+    def __init__(
+        self,
+        state_machine,
+        network: Network,
+        address: str,
+        peers: List[str],
+        router: KeyRangeRouter,
+        seed=None,
+        seed_cls=Seed,
+        bootstrap=Bootstrap,
+    ) -> None:
+        self.thread: Optional[threading.Thread] = None
+        self.network = network
+        self.address = address
+        self.router = router
+        self.nodes: Dict[int, Node] = {}
+        self.startup_roles = []
+        for group in range(router.groups):
+            node = network.new_node(address=group_address(address, group))
+            self.nodes[group] = node
+            group_peers = [group_address(peer, group) for peer in peers]
+            if seed is not None:
+                startup_role = seed_cls(
+                    node,
+                    initial_state=deepcopy(seed),
+                    peers=group_peers,
+                    execute_fn=state_machine,
+                    bootstrap_cls=self.bootstrap_for(bootstrap, peers, group),
+                )
+            else:
+                startup_role = self.bootstrap_for(bootstrap, peers, group)(
+                    node, execute_fn=state_machine, peers=group_peers
+                )
+            self.startup_roles.append(startup_role)
+
+    def bootstrap_for(self, bootstrap, peers: List[str], group: int):
+        """
+        Returns the bootstrap role for a group, which starts an eager leader if this member should lead the group
+        """
+        if peers[group % len(peers)] == self.address:
+            return partial(bootstrap, leader=partial(Leader, eager=True))
+        return bootstrap
+
+    # pylint: disable-next=missing-function-docstring
+    def start(self):
+        for startup_role in self.startup_roles:
+            startup_role.start()
+        self.thread = threading.Thread(target=self.network.run)
+        self.thread.start()
+
+    # pylint: disable-next=missing-function-docstring
+    def invoke(self, input_value, request_cls=Requester, fail_fast: bool = False):
+        if fail_fast:
+            request_cls = partial(request_cls, fail_fast=True)
+        queue = Queue()
+        node = self.nodes[self.router.route(input_value)]
+        requester = request_cls(node, input_value, queue.put)
+        requester.start()
+        output = queue.get()
+        if isinstance(output, (ExpiredError, OverloadedError)):
+            raise output
+        return output
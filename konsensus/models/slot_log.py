@@ -0,0 +1,260 @@
+"""
+Slot logs hold a value for each slot of the log in arrays indexed by slot
+"""
+from array import array
+from collections.abc import ItemsView, MutableMapping, ValuesView
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+
+# pylint: disable-next=relative-beyond-top-level
+from ..entities.data_types import Ballot
+
+# slots held by each chunk of a slot log
+CHUNK_SIZE = 1024
+
+
+class SlotLog(MutableMapping):
+    """
+    A mapping of slots to values for the dense runs of slots that replicas, leaders and acceptors keep.
+
+    Values are held in chunks of chunk_size slots, chunk i holding the slots from base + i * chunk_size, so looking up,
+    adding and removing a slot only index a list, and a slot costs a pointer rather than a dict entry and an int key.
+    Chunks are allocated as slots are added to them and dropped once they are emptied; adding a slot below the first
+    chunk prepends chunks. Iteration is in slot order, range iterates over a run of slots without looking up the others,
+    and truncate drops every slot below one, a chunk at a time, to compact the log.
+
+    Empty slots are None, so None cannot be stored.
+    """
+
+    def __init__(self, items: Iterable = (), chunk_size: int = CHUNK_SIZE) -> None:
+        self.chunk_size = chunk_size
+        # the first slot of the first chunk, a multiple of chunk_size
+        self.base = 0
+        self.chunks: List[Optional[Any]] = []
+        # slots held in each chunk
+        self.counts: List[int] = []
+        self.length = 0
+        self.update(items)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self.items())!r})"
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __iter__(self) -> Iterator[int]:
+        for slot, _ in self.range():
+            yield slot
+
+    def __reversed__(self) -> Iterator[int]:
+        for index in range(len(self.chunks) - 1, -1, -1):
+            chunk = self.chunks[index]
+            if chunk is None:
+                continue
+            first = self.base + index * self.chunk_size
+            for offset in range(self.chunk_size - 1, -1, -1):
+                if self.holds(chunk, offset):
+                    yield first + offset
+
+    def __contains__(self, slot) -> bool:
+        chunk, offset = self.locate(slot)
+        return chunk is not None and self.holds(chunk, offset)
+
+    def __getitem__(self, slot):
+        chunk, offset = self.locate(slot)
+        if chunk is None or not self.holds(chunk, offset):
+            raise KeyError(slot)
+        return self.load(chunk, offset)
+
+    def get(self, slot, default=None):
+        chunk, offset = self.locate(slot)
+        if chunk is None or not self.holds(chunk, offset):
+            return default
+        return self.load(chunk, offset)
+
+    def __setitem__(self, slot: int, value) -> None:
+        assert value is not None, "None marks empty slots"
+        if not self.chunks:
+            self.base = slot - slot % self.chunk_size
+        index = (slot - self.base) // self.chunk_size
+        if index < 0:
+            self.chunks[:0] = [None] * -index
+            self.counts[:0] = [0] * -index
+            self.base += index * self.chunk_size
+            index = 0
+        elif index >= len(self.chunks):
+            grow = index + 1 - len(self.chunks)
+            self.chunks.extend([None] * grow)
+            self.counts.extend([0] * grow)
+        chunk = self.chunks[index]
+        if chunk is None:
+            chunk = self.chunks[index] = self.new_chunk()
+        offset = (slot - self.base) % self.chunk_size
+        if not self.holds(chunk, offset):
+            self.counts[index] += 1
+            self.length += 1
+        self.store(chunk, offset, value)
+
+    def __delitem__(self, slot) -> None:
+        chunk, offset = self.locate(slot)
+        if chunk is None or not self.holds(chunk, offset):
+            raise KeyError(slot)
+        self.erase(chunk, offset)
+        self.length -= 1
+        index = (slot - self.base) // self.chunk_size
+        self.counts[index] -= 1
+        if not self.counts[index]:
+            self.chunks[index] = None
+            self.trim()
+
+    def locate(self, slot) -> Tuple[Optional[Any], int]:
+        """
+        Returns the chunk a slot falls in, or None if it has none, and the slot's offset in it
+        """
+        if not isinstance(slot, int):
+            return None, 0
+        index, offset = divmod(slot - self.base, self.chunk_size)
+        if 0 <= index < len(self.chunks):
+            return self.chunks[index], offset
+        return None, 0
+
+    def range(self, first: Optional[int] = None, last: Optional[int] = None):
+        """
+        Iterates over the (slot, value) pairs from first to last inclusive, all of them by default, in slot order
+        """
+        first = self.base if first is None else max(first, self.base)
+        end = self.base + len(self.chunks) * self.chunk_size
+        end = end if last is None else min(last + 1, end)
+        slot = first
+        while slot < end:
+            index, offset = divmod(slot - self.base, self.chunk_size)
+            chunk = self.chunks[index]
+            stop = min(end - slot, self.chunk_size - offset) + offset
+            if chunk is not None:
+                for i in range(offset, stop):
+                    if self.holds(chunk, i):
+                        yield slot + i - offset, self.load(chunk, i)
+            slot += stop - offset
+
+    def items(self):
+        return SlotItems(self)
+
+    def values(self):
+        return SlotValues(self)
+
+    def last(self, default: Optional[int] = None) -> Optional[int]:
+        """
+        Returns the highest slot held, or default if there is none
+        """
+        return next(reversed(self), default)
+
+    def truncate(self, slot: int):
+        """
+        Drops every slot below slot
+        """
+        index, offset = divmod(slot - self.base, self.chunk_size)
+        if index < 0 or not self.chunks:
+            return
+        if index >= len(self.chunks):
+            self.chunks, self.counts, self.length = [], [], 0
+            return
+        self.length -= sum(self.counts[:index])
+        del self.chunks[:index]
+        del self.counts[:index]
+        self.base += index * self.chunk_size
+        chunk = self.chunks[0]
+        if chunk is not None:
+            for i in range(offset):
+                if self.holds(chunk, i):
+                    self.erase(chunk, i)
+                    self.counts[0] -= 1
+                    self.length -= 1
+            if not self.counts[0]:
+                self.chunks[0] = None
+        self.trim()
+
+    def trim(self):
+        """
+        Drops the empty chunks at either end
+        """
+        while self.chunks and self.chunks[-1] is None:
+            self.chunks.pop()
+            self.counts.pop()
+        drop = 0
+        while drop < len(self.chunks) and self.chunks[drop] is None:
+            drop += 1
+        if drop:
+            del self.chunks[:drop]
+            del self.counts[:drop]
+            self.base += drop * self.chunk_size
+
+    # pylint: disable-next=missing-function-docstring
+    def new_chunk(self):
+        return [None] * self.chunk_size
+
+    # pylint: disable-next=missing-function-docstring
+    def holds(self, chunk, offset: int) -> bool:
+        return chunk[offset] is not None
+
+    # pylint: disable-next=missing-function-docstring
+    def load(self, chunk, offset: int):
+        return chunk[offset]
+
+    # pylint: disable-next=missing-function-docstring
+    def store(self, chunk, offset: int, value):
+        chunk[offset] = value
+
+    # pylint: disable-next=missing-function-docstring
+    def erase(self, chunk, offset: int):
+        chunk[offset] = None
+
+
+class SlotItems(ItemsView):
+    """
+    The (slot, value) pairs of a SlotLog, iterated over without looking each slot up again
+    """
+
+    def __iter__(self):
+        return self._mapping.range()
+
+
+class SlotValues(ValuesView):
+    """
+    The values of a SlotLog, in slot order
+    """
+
+    def __iter__(self):
+        return (value for _, value in self._mapping.range())
+
+
+class BallotLog(SlotLog):
+    """
+    A SlotLog of (ballot, value) pairs, as acceptors keep them.
+
+    Each chunk holds the packed ballots in an array of integers alongside the values, so a slot costs eight bytes and a
+    pointer rather than a tuple and a Ballot. Ballots are built again as slots are read.
+    """
+
+    # pylint: disable-next=missing-function-docstring
+    def new_chunk(self):
+        return array("q", bytes(8 * self.chunk_size)), [None] * self.chunk_size
+
+    # pylint: disable-next=missing-function-docstring
+    def holds(self, chunk, offset: int) -> bool:
+        return chunk[1][offset] is not None
+
+    # pylint: disable-next=missing-function-docstring
+    def load(self, chunk, offset: int):
+        ballots, values = chunk
+        return Ballot.unpack(ballots[offset]), values[offset]
+
+    # pylint: disable-next=missing-function-docstring
+    def store(self, chunk, offset: int, value):
+        ballot_num, proposal = value
+        assert proposal is not None, "None marks empty slots"
+        ballots, values = chunk
+        ballots[offset] = ballot_num
+        values[offset] = proposal
+
+    # pylint: disable-next=missing-function-docstring
+    def erase(self, chunk, offset: int):
+        chunk[1][offset] = None
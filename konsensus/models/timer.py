@@ -1,21 +1,30 @@
 """
 Timer represents timer callbacks in the system
 """
-from typing import Union, Callable
+from typing import Union, Callable, Optional
 
 
 class Timer:
     """
     Timer class handle timer callbacks
+    Timers set through Network.set_timer are numbered in the order they were created; timers that deliver messages
+    have no number
     """
 
     def __init__(
-        self, expires: Union[int, float], address: str, callback: Callable
+        self,
+        expires: Union[int, float],
+        address: str,
+        callback: Callable,
+        on_cancel: Optional[Callable] = None,
+        seq: Optional[int] = None,
     ) -> None:
         self.expires = expires
         self.address = address
         self.callback = callback
         self.cancelled = False
+        self.on_cancel = on_cancel
+        self.seq = seq
 
     def __eq__(self, other: "Timer") -> bool:
         return self.expires == other.expires
@@ -35,4 +44,8 @@ class Timer:
 
     # pylint: disable-next=missing-function-docstring
     def cancel(self):
+        if self.cancelled:
+            return
         self.cancelled = True
+        if self.on_cancel:
+            self.on_cancel()
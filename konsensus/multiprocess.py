@@ -0,0 +1,393 @@
+"""
+Multiprocess hosting runs each node of a local cluster in its own process, exchanging messages through shared memory
+"""
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from copy import deepcopy
+from functools import partial
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+import heapq
+import pickle
+import struct
+import threading
+import time
+
+from .network import Network
+from .models.node import Node
+from .models.roles.bootstrap import Bootstrap
+from .models.roles.client import Client
+from .models.roles.requester import ExpiredError
+from .models.roles.seed import Seed
+
+# bytes of messages each ring holds
+RING_CAPACITY = 1 << 20
+
+
+class RecordTooLargeError(ValueError):
+    """
+    An object pickles to more bytes than a SharedRing can ever hold, so putting it would never succeed
+    """
+
+
+class SharedRing:
+    """
+    A single-producer, single-consumer ring buffer of pickled objects in a SharedMemory segment.
+
+    The segment starts with the ring's capacity and two counters of bytes written and read, which only ever grow: the
+    producer advances the first once a record is in place, and the consumer the second once it has read records, so
+    neither waits for the other for longer than a copy. Records are a length followed by the pickle, wrapping around
+    the end of the buffer. An object whose record is larger than the whole buffer is rejected with a
+    RecordTooLargeError rather than refused as if the ring were full.
+
+    Both ends take a multiprocessing lock around reading and writing the counters and copying the records, so a
+    consumer never sees a counter before the bytes it covers, even on CPUs that reorder stores to shared memory;
+    pickling and unpickling happen outside it. Pickling a ring, which is only allowed while starting a process,
+    attaches to the same segment and lock, so rings can be handed to other processes.
+    """
+
+    HEADER = struct.Struct("QQQ")  # capacity, bytes written, bytes read
+    LENGTH = struct.Struct("I")
+
+    def __init__(
+        self, name: Optional[str] = None, capacity: int = RING_CAPACITY, lock=None
+    ) -> None:
+        if name is None:
+            self.shm = SharedMemory(create=True, size=self.HEADER.size + capacity)
+            self.HEADER.pack_into(self.shm.buf, 0, capacity, 0, 0)
+        else:
+            assert lock is not None, "attaching to a ring needs the lock of its creator"
+            self.shm = SharedMemory(name=name)
+        self.lock = lock or get_context().Lock()
+        self.capacity = self.HEADER.unpack_from(self.shm.buf, 0)[0]
+
+    def __reduce__(self):
+        return SharedRing, (self.shm.name, self.capacity, self.lock)
+
+    def put(self, obj) -> bool:
+        """
+        Appends an object, returning False if there is no room for it yet
+        """
+        data = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+        size = self.LENGTH.size + len(data)
+        if size > self.capacity:
+            raise RecordTooLargeError(
+                f"{type(obj).__name__} pickles to {len(data)} bytes, but the ring holds at most "
+                f"{self.capacity - self.LENGTH.size}"
+            )
+        with self.lock:
+            _, written, read = self.HEADER.unpack_from(self.shm.buf, 0)
+            if written - read + size > self.capacity:
+                return False
+            self.write(written, self.LENGTH.pack(len(data)) + data)
+            struct.pack_into("Q", self.shm.buf, 8, written + size)
+        return True
+
+    def get(self) -> List:
+        """
+        Removes and returns the objects appended so far
+        """
+        records = []
+        with self.lock:
+            _, written, read = self.HEADER.unpack_from(self.shm.buf, 0)
+            while read < written:
+                (length,) = self.LENGTH.unpack(self.read(read, self.LENGTH.size))
+                records.append(self.read(read + self.LENGTH.size, length))
+                read += self.LENGTH.size + length
+            struct.pack_into("Q", self.shm.buf, 16, read)
+        return [pickle.loads(record) for record in records]
+
+    def write(self, position: int, data: bytes):
+        """
+        Copies data into the buffer at a position, wrapping around its end
+        """
+        start = self.HEADER.size + position % self.capacity
+        first = min(len(data), self.HEADER.size + self.capacity - start)
+        self.shm.buf[start : start + first] = data[:first]
+        rest = len(data) - first
+        self.shm.buf[self.HEADER.size : self.HEADER.size + rest] = data[first:]
+
+    def read(self, position: int, length: int) -> bytes:
+        """
+        Copies length bytes out of the buffer from a position, wrapping around its end
+        """
+        start = self.HEADER.size + position % self.capacity
+        first = min(length, self.HEADER.size + self.capacity - start)
+        data = bytes(self.shm.buf[start : start + first])
+        rest = length - first
+        return data + bytes(self.shm.buf[self.HEADER.size : self.HEADER.size + rest])
+
+    def close(self, unlink: bool = False):
+        """
+        Detaches from the segment, removing it if unlink is set
+        """
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+class ProcessNetwork(Network):
+    """
+    The network of a process hosting one node of a cluster. Messages to other nodes are put on the ring to that node,
+    and messages on the rings from other nodes are delivered as they are found, so there is no simulated latency or
+    loss; a message is only lost when the ring to its destination is full, which the protocol's retransmissions
+    recover from like any other loss, or when it is too large for the ring at all, which is logged as an error.
+
+    A ProcessNetwork hosts a single node, to which everything on its inbound rings is delivered.
+
+    Time is the monotonic clock. The run loop polls the rings, runs the timers that are due and callbacks posted by
+    other threads, and sleeps for up to IDLE_SLEEP when there was nothing to do. Objects on the control ring are passed
+    to on_control, and a None on it stops the loop.
+    """
+
+    IDLE_SLEEP = 0.0005
+
+    # pylint: disable-next=too-many-arguments
+    def __init__(
+        self,
+        seed,
+        inbound: Dict[str, SharedRing],
+        outbound: Dict[str, SharedRing],
+        control: Optional[SharedRing] = None,
+        on_control: Optional[Callable[[Any], None]] = None,
+        **kwargs,
+    ) -> None:
+        super().__init__(seed, **kwargs)
+        self.inbound = inbound
+        self.outbound = outbound
+        self.control = control
+        self.on_control = on_control
+        self.running = False
+        self.now = time.monotonic()
+        self.address: Optional[str] = None
+
+    # pylint: disable=missing-function-docstring
+    def new_node(self, address: Optional[str] = None) -> Node:
+        assert self.address is None, "a ProcessNetwork hosts a single node"
+        node = super().new_node(address)
+        self.address = node.address
+        return node
+
+    # pylint: disable=missing-function-docstring
+    def run(self):
+        self.running = True
+        while self.running:
+            busy = self.poll()
+            self.run_posted()
+            self.now = time.monotonic()
+            while self.timers and self.timers[0].expires <= self.now:
+                timer = heapq.heappop(self.timers)
+                if timer.cancelled:
+                    self.tombstones -= 1
+                    continue
+                timer.on_cancel = None
+                busy = True
+                self.fire(timer.callback)
+            if not busy:
+                idle = self.IDLE_SLEEP
+                if self.timers:
+                    idle = min(idle, max(0.0, self.timers[0].expires - self.now))
+                time.sleep(idle)
+
+    # pylint: disable=missing-function-docstring
+    def stop(self):
+        super().stop()
+        self.running = False
+
+    def poll(self) -> bool:
+        """
+        Delivers the messages waiting on the inbound rings and hands over control objects, returning whether there
+        were any
+        """
+        busy = False
+        for ring in self.inbound.values():
+            for sender, message in ring.get():
+                busy = True
+                # messages that arrive after the node was removed are lost, like those to a dead node
+                if self.address in self.nodes:
+                    self.deliver(self.address, 0, sender, message)
+        if self.control is not None:
+            for obj in self.control.get():
+                busy = True
+                if obj is None:
+                    self.stop()
+                    return busy
+                self.on_control(obj)
+        return busy
+
+    # pylint: disable=missing-function-docstring
+    def send(self, sender, destinations, message):
+        sender.logger.debug(f"sending {message} to {destinations}")
+        counted = self.metrics.enabled
+        kind = type(message).__name__ if counted else None
+        for dest in destinations:
+            if dest in self.nodes:
+                if counted:
+                    self.metrics.inc("messages_sent", type=kind)
+                # roles keep parts of the messages they receive, so local deliveries get their own copy
+                self.deliver(dest, 0, sender.address, deepcopy(message))
+            elif dest in self.outbound:
+                if counted:
+                    self.metrics.inc("messages_sent", type=kind)
+                try:
+                    delivered = self.outbound[dest].put((sender.address, message))
+                except RecordTooLargeError as error:
+                    sender.logger.error(f"cannot send {type(message).__name__} to {dest}: {error}")
+                    delivered = False
+                if not delivered and counted:
+                    self.metrics.inc("messages_dropped", type=kind)
+
+
+def start_member(node: Node, execute_fn: Callable, peers: List[str], initial_state):
+    """
+    Starts a node of a new cluster like Member does: the first peer seeds the cluster and the others join it
+    """
+    if node.address == peers[0]:
+        Seed(node, initial_state=initial_state, peers=peers, execute_fn=execute_fn)
+    else:
+        Bootstrap(node, execute_fn=execute_fn, peers=peers).start()
+
+
+# pylint: disable-next=too-many-arguments
+def host(
+    address: str,
+    seed,
+    setup: Callable[[Node], None],
+    inbound: Dict[str, SharedRing],
+    outbound: Dict[str, SharedRing],
+    requests: SharedRing,
+    results: SharedRing,
+):
+    """
+    Runs one node in the current process until it is told to stop. Requests (request id, input) on the requests ring
+    are made through a Client, and (request id, output) put on the results ring once they are done, or (request id,
+    error) if the output is too large for the ring
+    """
+    client: Optional[Client] = None
+
+    def reply(request_id, output):
+        try:
+            replied = results.put((request_id, output))
+        except RecordTooLargeError as error:
+            replied = results.put((request_id, error))
+        if not replied:
+            # the parent has not caught up with the results yet
+            network.set_timer(None, network.IDLE_SLEEP, partial(reply, request_id, output))
+
+    def request(obj):
+        request_id, input_value = obj
+        client.request(input_value, partial(reply, request_id))
+
+    network = ProcessNetwork(
+        seed, inbound, outbound, control=requests, on_control=request
+    )
+    node = network.new_node(address)
+    client = Client(node)
+    setup(node)
+    try:
+        network.run()
+    finally:
+        for ring in [*inbound.values(), *outbound.values(), requests, results]:
+            ring.close()
+
+
+class ProcessCluster:
+    """
+    Runs a local cluster with each node in its own process, so that the cluster uses as many cores as it has nodes.
+    Node and role code runs unchanged on a ProcessNetwork in each process.
+
+    Every ordered pair of nodes has a SharedRing, and so do the requests to and results from each node. invoke makes
+    a request on a node and waits for its output; it can be called from several threads at once. A request or output
+    that does not fit in a ring raises a RecordTooLargeError, and a request whose output expired an ExpiredError. The
+    state machine and setup must be picklable, e.g. module-level functions. setup is called with each new node, and by
+    default starts it with start_member.
+    """
+
+    POLL_INTERVAL = 0.0005
+
+    # pylint: disable-next=too-many-arguments
+    def __init__(
+        self,
+        state_machine: Callable,
+        peers: Sequence[str],
+        initial_state=None,
+        setup: Optional[Callable[[Node], None]] = None,
+        ring_capacity: int = RING_CAPACITY,
+        seed=0,
+    ) -> None:
+        self.peers = list(peers)
+        setup = setup or partial(
+            start_member,
+            execute_fn=state_machine,
+            peers=self.peers,
+            initial_state=initial_state,
+        )
+        self.rings = {
+            (src, dest): SharedRing(capacity=ring_capacity)
+            for src in self.peers
+            for dest in self.peers
+            if src != dest
+        }
+        self.requests = {peer: SharedRing(capacity=ring_capacity) for peer in self.peers}
+        self.results = {peer: SharedRing(capacity=ring_capacity) for peer in self.peers}
+        context = get_context()
+        self.processes = [
+            context.Process(
+                target=host,
+                name=peer,
+                args=(
+                    peer,
+                    f"{seed}/{peer}",
+                    setup,
+                    {src: ring for (src, dest), ring in self.rings.items() if dest == peer},
+                    {dest: ring for (src, dest), ring in self.rings.items() if src == peer},
+                    self.requests[peer],
+                    self.results[peer],
+                ),
+                daemon=True,
+            )
+            for peer in self.peers
+        ]
+        self.lock = threading.Lock()
+        self.next_request_id = 0
+        self.outputs: Dict[int, Any] = {}
+
+    # pylint: disable-next=missing-function-docstring
+    def start(self):
+        for process in self.processes:
+            process.start()
+
+    def invoke(self, input_value, peer: Optional[str] = None):
+        """
+        Makes a request on a node, the first one by default, and returns its output
+        """
+        peer = peer or self.peers[0]
+        process = self.processes[self.peers.index(peer)]
+        with self.lock:
+            request_id = self.next_request_id
+            self.next_request_id += 1
+            while not self.requests[peer].put((request_id, input_value)):
+                time.sleep(self.POLL_INTERVAL)
+        while True:
+            with self.lock:
+                for ring in self.results.values():
+                    self.outputs.update(ring.get())
+                if request_id in self.outputs:
+                    output = self.outputs.pop(request_id)
+                    if isinstance(output, (ExpiredError, RecordTooLargeError)):
+                        raise output
+                    return output
+            if not process.is_alive():
+                raise RuntimeError(f"{peer} exited with {process.exitcode}")
+            time.sleep(self.POLL_INTERVAL)
+
+    def stop(self):
+        """
+        Stops every node and removes the rings
+        """
+        for peer, process in zip(self.peers, self.processes):
+            if process.is_alive():
+                self.requests[peer].put(None)
+        for process in self.processes:
+            process.join()
+        for ring in [*self.rings.values(), *self.requests.values(), *self.results.values()]:
+            ring.close(unlink=True)
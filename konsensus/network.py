@@ -4,14 +4,25 @@ implementation, communicating between actual servers on a real network, with no
 Testing and debugging can take place using the simulated network, with production use of the library operating over
 real network hardware.
 """
-
-from typing import Dict, Optional, List, Callable, Union
+from __future__ import annotations
+from typing import Dict, Optional, List, Callable, Sequence, Tuple, Union, TYPE_CHECKING
 import random
 import heapq
+from queue import Empty, SimpleQueue
 from functools import partial
 from copy import deepcopy
 from .models.node import Node
 from .models.timer import Timer
+from .infra.metrics import Metrics, NullMetrics
+from .infra.profiler import describe
+from .links import CUT, Link, UniformLatency, pickled_size
+
+if TYPE_CHECKING:
+    from .infra.profiler import Profiler
+    from .infra.trace import TraceRecorder
+
+# the default of set_link's bandwidth, which leaves it as it is, since None sets it to unlimited
+UNCHANGED = object()
 
 
 class Network:
@@ -21,27 +32,77 @@ class Network:
 
     Timers are handled using Python's heapq module, allowing efficient selection of the next event. Setting a timer
     involves pushing a Timer object onto the heap.
-    Since removing items from a heap is inefficient, cancelled timers are left in place but marked as cancelled.
+    Since removing items from a heap is inefficient, cancelled timers are left in place but marked as cancelled. Once
+    these tombstones make up most of a large heap, it is rebuilt without them.
 
     Message transmission uses the timer functionality to schedule a later delivery of the message at each node, using
     a random simulated delay.
+    Every one-way link has a Link giving its loss probability and latency distribution. Links default to DROP_PROB and
+    a uniform PROP_DELAY +/- PROP_JITTER, read when a link first carries a message; set_link overrides single links,
+    e.g. for asymmetric loss or a slow WAN link, and partition cuts the links between groups of nodes until heal is
+    called. Links are resolved once into a table keyed by sender and destination, so sending a message costs a
+    dictionary lookup however many overrides and partitions are configured. Messages already in flight when a
+    partition starts are still delivered.
+    Links with a bandwidth, BANDWIDTH bytes per second by default or set with set_link, take size / bandwidth seconds
+    to transmit a message on top of its latency, and transmit one message at a time: a message sent while the link
+    is busy waits for the messages ahead of it. Sizes are measured by message_size, which estimates them from the
+    pickled message and can be replaced with a real codec's encoded length; they are only measured for links with a
+    bandwidth.
     We again use functools.partial to set up a future call to the destination node's receive method with appropriate
     arguments.
 
     Running the simulation just involves popping timers from the heap and executing them if they have not been cancelled
     and if the destination node is still active.
+
+    Other threads, such as a Replica's apply pipeline, hand work back to the protocol thread with post. The run loop
+    executes posted callbacks between timers, and keeps waiting for them while posts announced with expect_post are
+    still outstanding, even if no timers are left.
+
+    Given a Metrics instance, the network counts the messages it sends and drops by type and reports the size of the
+    timer heap and the share of tombstones in it. Nodes and roles report their own metrics through network.metrics.
+    Given a Profiler, it times every timer callback it runs, and nodes time their role handlers through
+    network.profiler. Given a TraceRecorder, it records every delivery and timer it runs, so that the run can be
+    replayed with a ReplayNetwork.
     """
 
     PROP_DELAY = 0.03
     PROP_JITTER = 0.02
     DROP_PROB = 0.05
+    # bytes per second of every link, or None for links that are never busy
+    BANDWIDTH: Optional[float] = None
+    # the timer heap is compacted when it holds more tombstones than this and they outnumber live timers
+    COMPACT_THRESHOLD = 64
 
     # pylint: disable=missing-function-docstring
-    def __init__(self, seed) -> None:
+    def __init__(
+        self,
+        seed,
+        metrics: Optional[Metrics] = None,
+        profiler: Optional[Profiler] = None,
+        trace: Optional[TraceRecorder] = None,
+    ) -> None:
         self.nodes: Dict[str, Node] = {}
         self.rnd = random.Random(seed)
         self.timers: List[Timer] = []
+        self.tombstones = 0
         self.now = 1000.0
+        self.posted: SimpleQueue = SimpleQueue()
+        self.expected_posts = 0
+        self.metrics = metrics or NullMetrics()
+        self.metrics.gauge("timer_heap_size", lambda: len(self.timers))
+        self.metrics.gauge(
+            "timer_tombstone_ratio",
+            lambda: self.tombstones / len(self.timers) if self.timers else 0.0,
+        )
+        self.profiler = profiler
+        self.trace = trace
+        self.next_seq = 0
+        self.link_overrides: Dict[Tuple[str, str], Link] = {}
+        self.partition_of: Dict[str, int] = {}
+        self.links: Dict[Tuple[str, str], Link] = {}
+        # when each link with a bandwidth finishes transmitting the messages queued on it
+        self.link_busy_until: Dict[Tuple[str, str], float] = {}
+        self.message_size: Callable[[tuple], int] = pickled_size
 
     # pylint: disable=missing-function-docstring
     def new_node(self, address: Optional[str] = None) -> Node:
@@ -51,48 +112,205 @@ class Network:
 
     # pylint: disable=missing-function-docstring
     def run(self):
-        while self.timers:
+        while self.timers or self.expected_posts:
+            self.run_posted(block=not self.timers)
+            if not self.timers:
+                continue
             next_timer = self.timers[0]
             if next_timer.expires > self.now:
                 self.now = next_timer.expires
             heapq.heappop(self.timers)
             if next_timer.cancelled:
+                self.tombstones -= 1
+                continue
+            # cancelling a timer that already left the heap leaves no tombstone
+            next_timer.on_cancel = None
+            if next_timer.address and next_timer.address not in self.nodes:
                 continue
-            if not next_timer.address or next_timer.address in self.nodes:
-                next_timer.callback()
+            if self.trace is not None:
+                self.trace.fired(self, next_timer)
+            self.fire(next_timer.callback)
+
+    def fire(self, callback: Callable):
+        """
+        Runs a timer callback, under the profiler if there is one
+        """
+        if self.profiler is None:
+            callback()
+            return
+        self.profiler.enter(describe(callback), self.now)
+        try:
+            callback()
+        finally:
+            self.profiler.exit()
 
     # pylint: disable=missing-function-docstring
     def stop(self):
         self.timers = []
+        self.tombstones = 0
+        self.expected_posts = 0
+
+    def expect_post(self):
+        """
+        Tells the run loop to wait for one more posted callback. Only called from the protocol thread
+        """
+        self.expected_posts += 1
+
+    def post(self, callback: Callable):
+        """
+        Hands a callback to the protocol thread. Safe to call from any thread
+        """
+        self.posted.put(callback)
+
+    def run_posted(self, block: bool = False):
+        """
+        Executes the callbacks posted so far, waiting for the first one if block is set
+        """
+        try:
+            callback = self.posted.get(block=block)
+        except Empty:
+            return
+        while True:
+            if self.expected_posts:
+                self.expected_posts -= 1
+            callback()
+            try:
+                callback = self.posted.get_nowait()
+            except Empty:
+                return
 
     # pylint: disable=missing-function-docstring
     def set_timer(
         self, address, seconds: Union[int, float], callback: Callable
     ) -> Timer:
-        timer = Timer(self.now + seconds, address, callback)
+        timer = Timer(
+            self.now + seconds, address, callback, self.timer_cancelled, self.next_seq
+        )
+        self.next_seq += 1
         heapq.heappush(self.timers, timer)
         return timer
 
+    def deliver(self, address, seconds: Union[int, float], sender, message):
+        """
+        Schedules the delivery of a message to the node at address. Deliveries are not numbered like other timers,
+        since traces record the message itself
+        """
+        node = self.nodes[address]
+        timer = Timer(
+            self.now + seconds,
+            address,
+            partial(node.receive, sender, message),
+            self.timer_cancelled,
+        )
+        heapq.heappush(self.timers, timer)
+
+    def timer_cancelled(self):
+        """
+        Counts a cancelled timer left in the heap, and drops all of them once they outnumber the live timers
+        """
+        self.tombstones += 1
+        if (
+            self.tombstones > self.COMPACT_THRESHOLD
+            and self.tombstones * 2 > len(self.timers)
+        ):
+            self.timers = [t for t in self.timers if not t.cancelled]
+            heapq.heapify(self.timers)
+            self.tombstones = 0
+
+    def default_link(self) -> Link:
+        """
+        Returns the link used between nodes without an override
+        """
+        return Link(
+            self.DROP_PROB,
+            UniformLatency(self.PROP_DELAY, self.PROP_JITTER),
+            self.BANDWIDTH,
+        )
+
+    def link(self, sender: str, destination: str) -> Link:
+        """
+        Returns the link from sender to destination, resolving it into the link table the first time it is used
+        """
+        key = (sender, destination)
+        link = self.links.get(key)
+        if link is None:
+            side = self.partition_of.get(sender)
+            other = self.partition_of.get(destination)
+            if side is not None and other is not None and side != other:
+                link = CUT
+            else:
+                link = self.link_overrides.get(key) or self.default_link()
+            self.links[key] = link
+        return link
+
+    def set_link(
+        self,
+        sender: str,
+        destination: str,
+        drop_prob: Optional[float] = None,
+        latency: Optional[Callable] = None,
+        bandwidth: Union[Optional[float], object] = UNCHANGED,
+    ):
+        """
+        Overrides the loss probability, the latency distribution and/or the bandwidth of the one-way link from sender
+        to destination. A bandwidth of None makes the link unlimited
+        """
+        current = self.link_overrides.get((sender, destination)) or self.default_link()
+        self.link_overrides[(sender, destination)] = Link(
+            current.drop_prob if drop_prob is None else drop_prob,
+            current.latency if latency is None else latency,
+            current.bandwidth if bandwidth is UNCHANGED else bandwidth,
+        )
+        self.links.clear()
+
+    def partition(self, *groups: Sequence[str]):
+        """
+        Cuts every link between nodes of different groups, replacing any earlier partition. Nodes that are not in any
+        group keep their links
+        """
+        self.partition_of = {
+            address: idx for idx, group in enumerate(groups) for address in group
+        }
+        self.links.clear()
+
+    def heal(self):
+        """
+        Ends the partition
+        """
+        self.partition_of = {}
+        self.links.clear()
+
     # pylint: disable=missing-function-docstring
     def send(self, sender, destinations, message):
         sender.logger.debug(f"sending {message} to {destinations}")
+        counted = self.metrics.enabled
+        kind = type(message).__name__ if counted else None
+        size = None
 
         # avoid aliasing by making a closure containing distinct deep copy of message for each destination
         def sendto(dest, message):
+            nonlocal size
             if dest == sender.address:
                 # reliably deliver local messages with no delay
-                self.set_timer(
-                    sender.address, 0, lambda: sender.receive(sender.address, message)
-                )
-            elif self.rnd.uniform(0, 1.0) > self.DROP_PROB:
-                delay = self.PROP_DELAY + self.rnd.uniform(
-                    -self.PROP_JITTER, self.PROP_JITTER
-                )
-                self.set_timer(
-                    dest,
-                    delay,
-                    partial(self.nodes[dest].receive, sender.address, message),
-                )
+                self.deliver(sender.address, 0, sender.address, message)
+                return
+            link = self.link(sender.address, dest)
+            # a message occupies the link whether or not it is lost on the way
+            delay = 0.0
+            if link.bandwidth:
+                if size is None:
+                    size = self.message_size(message)
+                key = (sender.address, dest)
+                start = max(self.now, self.link_busy_until.get(key, 0.0))
+                self.link_busy_until[key] = start + size / link.bandwidth
+                delay = self.link_busy_until[key] - self.now
+            if self.rnd.uniform(0, 1.0) > link.drop_prob:
+                delay += link.latency(self.rnd)
+                self.deliver(dest, delay, sender.address, message)
+            elif counted:
+                self.metrics.inc("messages_dropped", type=kind)
 
         for dest in (d for d in destinations if d in self.nodes):
+            if counted:
+                self.metrics.inc("messages_sent", type=kind)
             sendto(dest, deepcopy(message))
@@ -0,0 +1,96 @@
+"""
+Replay of recorded simulations
+"""
+from typing import Dict, List, Optional, Sequence, Union
+from functools import partial
+from copy import deepcopy
+
+from .network import Network
+from .models.timer import Timer
+from .infra.trace import Checkpoint, Delivery, TimerFired, load_state
+
+
+class ReplayNetwork(Network):
+    """
+    Re-executes the events of a trace recorded by TraceRecorder, in order, without drawing from the random generator
+    or keeping a timer heap.
+
+    Messages are delivered from the trace, so send does nothing. Timers are only kept by sequence number until the trace
+    fires them; roles create them in the same order as in the recorded run, as long as the cluster is built the same
+    way, so a Simulation replays its run when given partial(ReplayNetwork, events=...) as its network_cls.
+
+    seek(until) restores the latest checkpoint at or before until, if it is ahead of the replay, and replays the events
+    after it, so a replay can start late in a long run without re-executing it from the beginning. Restoring a
+    checkpoint replaces the nodes of the network: look them up again through network.nodes afterwards.
+    """
+
+    def __init__(self, seed, *args, events: Sequence = (), **kwargs) -> None:
+        super().__init__(seed, *args, **kwargs)
+        self.events: List = list(events)
+        self.position = 0
+        self.pending: Dict[int, Timer] = {}
+
+    # pylint: disable=missing-function-docstring
+    def set_timer(self, address, seconds: Union[int, float], callback) -> Timer:
+        seq = self.next_seq
+        self.next_seq += 1
+        on_cancel = partial(self.pending.pop, seq, None)
+        timer = Timer(self.now + seconds, address, callback, on_cancel, seq)
+        self.pending[seq] = timer
+        return timer
+
+    # pylint: disable=missing-function-docstring
+    def send(self, sender, destinations, message):
+        sender.logger.debug(f"sending {message} to {destinations}")
+
+    def run(self, until: Optional[float] = None):
+        """
+        Replays the events of the trace, up to simulated time until if given
+        """
+        while self.position < len(self.events):
+            event = self.events[self.position]
+            if until is not None and event.time > until:
+                break
+            self.position += 1
+            if isinstance(event, Checkpoint):
+                continue
+            self.now = event.time
+            if isinstance(event, Delivery):
+                # the roles keep parts of the messages they receive, so each replay delivers its own copy
+                message = deepcopy(event.message)
+                node = self.nodes[event.destination]
+                self.fire(partial(node.receive, event.sender, message))
+            elif isinstance(event, TimerFired):
+                timer = self.pending.pop(event.seq)
+                timer.on_cancel = None
+                self.fire(timer.callback)
+        if until is not None:
+            self.now = max(self.now, until)
+
+    def seek(self, until: float):
+        """
+        Brings the replay to simulated time until, starting from the latest checkpoint before it if that is ahead
+        """
+        latest = None
+        for position in range(self.position, len(self.events)):
+            event = self.events[position]
+            if event.time > until:
+                break
+            if isinstance(event, Checkpoint):
+                latest = position
+        if latest is not None:
+            self.restore(self.events[latest])
+            self.position = latest + 1
+        self.run(until)
+
+    def restore(self, checkpoint: Checkpoint):
+        """
+        Replaces the nodes and timers of the network with those of a checkpoint
+        """
+        state = load_state(checkpoint.state, self)
+        self.now = checkpoint.time
+        self.nodes = state["nodes"]
+        self.next_seq = state["next_seq"]
+        self.pending = state["timers"]
+        for seq, timer in self.pending.items():
+            timer.on_cancel = partial(self.pending.pop, seq, None)
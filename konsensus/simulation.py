@@ -0,0 +1,209 @@
+"""
+Simulation runs a whole cluster on the simulated network, for benchmarks and experiments
+"""
+from __future__ import annotations
+from typing import Callable, Dict, List, Optional, Tuple, TYPE_CHECKING
+from functools import partial
+import time
+
+from .network import Network
+from .models.node import Node
+from .models.roles.seed import Seed
+from .models.roles.bootstrap import Bootstrap
+from .models.roles.requester import Requester
+from .models.roles.replica import Replica
+from .entities.data_types import Proposal
+
+if TYPE_CHECKING:
+    from .infra.metrics import Metrics
+    from .infra.profiler import Profiler
+    from .infra.trace import TraceRecorder
+
+
+def add(state, input_value):
+    """
+    State machine used by default: adds each input to a running total
+    """
+    state += input_value
+    return state, state
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """
+    Returns the nearest-rank percentile of values, or None if there are none
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+# pylint: disable-next=too-many-instance-attributes
+class Simulation:
+    """
+    Builds a cluster of size nodes on a Network seeded with seed, with one node seeding the cluster and the others
+    bootstrapping into it, and drives it with closed-loop clients.
+
+    Everything that happens in the simulation, including message loss and delays, is drawn from the network's random
+    generator, so a simulation with the same parameters always makes the same decisions at the same simulated times.
+    drop_prob, prop_delay and bandwidth override the network's DROP_PROB, PROP_DELAY and BANDWIDTH.
+
+    Given a TraceRecorder, the run is recorded. Passing partial(ReplayNetwork, events=...) as network_cls with the same
+    parameters replays it instead.
+    """
+
+    # pylint: disable-next=too-many-arguments
+    def __init__(
+        self,
+        seed: int,
+        size: int,
+        drop_prob: Optional[float] = None,
+        prop_delay: Optional[float] = None,
+        execute_fn: Callable = add,
+        initial_state=0,
+        metrics: Optional[Metrics] = None,
+        network_cls=Network,
+        profiler: Optional[Profiler] = None,
+        trace: Optional[TraceRecorder] = None,
+        bandwidth: Optional[float] = None,
+    ) -> None:
+        self.network = network_cls(
+            seed, metrics=metrics, profiler=profiler, trace=trace
+        )
+        if drop_prob is not None:
+            self.network.DROP_PROB = drop_prob
+        if prop_delay is not None:
+            self.network.PROP_DELAY = prop_delay
+        if bandwidth is not None:
+            self.network.BANDWIDTH = bandwidth
+        self.peers = [f"N{n}" for n in range(size)]
+        self.nodes: List[Node] = [
+            self.network.new_node(address=peer) for peer in self.peers
+        ]
+        Seed(
+            self.nodes[0],
+            initial_state=initial_state,
+            peers=self.peers,
+            execute_fn=execute_fn,
+        )
+        for node in self.nodes[1:]:
+            Bootstrap(node, execute_fn=execute_fn, peers=self.peers).start()
+        self.latencies: List[float] = []
+        self.outputs: List = []
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.wall_time = 0.0
+        self.count = 0
+        self.clients = 0
+        self.issued = 0
+        self.input_fn: Callable[[int], object] = int
+
+    # pylint: disable-next=too-many-arguments
+    def run_requests(
+        self,
+        count: int,
+        clients: int = 1,
+        start: float = 2.0,
+        time_limit: float = 3600.0,
+        input_fn: Callable[[int], object] = int,
+    ) -> int:
+        """
+        Makes count requests from clients closed-loop clients, spread over the nodes and each waiting for its output
+        before making the next request. Clients start start simulated seconds from now, and the simulation stops once
+        every request has completed or time_limit simulated seconds have passed. Returns the number of completed
+        requests
+        """
+        self.count = count
+        self.clients = clients
+        self.input_fn = input_fn
+        self.network.set_timer(None, start, self.begin)
+        self.network.set_timer(None, time_limit, self.network.stop)
+        wall_start = time.perf_counter()
+        self.network.run()
+        self.wall_time = time.perf_counter() - wall_start
+        if self.finished_at is None:
+            self.finished_at = self.network.now
+        return len(self.outputs)
+
+    # pylint: disable-next=missing-function-docstring
+    def begin(self):
+        self.started_at = self.network.now
+        for client in range(self.clients):
+            self.request(self.nodes[client % len(self.nodes)])
+
+    def request(self, node: Node):
+        """
+        Makes the next request from a client on node, or stops the simulation once every request has completed. The
+        clients' callbacks are bound methods rather than closures, so that the simulation can be checkpointed
+        """
+        if self.issued >= self.count:
+            if len(self.outputs) >= self.count:
+                self.finished_at = self.network.now
+                self.network.stop()
+            return
+        self.issued += 1
+        done = partial(self.completed, node, self.network.now)
+        Requester(node, self.input_fn(self.issued), done).start()
+
+    # pylint: disable-next=missing-function-docstring
+    def completed(self, node: Node, sent_at: float, output):
+        self.latencies.append(self.network.now - sent_at)
+        self.outputs.append(output)
+        self.request(node)
+
+    def violations(self) -> List[str]:
+        """
+        Checks the cluster against the invariants of the protocol, returning a description of each violation: replicas
+        must agree on the decision of every slot, replicas that committed the same slots must have the same state, and
+        every request must complete
+        """
+        replicas = [
+            role
+            for node in self.nodes
+            for role in node.roles
+            if isinstance(role, Replica)
+        ]
+        violations = []
+        decided: Dict[int, Tuple[str, Proposal]] = {}
+        for replica in replicas:
+            for slot, proposal in replica.decisions.items():
+                first = decided.setdefault(slot, (replica.node.address, proposal))
+                if first[1] != proposal:
+                    violations.append(
+                        f"slot {slot} decided as {first[1]} on {first[0]}"
+                        f" and as {proposal} on {replica.node.address}"
+                    )
+        states: Dict[int, Tuple[str, object]] = {}
+        for replica in replicas:
+            first = states.setdefault(
+                replica.slot, (replica.node.address, replica.state)
+            )
+            if first[1] != replica.state:
+                violations.append(
+                    f"state at slot {replica.slot} is {first[1]} on {first[0]}"
+                    f" and {replica.state} on {replica.node.address}"
+                )
+        if len(self.outputs) < self.count:
+            violations.append(
+                f"only {len(self.outputs)} of {self.count} requests completed"
+            )
+        return violations
+
+    def results(self) -> dict:
+        """
+        Returns the throughput and latency of the requests made so far
+        """
+        commits = len(self.outputs)
+        sim_time = (self.finished_at or 0.0) - (self.started_at or 0.0)
+        return {
+            "commits": commits,
+            "sim_seconds": sim_time,
+            "wall_seconds": self.wall_time,
+            "commits_per_sim_second": commits / sim_time if sim_time else 0.0,
+            "commits_per_wall_second": (
+                commits / self.wall_time if self.wall_time else 0.0
+            ),
+            "latency_p50": percentile(self.latencies, 50),
+            "latency_p99": percentile(self.latencies, 99),
+        }
@@ -0,0 +1,171 @@
+"""
+Sweeps run simulations across seeds and cluster configurations on all cores.
+
+    python -m konsensus.sweep --seeds 1000 --sizes 3 5 --drop-probs 0 0.1 --output runs.jsonl
+
+Each run is a Simulation checked against the protocol's invariants. Summaries of the runs are written as JSON lines as
+they complete, and the distributions of throughput and latency across seeds are printed for each configuration once
+the sweep is done. The sweep stops at the first run that violates an invariant, unless --keep-going is given, and the
+exit status is non-zero if any run did.
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import nullcontext
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+import argparse
+import itertools
+import json
+import sys
+
+from .simulation import Simulation, percentile
+
+# parameters of a run, other than its seed, that make up its configuration
+CONFIGURATION = (
+    "size",
+    "drop_prob",
+    "prop_delay",
+    "bandwidth",
+    "requests",
+    "clients",
+)
+# results whose distribution across seeds is reported for each configuration
+DISTRIBUTIONS = ("commits_per_sim_second", "latency_p50", "latency_p99")
+
+
+def grid(seeds: Iterable[int], **axes: Sequence) -> List[Dict]:
+    """
+    Returns the parameters of one run for every combination of a seed and a value of each axis, e.g.
+    grid(range(100), size=[3, 5], drop_prob=[0.0, 0.1])
+    """
+    names = ["seed"] + list(axes)
+    return [
+        dict(zip(names, values))
+        for values in itertools.product(seeds, *axes.values())
+    ]
+
+
+def run(params: Dict) -> Dict:
+    """
+    Runs one simulation, returning its parameters, its results and the invariants it violated. Parameters other than
+    seed default to a 3-node cluster making 100 requests from one client
+    """
+    simulation = Simulation(
+        params["seed"],
+        params.get("size", 3),
+        drop_prob=params.get("drop_prob"),
+        prop_delay=params.get("prop_delay"),
+        bandwidth=params.get("bandwidth"),
+    )
+    simulation.run_requests(
+        params.get("requests", 100),
+        clients=params.get("clients", 1),
+        time_limit=params.get("time_limit", 3600.0),
+    )
+    summary = dict(params)
+    summary.update(simulation.results())
+    summary["violations"] = simulation.violations()
+    return summary
+
+
+def sweep(
+    runs: Iterable[Dict],
+    workers: Optional[int] = None,
+    stop_on_violation: bool = True,
+    run_fn: Callable[[Dict], Dict] = run,
+) -> Iterator[Dict]:
+    """
+    Runs run_fn for each set of parameters in a pool of worker processes, one per core by default, and yields the
+    summaries in the order the runs complete. With stop_on_violation, runs that have not started yet are cancelled
+    once a summary reports violations; closing the iterator early cancels them as well
+    """
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        futures = [executor.submit(run_fn, params) for params in runs]
+        for future in as_completed(futures):
+            summary = future.result()
+            yield summary
+            if stop_on_violation and summary["violations"]:
+                return
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
+def aggregate(summaries: Iterable[Dict]) -> List[Dict]:
+    """
+    Groups summaries by configuration, returning for each one the number of runs and of runs with violations, and the
+    minimum, median, 99th percentile and maximum of each result across seeds
+    """
+    groups: Dict[tuple, List[Dict]] = {}
+    for summary in summaries:
+        key = tuple(summary.get(name) for name in CONFIGURATION)
+        groups.setdefault(key, []).append(summary)
+
+    aggregates = []
+    for key, group in sorted(groups.items(), key=lambda item: repr(item[0])):
+        result = dict(zip(CONFIGURATION, key))
+        result["runs"] = len(group)
+        result["failed"] = sum(1 for summary in group if summary["violations"])
+        for name in DISTRIBUTIONS:
+            values = [s[name] for s in group if s.get(name) is not None]
+            result[name] = {
+                "min": min(values, default=None),
+                "p50": percentile(values, 50),
+                "p99": percentile(values, 99),
+                "max": max(values, default=None),
+            }
+        aggregates.append(result)
+    return aggregates
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Runs the sweep given on the command line, returning the exit status
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--seeds", type=int, default=100, help="number of seeds")
+    parser.add_argument("--first-seed", type=int, default=0)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[3])
+    parser.add_argument("--drop-probs", type=float, nargs="+", default=[0.05])
+    parser.add_argument("--prop-delays", type=float, nargs="+", default=[0.03])
+    parser.add_argument(
+        "--bandwidths",
+        type=float,
+        nargs="+",
+        default=[None],
+        help="bytes per second of every link (unlimited)",
+    )
+    parser.add_argument("--requests", type=int, nargs="+", default=[100])
+    parser.add_argument("--clients", type=int, nargs="+", default=[1])
+    parser.add_argument("--workers", type=int, help="worker processes (all cores)")
+    parser.add_argument(
+        "--keep-going", action="store_true", help="do not stop at the first violation"
+    )
+    parser.add_argument("--output", help="write run summaries to this JSON lines file")
+    args = parser.parse_args(argv)
+
+    runs = grid(
+        range(args.first_seed, args.first_seed + args.seeds),
+        size=args.sizes,
+        drop_prob=args.drop_probs,
+        prop_delay=args.prop_delays,
+        bandwidth=args.bandwidths,
+        requests=args.requests,
+        clients=args.clients,
+    )
+    summaries = []
+    with (
+        open(args.output, "w", encoding="utf-8") if args.output else nullcontext()
+    ) as output:
+        for summary in sweep(runs, args.workers, not args.keep_going):
+            summaries.append(summary)
+            if output:
+                output.write(json.dumps(summary) + "\n")
+                output.flush()
+            for violation in summary["violations"]:
+                print(f"seed {summary['seed']}: {violation}", file=sys.stderr)
+
+    print(json.dumps(aggregate(summaries), indent=2))
+    return 1 if any(summary["violations"] for summary in summaries) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
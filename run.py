@@ -3,6 +3,7 @@ import logging
 from konsensus.models.roles.seed import Seed
 from konsensus.models.roles.bootstrap import Bootstrap
 from konsensus.models.roles.requester import Requester
+from konsensus.models.execution import ParallelExecution
 from konsensus.network import Network
 
 
@@ -14,6 +15,10 @@ def key_value_state_machine(state, input_value):
         return state, input_value[2]
 
 
+def key_value_keys(input_value):
+    return [input_value[1]]
+
+
 sequences_running = 0
 
 
@@ -54,13 +59,14 @@ def main():
     network = Network(int(sys.argv[1]))
 
     peers = ['N%d' % i for i in range(7)]
+    execute_fn = ParallelExecution(key_value_state_machine, key_value_keys)
 
     for p in peers:
         node = network.new_node(address=p)
         if p == 'N0':
-            Seed(node, initial_state={}, peers=peers, execute_fn=key_value_state_machine)
+            Seed(node, initial_state={}, peers=peers, execute_fn=execute_fn)
         else:
-            Bootstrap(node, execute_fn=key_value_state_machine, peers=peers).start()
+            Bootstrap(node, execute_fn=execute_fn, peers=peers).start()
 
     for key in 'abcdefg':
         do_sequence(network, node, key)
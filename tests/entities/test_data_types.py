@@ -0,0 +1,32 @@
+import copy
+import pickle
+import unittest
+from konsensus.constants import NULL_BALLOT
+from konsensus.entities.data_types import Ballot
+
+
+class BallotTestCases(unittest.TestCase):
+    def test_order(self):
+        """Ballots compare by number and then leader, after the null ballot"""
+        self.assertLess(NULL_BALLOT, Ballot(0, 0))
+        self.assertLess(Ballot(3, 2), Ballot(3, 5))
+        self.assertLess(Ballot(3, 5), Ballot(4, 0))
+        self.assertEqual(max(Ballot(3, 5), Ballot(4, 0)), Ballot(4, 0))
+
+    def test_fields(self):
+        """A ballot unpacks into its number and leader"""
+        ballot = Ballot(n=12, leader=3)
+        self.assertEqual((ballot.n, ballot.leader), (12, 3))
+        self.assertEqual(Ballot.unpack(int(ballot)), ballot)
+        self.assertEqual(repr(ballot), "Ballot(n=12, leader=3)")
+
+    def test_copy(self):
+        """Ballots survive being pickled, and are not copied"""
+        ballot = Ballot(12, 3)
+        self.assertIsInstance(pickle.loads(pickle.dumps(ballot)), Ballot)
+        self.assertEqual(pickle.loads(pickle.dumps(ballot)), ballot)
+        self.assertIs(copy.deepcopy(ballot), ballot)
+
+
+if __name__ == "__main__":
+    unittest.main()
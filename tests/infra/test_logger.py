@@ -0,0 +1,40 @@
+import logging
+import unittest
+from konsensus.network import Network
+from konsensus.models.roles import Role
+
+
+class LoggingRole(Role):
+    pass
+
+
+class SimTimeLoggerTestCases(unittest.TestCase):
+    def setUp(self):
+        self.network = Network(1234)
+        self.network.now = 12.5
+
+    def test_role_logger(self):
+        """Roles log with the simulated time and their node, and the node and role as fields of the record"""
+        node = self.network.new_node("N1")
+        role = LoggingRole(node)
+        with self.assertLogs("konsensus.node", level="INFO") as logs:
+            role.logger.info("hello")
+        (record,) = logs.records
+        self.assertEqual(record.name, "konsensus.node.LoggingRole")
+        self.assertEqual(record.getMessage(), "T=12.5 N1 hello")
+        self.assertEqual((record.node, record.role), ("N1", "LoggingRole"))
+
+    def test_shared(self):
+        """Roles of a class share a logger on each node, and nodes register no loggers of their own"""
+        LoggingRole(self.network.new_node("N0"))
+        registered = len(logging.Logger.manager.loggerDict)
+        nodes = [self.network.new_node(f"M{n}") for n in range(3)]
+        roles = [LoggingRole(node) for node in nodes + nodes]
+        self.assertIs(roles[0].logger, roles[3].logger)
+        self.assertIsNot(roles[0].logger, roles[1].logger)
+        self.assertIs(roles[0].logger.logger, roles[1].logger.logger)
+        self.assertEqual(len(logging.Logger.manager.loggerDict), registered)
+
+
+if __name__ == "__main__":
+    unittest.main()
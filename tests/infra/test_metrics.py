@@ -0,0 +1,79 @@
+import unittest
+from konsensus.infra.metrics import Metrics, NullMetrics
+
+
+class MetricsTestCases(unittest.TestCase):
+    def setUp(self):
+        self.metrics = Metrics(buckets=(0.1, 1.0))
+
+    def test_counters(self):
+        """Counters are kept per name and labels"""
+        self.metrics.inc("messages_sent", type="Accept")
+        self.metrics.inc("messages_sent", 2, type="Accept")
+        self.metrics.inc("messages_sent", type="Join")
+        self.metrics.inc("scouts")
+        self.assertEqual(self.metrics.snapshot()["counters"], {
+            'messages_sent{type="Accept"}': 3, 'messages_sent{type="Join"}': 1, "scouts": 1,
+        })
+
+    def test_gauges(self):
+        """Gauges are either set or read from a function when exported"""
+        heap = []
+        self.metrics.set("slot", 4, node="N1")
+        self.metrics.gauge("heap", lambda: len(heap))
+        heap.append(1)
+        self.assertEqual(self.metrics.snapshot()["gauges"], {"heap": 1, 'slot{node="N1"}': 4})
+
+    def test_remove_gauge(self):
+        """A gauge function is only unregistered by the one who registered it"""
+        def first():
+            return 1
+
+        def second():
+            return 2
+
+        self.metrics.gauge("heap", first, node="N1")
+        self.metrics.gauge("heap", second, node="N1")
+        self.metrics.remove_gauge("heap", first, node="N1")
+        self.assertEqual(self.metrics.snapshot()["gauges"], {'heap{node="N1"}': 2})
+        self.metrics.remove_gauge("heap", second, node="N1")
+        self.assertEqual(self.metrics.snapshot()["gauges"], {})
+
+    def test_histograms(self):
+        """Histograms count values in cumulative buckets"""
+        for value in (0.05, 0.1, 0.5, 3):
+            self.metrics.observe("latency", value)
+        self.assertEqual(self.metrics.snapshot()["histograms"], {
+            "latency": {"buckets": {"0.1": 2, "1.0": 3, "+Inf": 4}, "sum": 3.65, "count": 4},
+        })
+
+    def test_prometheus(self):
+        """All series are exported in the Prometheus text format"""
+        self.metrics.inc("messages_sent", type="Accept")
+        self.metrics.set("heap", 2)
+        self.metrics.observe("latency", 0.5, node="N1")
+        self.assertEqual(self.metrics.prometheus(), "\n".join([
+            "# TYPE konsensus_messages_sent_total counter",
+            'konsensus_messages_sent_total{type="Accept"} 1',
+            "# TYPE konsensus_heap gauge",
+            "konsensus_heap 2",
+            "# TYPE konsensus_latency histogram",
+            'konsensus_latency_bucket{node="N1",le="0.1"} 0',
+            'konsensus_latency_bucket{node="N1",le="1.0"} 1',
+            'konsensus_latency_bucket{node="N1",le="+Inf"} 1',
+            'konsensus_latency_sum{node="N1"} 0.5',
+            'konsensus_latency_count{node="N1"} 1',
+        ]) + "\n")
+
+    def test_null_metrics(self):
+        """NullMetrics records nothing"""
+        metrics = NullMetrics()
+        metrics.inc("scouts")
+        metrics.set("slot", 1)
+        metrics.gauge("heap", lambda: 1)
+        metrics.observe("latency", 1)
+        self.assertEqual(metrics.snapshot(), {"counters": {}, "gauges": {}, "histograms": {}})
+
+
+if __name__ == '__main__':
+    unittest.main()
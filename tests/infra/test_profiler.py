@@ -0,0 +1,71 @@
+import os
+import tempfile
+import unittest
+from itertools import count
+from konsensus.network import Network
+from konsensus.infra.profiler import Profiler
+from konsensus.models.roles import Role
+from konsensus.entities.messages_types import Join
+
+
+class ProfiledRole(Role):
+    def do_join(self, sender):
+        pass
+
+    def tick(self):
+        pass
+
+
+class ProfilerTestCases(unittest.TestCase):
+    def setUp(self):
+        # every reading of the clock advances it by one microsecond
+        ticks = count()
+        self.profiler = Profiler(clock=lambda: next(ticks) / 1e6)
+
+    def test_nested_frames(self):
+        """Frames record their own time, excluding nested frames, per stack and simulated second"""
+        self.profiler.enter("receive:Join", 1000.5)
+        self.profiler.enter("Replica.do_join", 1000.5)
+        self.profiler.exit()
+        self.profiler.exit()
+        self.profiler.enter("timer:Leader.start", 1001.2)
+        self.profiler.exit()
+        self.assertEqual(self.profiler.collapsed(), "receive:Join 2\nreceive:Join;Replica.do_join 1\ntimer:Leader.start 1\n")
+        self.assertEqual(self.profiler.collapsed(1001), "timer:Leader.start 1\n")
+        self.assertEqual(
+            {frame: round(seconds * 1e6) for frame, seconds in self.profiler.handlers().items()},
+            {"receive:Join": 2, "Replica.do_join": 1, "timer:Leader.start": 1})
+
+    def test_dump(self):
+        """Collapsed stacks are written to a file"""
+        self.profiler.enter("receive:Join", 0)
+        self.profiler.exit()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "out.folded")
+            self.profiler.dump(path)
+            with open(path, encoding="utf-8") as folded:
+                self.assertEqual(folded.read(), "receive:Join 1\n")
+
+    def test_network(self):
+        """The network times deliveries and role timers, and nodes time the handlers of each role"""
+        network = Network(1234, profiler=self.profiler)
+        sender = network.new_node("S")
+        receiver = network.new_node("R")
+        role = ProfiledRole(receiver)
+        role.set_timer(1, role.tick)
+        sender.send([sender.address], Join())
+        network.run()
+        self.assertEqual(
+            [";".join(stack) for stack in self.profiler.totals],
+            ["receive:Join", "timer:ProfiledRole.tick"])
+        sender.send([receiver.address], Join())
+        network.run()
+        self.assertIn(("receive:Join", "ProfiledRole.do_join"), self.profiler.totals)
+
+    def test_disabled(self):
+        """Networks do not profile unless given a profiler"""
+        self.assertIsNone(Network(1234).profiler)
+
+
+if __name__ == '__main__':
+    unittest.main()
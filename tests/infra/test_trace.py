@@ -0,0 +1,55 @@
+import io
+from functools import partial
+import unittest
+from konsensus.network import Network
+from konsensus.infra.trace import Checkpoint, Delivery, TimerFired, TraceRecorder, iter_trace, load_state
+from konsensus.entities.data_types import Ballot
+from konsensus.entities.messages_types import Join, Prepare
+
+
+class TraceTestCases(unittest.TestCase):
+    def setUp(self):
+        self.output = io.BytesIO()
+        self.network = Network(1234, trace=TraceRecorder(self.output, checkpoint_interval=10.0))
+        self.network.DROP_PROB = 0.0
+        self.sender = self.network.new_node("S")
+        self.receiver = self.network.new_node("R")
+
+    def events(self):
+        return list(iter_trace(io.BytesIO(self.output.getvalue())))
+
+    def test_record(self):
+        """Deliveries and timers are recorded in the order they run, after a checkpoint"""
+        timer = self.network.set_timer("S", 1.0, partial(self.sender.logger.info, "tick"))
+        self.sender.send(["R"], Prepare(ballot_num=Ballot(n=3, leader=0)))
+        self.sender.send(["R"], Join())
+        self.network.run()
+        events = self.events()
+        self.assertIsInstance(events[0], Checkpoint)
+        self.assertEqual([type(event) for event in events[1:]], [Delivery, Delivery, TimerFired])
+        self.assertEqual(events[1][1:], ("S", "R", Prepare(ballot_num=Ballot(n=3, leader=0))))
+        self.assertEqual(events[2][1:], ("S", "R", Join()))
+        self.assertEqual(events[3], TimerFired(time=timer.expires, seq=timer.seq))
+
+    def test_cancelled_timers(self):
+        """Cancelled timers are not recorded"""
+        self.network.set_timer("S", 1.0, lambda: None).cancel()
+        self.network.run()
+        self.assertEqual(self.events(), [])
+
+    def test_checkpoint(self):
+        """Checkpoints hold the nodes and the live timers, referring to the network they are loaded into"""
+        self.network.set_timer("S", 1.0, partial(self.sender.logger.info, "tick"))
+        self.network.set_timer("S", 100.0, partial(self.sender.logger.info, "tock"))
+        self.network.run()
+        checkpoint = [event for event in self.events() if isinstance(event, Checkpoint)][-1]
+        other = Network(1)
+        state = load_state(checkpoint.state, other)
+        self.assertEqual(sorted(state["nodes"]), ["R", "S"])
+        self.assertIs(state["nodes"]["S"].network, other)
+        self.assertEqual(list(state["timers"]), [1])
+        self.assertEqual(state["next_seq"], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,9 @@
 import unittest
 from konsensus.models.roles.acceptor import Acceptor
 from konsensus.entities.data_types import Ballot, Proposal
-from konsensus.entities.messages_types import Prepare, Promise, Accepting
+from konsensus.entities.messages_types import (
+    Prepare, Promise, Accept, Accepted, Accepting, Decision, DecisionRange, DecisionRequest
+)
 from tests.base_test_case import BaseTestCase
 
 
@@ -19,7 +21,7 @@ class AcceptorTestCase(BaseTestCase):
         """On PREPARE with a new ballot, Acceptor returns a PROMISE with the new ballot
         and send an ACCEPTING message"""
         proposal = Proposal('cli', 123, 'INC')
-        self.acceptor.accepted_proposals = {33: (Ballot(19, 19), proposal)}
+        self.acceptor.accepted_proposals.update({33: (Ballot(19, 19), proposal)})
         self.acceptor.ballot_num = Ballot(10, 10)
         self.node.fake_message(Prepare(
                                # newer than the acceptor's ballot_num
@@ -34,6 +36,30 @@ class AcceptorTestCase(BaseTestCase):
                            accepted_proposals=accepted_proposals))
         self.assertState(Ballot(19, 19), {33: (Ballot(19, 19), proposal)})
 
+    def test_decision_range(self):
+        """A DecisionRange is resolved from proposals accepted at the deciding ballot or later, and the rest are
+        requested from the sender"""
+        proposal1 = Proposal('cli', 123, 'INC')
+        proposal2 = Proposal('cli', 124, 'DEC')
+        self.acceptor.accepted_proposals.update({
+            1: (Ballot(5, 5), proposal1),
+            2: (Ballot(4, 4), proposal2),
+            4: (Ballot(6, 6), proposal2),
+        })
+        self.node.fake_message(DecisionRange(first_slot=1, last_slot=4, ballot_num=Ballot(5, 5)), sender='L')
+        self.assertMessage(['F999'], Decision(slot=1, proposal=proposal1))
+        self.assertMessage(['F999'], Decision(slot=4, proposal=proposal2))
+        self.assertMessage(['L'], DecisionRequest(slots=[2, 3]))
+
+    def test_accept_interned(self):
+        """An accepted proposal is kept as the node's copy of it"""
+        proposal = Proposal('cli', 123, 'INC')
+        self.node.interner.intern(proposal)
+        self.node.fake_message(Accept(slot=1, ballot_num=Ballot(5, 5), proposal=Proposal('cli', 123, 'INC')),
+                               sender='L')
+        self.assertMessage(['L'], Accepted(slot=1, ballot_num=Ballot(5, 5)))
+        self.assertIs(self.acceptor.accepted_proposals[1][1], proposal)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -7,7 +7,7 @@ from konsensus.models.roles.commander import Commander
 from konsensus.models.roles.scout import Scout
 from konsensus.models.roles.bootstrap import Bootstrap
 from konsensus.constants import JOIN_RETRANSMIT
-from konsensus.entities.messages_types import Join, Welcome
+from konsensus.entities.messages_types import Join, Learn, Welcome
 from tests.base_test_case import BaseTestCase
 
 
@@ -31,20 +31,40 @@ class BootstrapTestCase(BaseTestCase):
         """After start(), the bootstrap sends JOIN to each node in sequence until hearing WELCOME"""
         self.bootstrap.start()
 
-        for recip in 'p1', 'p2', 'p3', 'p1':
+        # each peer's timeout doubles every time it is tried again
+        for recip, attempt in ('p1', 0), ('p2', 0), ('p3', 0), ('p1', 1):
             self.assertMessage([recip], Join())
-            self.network.tick(JOIN_RETRANSMIT)
+            self.network.tick(JOIN_RETRANSMIT * 2 ** attempt)
         self.assertMessage(['p2'], Join())
 
-        self.node.fake_message(Welcome(state='st', slot='sl', decisions={}))
+        self.node.fake_message(Welcome(state='st', slot='sl', decisions={}, configs=[(0, ['p1', 'p2', 'p3'])],
+                                       directory=['p1', 'p2', 'p3', 'p4']))
         self.acceptor.assert_called_with(self.node)
         self.replica.assert_called_with(self.node, execute_fn=self.execute_fn, decisions={}, state="st", slot="sl",
-                                        peers=['p1', 'p2', 'p3'])
-        self.leader.assert_called_with(self.node, peers=['p1', 'p2', 'p3'], commander=self.commander, scout=self.scout)
+                                        peers=['p1', 'p2', 'p3'], configs=[(0, ['p1', 'p2', 'p3'])],
+                                        directory=['p1', 'p2', 'p3', 'p4'])
+        self.leader.assert_called_with(self.node, peers=['p1', 'p2', 'p3'], commander=self.commander, scout=self.scout,
+                                       membership=self.replica().membership)
         self.leader().start.assert_called_with()
         self.assertTimers([])
         self.assertUnregistered()
 
+    def test_learner(self):
+        """A learner sends LEARN instead of JOIN, and only starts a replica once welcomed"""
+        self.bootstrap.stop()
+        self.bootstrap = Bootstrap(self.node, ['p1', 'p2', 'p3'], self.execute_fn, replica=self.replica,
+                                   acceptor=self.acceptor, leader=self.leader, learner=True)
+        self.bootstrap.start()
+        self.assertMessage(['p1'], Learn())
+        self.node.fake_message(Welcome(state='st', slot='sl', decisions={}, configs=[(0, ['p1', 'p2', 'p3'])],
+                                       directory=['p1', 'p2', 'p3', 'p4']))
+        self.replica.assert_called_with(self.node, execute_fn=self.execute_fn, decisions={}, state="st", slot="sl",
+                                        peers=['p1', 'p2', 'p3'], configs=[(0, ['p1', 'p2', 'p3'])],
+                                        directory=['p1', 'p2', 'p3', 'p4'], learner=True)
+        self.assertFalse(self.acceptor.called)
+        self.assertFalse(self.leader.called)
+        self.assertUnregistered()
+
 
 if __name__ == '__main__':
     unittest.main()
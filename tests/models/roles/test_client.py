@@ -0,0 +1,79 @@
+import unittest
+import unittest.mock as mock
+from konsensus.models.roles.client import Client
+from konsensus.models.roles.requester import ExpiredError, OverloadedError
+from konsensus.entities.messages_types import Expired, Invoke, Invoked, Overloaded
+from konsensus.constants import INVOKE_RETRANSMIT, RETRANSMIT_JITTER
+from tests.base_test_case import BaseTestCase
+
+
+class ClientTestCase(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client = Client(self.node)
+        self.callbacks = [mock.Mock(name="callback1"), mock.Mock(name="callback2")]
+
+    def tearDown(self):
+        for request in self.client.requests.values():
+            request.retransmitter.cancel()
+        super().tearDown()
+
+    def test_concurrent_requests(self):
+        """Requests are retransmitted until their own INVOKED arrives"""
+        first = self.client.request(10, self.callbacks[0]).client_id
+        second = self.client.request(20, self.callbacks[1]).client_id
+        self.assertMessage(["F999"], Invoke(caller="F999", client_id=first, input_value=10))
+        self.assertMessage(["F999"], Invoke(caller="F999", client_id=second, input_value=20))
+        self.node.fake_message(Invoked(client_id=second, output=21))
+        self.callbacks[1].assert_called_once_with(21)
+        self.network.tick(INVOKE_RETRANSMIT)
+        self.assertMessage(["F999"], Invoke(caller="F999", client_id=first, input_value=10))
+        self.assertFalse(self.callbacks[0].called)
+        self.assertEqual(list(self.client.requests), [first])
+
+    def test_overloaded(self):
+        """A request rejected with OVERLOADED is retried under a new client id after retry_after"""
+        first = self.client.request(10, self.callbacks[0]).client_id
+        self.assertMessage(["F999"], Invoke(caller="F999", client_id=first, input_value=10))
+        self.node.fake_message(Overloaded(client_id=first, retry_after=5.0))
+        self.network.tick(5.0 * (1 + RETRANSMIT_JITTER))
+        (retry,) = self.client.requests
+        self.assertGreater(retry, first)
+        self.assertMessage(["F999"], Invoke(caller="F999", client_id=retry, input_value=10))
+
+    def test_cancel(self):
+        """A cancelled request is neither retransmitted nor called back, even after a retry gave it a new client id"""
+        request = self.client.request(10, self.callbacks[0])
+        first = request.client_id
+        self.assertMessage(["F999"], Invoke(caller="F999", client_id=first, input_value=10))
+        self.node.fake_message(Overloaded(client_id=first, retry_after=5.0))
+        self.client.cancel(request)
+        self.assertEqual(self.client.requests, {})
+        self.network.tick(5.0 * (1 + RETRANSMIT_JITTER) + INVOKE_RETRANSMIT)
+        self.node.fake_message(Invoked(client_id=request.client_id, output=11))
+        self.assertFalse(self.callbacks[0].called)
+
+    def test_overloaded_fail_fast(self):
+        """A fail_fast request calls back with an OverloadedError on OVERLOADED"""
+        first = self.client.request(10, self.callbacks[0], fail_fast=True).client_id
+        self.assertMessage(["F999"], Invoke(caller="F999", client_id=first, input_value=10))
+        self.node.fake_message(Overloaded(client_id=first, retry_after=5.0))
+        (error,) = self.callbacks[0].call_args.args
+        self.assertIsInstance(error, OverloadedError)
+        self.assertEqual(self.client.requests, {})
+
+    def test_expired(self):
+        """A request answered with EXPIRED calls back with an ExpiredError and is no longer retransmitted"""
+        first = self.client.request(10, self.callbacks[0]).client_id
+        self.assertMessage(["F999"], Invoke(caller="F999", client_id=first, input_value=10))
+        self.node.fake_message(Expired(client_id=first))
+        (error,) = self.callbacks[0].call_args.args
+        self.assertIsInstance(error, ExpiredError)
+        self.assertEqual(self.client.requests, {})
+        self.network.tick(INVOKE_RETRANSMIT * 10)
+        self.assertNoMessages()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,7 +2,7 @@ import unittest
 from tests.base_test_case import BaseTestCase
 from konsensus.models.roles.commander import Commander
 from konsensus.constants import ACCEPT_RETRANSMIT
-from konsensus.entities.messages_types import Accept, Accepted, Decision, Decided, Preempted
+from konsensus.entities.messages_types import Accept, Accepted, Decided, Preempted
 from konsensus.entities.data_types import Proposal, Ballot
 
 
@@ -26,18 +26,27 @@ class CommanderTestCases(BaseTestCase):
         self.assertMessage(['p1', 'p2', 'p3'], self.accept_message)
 
         self.node.fake_message(Accepted(slot=self.slot, ballot_num=self.ballot_num), sender='p2')
-        self.network.tick(ACCEPT_RETRANSMIT)
+        # the retransmission timeout of peers that did not respond is doubled each time
+        self.network.tick(ACCEPT_RETRANSMIT * 2)
         self.assertMessage(['p1', 'p3'], self.accept_message)
-        self.network.tick(ACCEPT_RETRANSMIT)
+        self.network.tick(ACCEPT_RETRANSMIT * 4)
         self.assertMessage(['p1', 'p3'], self.accept_message)
         self.node.fake_message(Accepted(slot=self.slot, ballot_num=self.ballot_num), sender='p1')
 
-        # quorum (3/2+1 = 2) reached
-        self.assertMessage(['p1', 'p2', 'p3'], Decision(slot=self.slot, proposal=self.proposal))
+        # quorum (3/2+1 = 2) reached; the leader announces the decision
         self.assertMessage(['F999'], Decided(slot=self.slot))
         self.assertTimers([])
         self.assertUnregistered()
 
+    def test_measures_round_trip(self):
+        """Accepted replies to an Accept that was sent once are sampled into the node's round trip estimates"""
+        self.cmd.start()
+        self.assertMessage(['p1', 'p2', 'p3'], self.accept_message)
+        self.network.tick(0.1)
+        self.node.fake_message(Accepted(slot=self.slot, ballot_num=self.ballot_num), sender='p2')
+        self.assertAlmostEqual(self.node.rtt.peers['p2'].srtt, 0.1)
+        self.assertNotIn('p1', self.node.rtt.peers)
+
     def test_wrong_slot(self):
         """Commander ignores ACCEPTED messages for other commanders"""
         self.cmd.start()
@@ -1,30 +1,46 @@
 import unittest
 import unittest.mock as mock
 from konsensus.models.roles.scout import Scout
+from konsensus.models.roles.prevoter import PreVoter
 from konsensus.models.roles.commander import Commander
 from konsensus.models.roles.leader import Leader
-from konsensus.entities.messages_types import Propose, Preempted, Adopted
+from konsensus.entities.messages_types import (
+    Active, Subscribe, Propose, Preempted, Adopted, Decided, Decision, DecisionRange, PreVoted
+)
+from konsensus.constants import ALPHA, DECISION_FLUSH_INTERVAL, LEADER_TIMEOUT
+from konsensus.models.membership import Membership
 from konsensus.entities.data_types import Proposal, Ballot
 from tests.base_test_case import BaseTestCase
 
 PROPOSAL1 = Proposal(caller='cli', client_id=123, input='one')
 PROPOSAL2 = Proposal(caller='cli', client_id=125, input='two')
 PROPOSAL3 = Proposal(caller='cli', client_id=127, input='tre')
+# indexes of the leaders of ballots: the peers p1 and p2, then the leader's own node
+P2, F999 = 1, 2
 
 
 class LeaderTestCases(BaseTestCase):
     MockScout = mock.create_autospec(Scout)
     MockCommander = mock.create_autospec(Commander)
+    MockPreVoter = mock.create_autospec(PreVoter)
 
     def setUp(self):
         super().setUp()
         self.MockScout.reset_mock()
         self.MockCommander.reset_mock()
-        self.leader = Leader(self.node, ['p1', 'p2'], commander=self.MockCommander, scout=self.MockScout)
+        self.MockPreVoter.reset_mock()
+        self.leader = Leader(
+            self.node, ['p1', 'p2'], commander=self.MockCommander, scout=self.MockScout, prevoter=self.MockPreVoter
+        )
+
+    def assertPreVoterStarted(self, ballot_num):
+        self.MockPreVoter.assert_called_once_with(self.node, ballot_num, ["p1", 'p2'])
+        prevoter = self.MockPreVoter(self.node, ballot_num, ['p1', 'p2'])
+        prevoter.start.assert_called_once_with()
 
     def assertScoutStarted(self, ballot_num):
-        self.MockScout.assert_called_once_with(self.node, ballot_num, ["p1", 'p2'])
-        scout = self.MockScout(self.node, ballot_num, ['p1', 'p2'])
+        self.MockScout.assert_called_once_with(self.node, ballot_num, ["p1", 'p2'], configs=[['p1', 'p2']])
+        scout = self.MockScout(self.node, ballot_num, ['p1', 'p2'], configs=[['p1', 'p2']])
         scout.start.assert_called_once_with()
 
     def assertNoScout(self):
@@ -37,26 +53,160 @@ class LeaderTestCases(BaseTestCase):
 
     def active_leader(self):
         self.leader.active = True
+        self.leader.adopted_configs = [['p1', 'p2']]
 
     def fake_proposal(self, slot, proposal):
         self.leader.proposals[slot] = proposal
+        self.leader.commanded[slot] = self.leader.ballot_num
+
+    def test_start_eager(self):
+        """An eager leader scouts as soon as it starts"""
+        self.leader.stop()
+        self.leader = Leader(self.node, ['p1', 'p2'], commander=self.MockCommander, scout=self.MockScout, eager=True)
+        self.leader.start()
+        self.assertScoutStarted(Ballot(0, F999))
+
+    def test_start(self):
+        """A leader waits for a PROPOSE before scouting"""
+        self.leader.start()
+        self.assertNoScout()
+
+    def test_heartbeat(self):
+        """An active leader sends ACTIVE to its peers every half LEADER_TIMEOUT"""
+        self.active_leader()
+        self.leader.start()
+        self.assertMessage(['p1', 'p2'], Active())
+        self.network.tick(LEADER_TIMEOUT / 2.0)
+        self.assertMessage(['p1', 'p2'], Active())
+        self.assertNoMessages()
+
+    def test_heartbeat_suppressed(self):
+        """The heartbeat is skipped while Accepts go out to the peers, and resumes half LEADER_TIMEOUT after the last"""
+        self.active_leader()
+        self.leader.start()
+        self.assertMessage(['p1', 'p2'], Active())
+        self.network.tick(LEADER_TIMEOUT / 4.0)
+        self.node.fake_message(Propose(slot=10, proposal=PROPOSAL1))
+        self.network.tick(LEADER_TIMEOUT / 4.0)
+        self.assertNoMessages()
+        self.network.tick(LEADER_TIMEOUT / 4.0)
+        self.assertMessage(['p1', 'p2'], Active())
+
+    def test_learners(self):
+        """Subscribed learners get every heartbeat, and each decision in full"""
+        self.active_leader()
+        self.node.fake_message(Subscribe(), sender='l1')
+        self.leader.start()
+        self.assertMessage(['p1', 'p2', 'l1'], Active())
+        self.fake_proposal(3, PROPOSAL1)
+        self.node.fake_message(Decided(slot=3))
+        self.network.tick(DECISION_FLUSH_INTERVAL)
+        self.assertMessage(['p1', 'p2'], DecisionRange(first_slot=3, last_slot=3, ballot_num=Ballot(0, F999)))
+        self.assertMessage(['l1'], Decision(slot=3, proposal=PROPOSAL1))
+        # the DecisionRange stands in for the heartbeat of the peers, but not of the learners
+        self.network.tick(LEADER_TIMEOUT / 2.0 - DECISION_FLUSH_INTERVAL)
+        self.assertMessage(['l1'], Active())
+        self.assertNoMessages()
 
     def test_propose_inactive(self):
-        """A PROPOSE received while inactive spawns a scout"""
+        """A PROPOSE received while inactive holds a pre-vote rather than scouting"""
+        self.node.fake_message(Propose(slot=10, proposal=PROPOSAL1))
+        self.assertPreVoterStarted(Ballot(0, F999))
+        self.assertEqual(self.MockScout.mock_calls, [])
+
+    def test_propose_prevoting(self):
+        """A PROPOSE received while already holding a pre-vote is ignored"""
+        self.node.fake_message(Propose(slot=10, proposal=PROPOSAL1))
         self.node.fake_message(Propose(slot=10, proposal=PROPOSAL1))
-        self.assertScoutStarted(Ballot(0, "F999"))
+        self.assertPreVoterStarted(Ballot(0, F999))
 
     def test_propose_scouting(self):
         """A PROPOSE received while already scouting is ignored"""
+        self.leader.spawn_scout()
         self.node.fake_message(Propose(slot=10, proposal=PROPOSAL1))
+        self.assertScoutStarted(Ballot(0, F999))
+        self.assertEqual(self.MockPreVoter.mock_calls, [])
+
+    def test_prevote_granted(self):
+        """A granted pre-vote spawns a scout"""
+        self.node.fake_message(Propose(slot=10, proposal=PROPOSAL1))
+        self.node.fake_message(PreVoted(granted=True, leader=None))
+        self.assertScoutStarted(Ballot(0, F999))
+        self.assertFalse(self.leader.prevoting)
+
+    def test_prevote_refused(self):
+        """A refused pre-vote makes the leader forward proposals to the leader its peers follow, until LEADER_TIMEOUT"""
         self.node.fake_message(Propose(slot=10, proposal=PROPOSAL1))
-        self.assertScoutStarted(Ballot(0, "F999"))
+        self.node.fake_message(PreVoted(granted=False, leader='p1'))
+        self.assertNoScout()
+        self.node.fake_message(Propose(slot=11, proposal=PROPOSAL2), sender='F999')
+        self.assertMessage(['p1'], Propose(slot=11, proposal=PROPOSAL2))
+        self.MockPreVoter.reset_mock()
+        self.network.tick(LEADER_TIMEOUT)
+        self.node.fake_message(Propose(slot=11, proposal=PROPOSAL2), sender='F999')
+        self.assertPreVoterStarted(Ballot(0, F999))
+
+    def test_propose_from_hinted_leader(self):
+        """A PROPOSE from the hinted leader itself is not sent back to it"""
+        self.leader.follow('p1')
+        self.node.fake_message(Propose(slot=11, proposal=PROPOSAL2), sender='p1')
+        self.assertPreVoterStarted(Ballot(0, F999))
 
     def test_propose_active(self):
         """A PROPOSE received while active spawns a commander"""
         self.active_leader()
         self.node.fake_message(Propose(slot=10, proposal=PROPOSAL1))
-        self.assertCommanderStarted(Ballot(0, "F999"), 10, PROPOSAL1)
+        self.assertCommanderStarted(Ballot(0, F999), 10, PROPOSAL1)
+
+    def test_propose_past_horizon(self):
+        """A PROPOSE for a slot whose peers are not known yet waits until the replica commits far enough"""
+        self.leader.membership = Membership(['p1', 'p2'], slot=1)
+        self.active_leader()
+        self.node.fake_message(Propose(slot=1 + ALPHA, proposal=PROPOSAL1))
+        self.network.tick(DECISION_FLUSH_INTERVAL)
+        self.assertEqual(self.MockCommander.mock_calls, [])
+        self.leader.membership.slot = 2
+        self.network.tick(DECISION_FLUSH_INTERVAL)
+        self.assertCommanderStarted(Ballot(0, F999), 1 + ALPHA, PROPOSAL1)
+        self.assertEqual(self.leader.waiting, {})
+
+    def test_propose_new_peers(self):
+        """A PROPOSE for a slot decided by peers the ballot was not adopted by scouts again, with every configuration"""
+        self.leader.membership = Membership(['p1', 'p2'], slot=2)
+        self.leader.membership.reconfigure(1, ['p1', 'p3'])
+        self.active_leader()
+        self.node.fake_message(Propose(slot=1 + ALPHA, proposal=PROPOSAL1))
+        self.assertEqual(self.MockCommander.mock_calls, [])
+        self.assertFalse(self.leader.active)
+        self.MockScout.assert_called_once_with(
+            self.node, Ballot(0, F999), ['p1', 'p2', 'p3'], configs=[['p1', 'p2'], ['p1', 'p3']]
+        )
+        self.node.fake_message(Adopted(ballot_num=Ballot(0, F999), accepted_proposals={}))
+        self.node.fake_message(Propose(slot=1 + ALPHA, proposal=PROPOSAL1))
+        self.MockCommander.assert_called_once_with(self.node, Ballot(0, F999), 1 + ALPHA, PROPOSAL1, ['p1', 'p3'])
+
+    def test_propose_commanders_busy(self):
+        """A PROPOSE received while max_commanders commanders are running waits for one of them to finish"""
+        self.active_leader()
+        self.leader.max_commanders = 1
+        self.node.fake_message(Propose(slot=10, proposal=PROPOSAL1))
+        self.node.fake_message(Propose(slot=11, proposal=PROPOSAL2))
+        self.assertCommanderStarted(Ballot(0, F999), 10, PROPOSAL1)
+        self.assertEqual(self.leader.waiting, {11: ("F999", PROPOSAL2)})
+        self.MockCommander.reset_mock()
+        self.node.fake_message(Decided(slot=10))
+        self.assertCommanderStarted(Ballot(0, F999), 11, PROPOSAL2)
+        self.assertEqual(self.leader.waiting, {})
+
+    def test_preempted_drops_waiting(self):
+        """Proposals waiting for a commander are dropped when the leader is preempted"""
+        self.active_leader()
+        self.leader.max_commanders = 1
+        self.node.fake_message(Propose(slot=10, proposal=PROPOSAL1))
+        self.node.fake_message(Propose(slot=11, proposal=PROPOSAL2))
+        self.node.fake_message(Preempted(slot=10, preempted_by=Ballot(22, P2)))
+        self.assertEqual(self.leader.waiting, {})
+        self.assertEqual(self.leader.commanding, set())
 
     def test_propose_already(self):
         """A PROPOSE for a slot already in use is ignored"""
@@ -65,23 +215,31 @@ class LeaderTestCases(BaseTestCase):
         self.node.fake_message(Propose(slot=10, proposal=PROPOSAL1))
         self.assertEqual(self.MockCommander.mock_calls, [])
 
+    def test_preempted_by_unknown(self):
+        """A leader preempted by a ballot of a leader it has not heard of takes no hint"""
+        self.active_leader()
+        self.node.fake_message(Preempted(slot=None, preempted_by=Ballot(22, 7)))
+        self.assertEqual(self.leader.ballot_num, Ballot(23, F999))
+        self.assertIsNone(self.leader.leader_hint)
+
     def test_commander_finished_preempted(self):
         """When a commander is preempted, the ballot num is incremented, and the leader is inactive, but no scout is
         spawned
         """
         self.active_leader()
         self.node.fake_message(Propose(slot=10, proposal=PROPOSAL1))
-        self.node.fake_message(Preempted(slot=10, preempted_by=Ballot(22, "XXXX")))
-        self.assertEqual(self.leader.ballot_num, Ballot(23, "F999"))
+        self.node.fake_message(Preempted(slot=10, preempted_by=Ballot(22, P2)))
+        self.assertEqual(self.leader.ballot_num, Ballot(23, F999))
         self.assertNoScout()
         self.assertFalse(self.leader.active)
+        self.assertEqual(self.leader.leader_hint, "p2")
 
     def test_scout_finished_adopted(self):
         """When a scout finishes and the leader is adopted, accepted proposals are merged and the leader becomes active
         """
         self.leader.spawn_scout()
         self.leader.proposals[9] = PROPOSAL2
-        self.node.fake_message(Adopted(ballot_num=Ballot(0, "F999"), accepted_proposals={10: PROPOSAL3}))
+        self.node.fake_message(Adopted(ballot_num=Ballot(0, F999), accepted_proposals={10: PROPOSAL3}))
         self.assertNoScout()
         self.assertTrue(self.leader.active)
         self.assertEqual(self.leader.proposals, {9: PROPOSAL2, 10: PROPOSAL3})
@@ -89,11 +247,83 @@ class LeaderTestCases(BaseTestCase):
     def test_scout_finished_preempted(self):
         """When a scout finishes and the leader is preempted, the leader is inactive & its ballot num is updated"""
         self.leader.spawn_scout()
-        self.node.fake_message(Preempted(slot=None, preempted_by=Ballot(22, "F999")))
+        self.node.fake_message(Preempted(slot=None, preempted_by=Ballot(22, F999)))
         self.assertNoScout()
-        self.assertEqual(self.leader.ballot_num, Ballot(23, "F999"))
+        self.assertEqual(self.leader.ballot_num, Ballot(23, F999))
         self.assertFalse(self.leader.active)
 
+    def test_decisions_coalesced(self):
+        """Consecutive slots decided at the same ballot are announced as one DecisionRange after the flush interval"""
+        for slot, ballot_num in (4, Ballot(1, F999)), (2, Ballot(0, F999)), (3, Ballot(1, F999)):
+            self.leader.proposals[slot] = PROPOSAL1
+            self.leader.commanded[slot] = ballot_num
+            self.node.fake_message(Decided(slot=slot))
+        self.assertNoMessages()
+        self.network.tick(DECISION_FLUSH_INTERVAL)
+        self.assertMessage(['p1', 'p2'], DecisionRange(first_slot=2, last_slot=2, ballot_num=Ballot(0, F999)))
+        self.assertMessage(['p1', 'p2'], DecisionRange(first_slot=3, last_slot=4, ballot_num=Ballot(1, F999)))
+
+    def test_propose_decided(self):
+        """A PROPOSE for a slot that is already decided is answered with the decision"""
+        self.active_leader()
+        self.fake_proposal(10, PROPOSAL1)
+        self.leader.decided.add(10)
+        self.node.fake_message(Propose(slot=10, proposal=PROPOSAL2), sender='p1')
+        self.assertMessage(['p1'], Decision(slot=10, proposal=PROPOSAL1))
+        self.assertEqual(self.MockCommander.mock_calls, [])
+
+    def test_decided_forgotten(self):
+        """Announced slots are forgotten with their ballot and not announced again, and proposals once committed"""
+        self.leader.membership = Membership(['p1', 'p2'], slot=1)
+        self.fake_proposal(1, PROPOSAL1)
+        self.fake_proposal(2, PROPOSAL2)
+        self.node.fake_message(Decided(slot=1))
+        self.node.fake_message(Decided(slot=2))
+        self.node.fake_message(Decided(slot=2))
+        self.network.tick(DECISION_FLUSH_INTERVAL)
+        self.assertMessage(['p1', 'p2'], DecisionRange(first_slot=1, last_slot=2, ballot_num=Ballot(0, F999)))
+        self.assertEqual((self.leader.commanded, self.leader.decided), ({}, set()))
+        self.assertEqual(dict(self.leader.proposals), {1: PROPOSAL1, 2: PROPOSAL2})
+        self.leader.membership.slot = 2
+        self.fake_proposal(3, PROPOSAL3)
+        self.node.fake_message(Decided(slot=3))
+        self.network.tick(DECISION_FLUSH_INTERVAL)
+        self.assertMessage(['p1', 'p2'], DecisionRange(first_slot=3, last_slot=3, ballot_num=Ballot(0, F999)))
+        self.assertEqual(dict(self.leader.proposals), {2: PROPOSAL2, 3: PROPOSAL3})
+        self.node.fake_message(Decided(slot=1))
+        self.network.tick(DECISION_FLUSH_INTERVAL)
+        self.assertNoMessages()
+
+    def test_propose_announced(self):
+        """A PROPOSE for a slot that was announced drives it again with the decided proposal"""
+        self.active_leader()
+        self.fake_proposal(10, PROPOSAL1)
+        self.node.fake_message(Decided(slot=10))
+        self.network.tick(DECISION_FLUSH_INTERVAL)
+        self.node.sent.clear()
+        self.node.fake_message(Propose(slot=10, proposal=PROPOSAL2), sender='p1')
+        self.assertCommanderStarted(Ballot(0, F999), 10, PROPOSAL1)
+
+    def test_propose_committed(self):
+        """A PROPOSE for a slot the leader's replica has committed is left to the replica to answer"""
+        self.leader.membership = Membership(['p1', 'p2'], slot=11)
+        self.active_leader()
+        self.node.fake_message(Propose(slot=10, proposal=PROPOSAL2), sender='p1')
+        self.assertNoMessages()
+        self.assertEqual(self.MockCommander.mock_calls, [])
+
+    def test_preempted_forgets_commanded(self):
+        """Preemption forgets the ballots of slots still being commanded, but not of decided ones"""
+        self.active_leader()
+        self.fake_proposal(10, PROPOSAL1)
+        self.fake_proposal(11, PROPOSAL2)
+        self.node.fake_message(Decided(slot=11))
+        self.node.fake_message(Preempted(slot=10, preempted_by=Ballot(22, 7)))
+        self.assertEqual(self.leader.commanded, {11: Ballot(0, F999)})
+        self.node.fake_message(Decided(slot=10))
+        self.network.tick(DECISION_FLUSH_INTERVAL)
+        self.assertMessage(['p1', 'p2'], DecisionRange(first_slot=11, last_slot=11, ballot_num=Ballot(0, F999)))
+
 
 if __name__ == '__main__':
     unittest.main()
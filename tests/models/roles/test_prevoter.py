@@ -0,0 +1,49 @@
+import unittest
+from konsensus.entities.data_types import Ballot
+from konsensus.entities.messages_types import PreVote, PreVoteReply, PreVoted
+from konsensus.models.roles.prevoter import PreVoter
+from konsensus.constants import PREPARE_RETRANSMIT
+from tests.base_test_case import BaseTestCase
+
+BALLOT = Ballot(1, 9)
+
+
+class PreVoterTestCase(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.prevoter = PreVoter(self.node, BALLOT, peers=["p1", "p2", "p3"])
+        self.prevoter.start()
+        self.assertMessage(["p1", "p2", "p3"], PreVote(ballot_num=BALLOT))
+
+    def test_retransmit(self):
+        """The PREVOTE is re-sent to the peers that have not replied"""
+        self.node.fake_message(PreVoteReply(ballot_num=BALLOT, granted=False, leader="p2"), sender="p1")
+        self.network.tick(PREPARE_RETRANSMIT)
+        self.assertMessage(["p2", "p3"], PreVote(ballot_num=BALLOT))
+
+    def test_granted(self):
+        """After a quorum of grants, the pre-voter finishes and sends a granted PREVOTED"""
+        self.node.fake_message(PreVoteReply(ballot_num=BALLOT, granted=True, leader=None), sender="p1")
+        self.assertNoMessages()
+        self.node.fake_message(PreVoteReply(ballot_num=BALLOT, granted=True, leader="p2"), sender="p3")
+        self.assertMessage(["F999"], PreVoted(granted=True, leader=None))
+        self.assertUnregistered()
+
+    def test_refused(self):
+        """Once a quorum can no longer grant it, the pre-voter reports the leader the refusing peers follow"""
+        self.node.fake_message(PreVoteReply(ballot_num=BALLOT, granted=False, leader="p2"), sender="p1")
+        self.assertNoMessages()
+        self.node.fake_message(PreVoteReply(ballot_num=BALLOT, granted=False, leader="p2"), sender="p3")
+        self.assertMessage(["F999"], PreVoted(granted=False, leader="p2"))
+        self.assertUnregistered()
+
+    def test_other_ballot(self):
+        """Replies to another pre-vote are ignored"""
+        self.node.fake_message(PreVoteReply(ballot_num=Ballot(0, 9), granted=True, leader=None), sender="p1")
+        self.node.fake_message(PreVoteReply(ballot_num=Ballot(0, 9), granted=True, leader=None), sender="p3")
+        self.assertNoMessages()
+
+
+if __name__ == '__main__':
+    unittest.main()
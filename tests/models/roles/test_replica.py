@@ -1,8 +1,14 @@
 import unittest
 import unittest.mock as mock
-from konsensus.entities.data_types import Proposal
-from konsensus.entities.messages_types import Invoke, Propose, Decision, Join, Welcome
+from konsensus.entities.data_types import Proposal, Reconfigure
+from konsensus.entities.data_types import Ballot
+from konsensus.entities.messages_types import (
+    Accept, Active, Adopted, DecisionRange, Invoke, Invoked, Overloaded, Propose, Decision, DecisionRequest, Join, Welcome, PreVote, PreVoteReply, Learn, Subscribe, Expired
+)
+from konsensus.constants import ALPHA, CATCHUP_INTERVAL, LEADER_TIMEOUT, NOOP_PROPOSAL, OVERLOAD_RETRY_AFTER
 from konsensus.models.roles.replica import Replica
+from konsensus.infra.metrics import Metrics
+from konsensus.models.sessions import UNKNOWN
 from tests.base_test_case import BaseTestCase
 
 PROPOSAL1 = Proposal(caller='test', client_id=111, input='uno')
@@ -30,11 +36,71 @@ class ReplicaTestCase(BaseTestCase):
             Invoke(caller=PROPOSAL2.caller, client_id=PROPOSAL2.client_id, input_value=PROPOSAL2.input))
         propose.assert_called_with(PROPOSAL2, None)
 
+    def test_invoke_repeat(self):
+        """An INVOKE with a proposal that is already in flight is re-proposed with the same slot"""
+        self.replica.propose(PROPOSAL2)
+        self.assertMessage(["F999"], Propose(slot=2, proposal=PROPOSAL2))
+        self.node.fake_message(
+            Invoke(caller=PROPOSAL2.caller, client_id=PROPOSAL2.client_id, input_value=PROPOSAL2.input))
+        self.assertEqual(self.replica.next_slot, 3)
+        self.assertMessage(["F999"], Propose(slot=2, proposal=PROPOSAL2))
+
+    @mock.patch.object(Replica, "propose")
+    def test_invoke_committed(self, propose: mock.Mock):
+        """An INVOKE with a proposal that has been committed is answered with the cached output"""
+        self.execute_fn.return_value = ("new state", "out2")
+        self.node.fake_message(Decision(slot=2, proposal=PROPOSAL2))
+        self.assertMessage(["test"], Invoked(client_id=222, output="out2"))
+        self.node.fake_message(
+            Invoke(caller=PROPOSAL2.caller, client_id=PROPOSAL2.client_id, input_value=PROPOSAL2.input))
+        self.assertMessage(["test"], Invoked(client_id=222, output="out2"))
+        self.assertFalse(propose.called)
+
     @mock.patch.object(Replica, "propose")
-    def test_invoke_repeat(self, propose: mock.Mock):
-        """An INVOKE with a proposal that has already been seen is ignored"""
-        self.replica.proposals[1] = PROPOSAL1
-        self.failIf(propose.called)
+    def test_invoke_committed_unknown(self, propose: mock.Mock):
+        """An INVOKE with a proposal committed before the replica joined is not answered or proposed again"""
+        self.node.fake_message(
+            Invoke(caller=PROPOSAL1.caller, client_id=PROPOSAL1.client_id, input_value=PROPOSAL1.input))
+        self.assertFalse(propose.called)
+
+    @mock.patch("konsensus.models.sessions.SESSION_OUTPUTS", 1)
+    @mock.patch.object(Replica, "propose")
+    def test_invoke_expired(self, propose: mock.Mock):
+        """An INVOKE with a proposal whose output was dropped from its session is answered with EXPIRED"""
+        self.execute_fn.side_effect = [("state2", "out2"), ("state3", "out3")]
+        self.node.fake_message(Decision(slot=2, proposal=PROPOSAL2))
+        self.assertMessage(["test"], Invoked(client_id=222, output="out2"))
+        self.node.fake_message(Decision(slot=3, proposal=PROPOSAL3))
+        self.assertMessage(["test"], Invoked(client_id=333, output="out3"))
+        self.node.fake_message(
+            Invoke(caller=PROPOSAL2.caller, client_id=PROPOSAL2.client_id, input_value=PROPOSAL2.input))
+        self.assertMessage(["test"], Expired(client_id=222))
+        self.assertFalse(propose.called)
+
+    def test_invoke_queued(self):
+        """An INVOKE received with max_outstanding slots outstanding waits for a slot to be committed"""
+        self.replica.max_outstanding = 1
+        self.execute_fn.return_value = ("new state", "out2")
+        self.replica.propose(PROPOSAL2)
+        self.assertMessage(["F999"], Propose(slot=2, proposal=PROPOSAL2))
+        for _ in range(2):
+            self.node.fake_message(
+                Invoke(caller=PROPOSAL3.caller, client_id=PROPOSAL3.client_id, input_value=PROPOSAL3.input))
+        self.assertEqual(list(self.replica.pending.values()), [PROPOSAL3])
+        self.node.fake_message(Decision(slot=2, proposal=PROPOSAL2))
+        self.assertMessage(["test"], Invoked(client_id=222, output="out2"))
+        self.assertMessage(["F999"], Propose(slot=3, proposal=PROPOSAL3))
+        self.assertEqual(len(self.replica.pending), 0)
+
+    def test_invoke_overloaded(self):
+        """An INVOKE received with max_pending invokes queued is rejected"""
+        self.replica.max_outstanding = 0
+        self.replica.max_pending = 1
+        for proposal in PROPOSAL2, PROPOSAL3:
+            self.node.fake_message(
+                Invoke(caller=proposal.caller, client_id=proposal.client_id, input_value=proposal.input))
+        self.assertMessage(["test"], Overloaded(client_id=333, retry_after=OVERLOAD_RETRY_AFTER))
+        self.assertEqual(list(self.replica.pending.values()), [PROPOSAL2])
 
     def test_propose_new(self):
         """A proposal without a specified slot gets the next slot and is proposed to self"""
@@ -76,7 +142,14 @@ class ReplicaTestCase(BaseTestCase):
         self.assertEqual(self.replica.decisions[3], PROPOSAL3)
         self.assertEqual(commit.call_args_list, [mock.call(2, PROPOSAL2), mock.call(3, PROPOSAL3)])
 
-    @unittest.skip("AssertionError being raised instead of nothing being done on decision being repeated for same slot")
+    @mock.patch.object(Replica, "commit")
+    def test_decision_interned(self, commit: mock.Mock):
+        """A decided proposal is kept as the node's copy of it"""
+        self.replica.propose(PROPOSAL3)
+        self.assertMessage(["F999"], Propose(slot=2, proposal=PROPOSAL3))
+        self.node.fake_message(Decision(slot=2, proposal=PROPOSAL3._replace()))
+        self.assertIs(self.replica.decisions[2], PROPOSAL3)
+
     @mock.patch.object(Replica, "commit")
     def test_decision_repeat(self, commit: mock.Mock):
         """On DECISION for a committed slot with a matching proposal, do nothing"""
@@ -84,14 +157,250 @@ class ReplicaTestCase(BaseTestCase):
         self.assertEqual(self.replica.next_slot, 2)
         self.assertFalse(commit.called)
 
+    def test_decision_duplicate(self):
+        """A proposal decided in two slots is only executed once, and is forgotten once committed"""
+        self.execute_fn.return_value = ("new state", "out2")
+        self.replica.propose(PROPOSAL2)
+        self.assertMessage(["F999"], Propose(slot=2, proposal=PROPOSAL2))
+        self.node.fake_message(Decision(slot=2, proposal=PROPOSAL2))
+        self.node.fake_message(Decision(slot=3, proposal=PROPOSAL2))
+        self.execute_fn.assert_called_once_with("state", "dos")
+        self.assertMessage(["test"], Invoked(client_id=222, output="out2"))
+        self.assertEqual(self.replica.proposals, {})
+        self.assertEqual(self.replica.proposal_slots, {})
+
     def test_decision_repeat_conflict(self):
         """On DECISION for a committed slot with a non-matching proposal, do nothing"""
-        self.assertRaises(AssertionError, lambda: self.node.fake_message(Decision(slot=1, proposal=PROPOSAL1)))
+        self.assertRaises(AssertionError, lambda: self.node.fake_message(Decision(slot=1, proposal=PROPOSAL2)))
+
+    def test_decision_commit_batch(self):
+        """On DECISION that allows multiple commits, a state machine with execute_batch executes them together"""
+        self.execute_fn.execute_batch = mock.Mock(return_value=("new state", ["out2", "out3"]))
+        self.node.fake_message(Decision(slot=3, proposal=PROPOSAL3))
+        self.node.fake_message(Decision(slot=2, proposal=PROPOSAL2))
+        self.execute_fn.execute_batch.assert_called_once_with("state", ["dos", "tres"])
+        self.assertFalse(self.execute_fn.called)
+        self.assertEqual(self.replica.state, "new state")
+        self.assertMessage(["test"], Invoked(client_id=222, output="out2"))
+        self.assertMessage(["test"], Invoked(client_id=333, output="out3"))
+
+    def test_apply_pipeline(self):
+        """With an apply queue, decided proposals are executed off the protocol thread and answered on completion"""
+        self.replica.stop()
+        execute_fn = mock.Mock(side_effect=lambda state, input_value: (state + "!", input_value.upper()))
+        replica = Replica(self.node, execute_fn, state="state", slot=2, decisions={1: PROPOSAL1},
+                          peers=["p1", "F999"], apply_queue_size=1)
+        self.node.fake_message(Decision(slot=3, proposal=PROPOSAL3))
+        self.node.fake_message(Decision(slot=2, proposal=PROPOSAL2))
+        self.assertEqual((replica.slot, replica.pipeline.inflight), (3, 1))
+        self.node.fake_message(Join(), sender="p1")
+        self.network.run_posted(block=True)
+        self.assertMessage(["test"], Invoked(client_id=222, output="DOS"))
+        self.assertMessage(["p1"], Welcome(state="state!", slot=3, decisions={1: PROPOSAL1, 2: PROPOSAL2,
+                                                                             3: PROPOSAL3},
+                                           configs=[(0, ["p1", "F999"])], directory=["p1", "F999"]))
+        self.network.run_posted(block=True)
+        self.assertMessage(["test"], Invoked(client_id=333, output="TRES"))
+        self.assertEqual((replica.state, replica.slot), ("state!!", 4))
+        replica.stop()
+
+    def test_stop_gauges(self):
+        """A stopped replica unregisters its gauges, so the metrics registry does not keep it alive"""
+        self.replica.stop()
+        self.network.metrics = Metrics()
+        replica = Replica(self.node, self.execute_fn, state="state", slot=2, decisions={1: PROPOSAL1},
+                          peers=["p1", "F999"])
+        self.assertEqual(sorted(self.network.metrics.snapshot()["gauges"]),
+                         ['replica_pending_invokes{node="F999"}', 'replica_slot_gap{node="F999"}'])
+        replica.stop()
+        self.assertEqual(self.network.metrics.snapshot()["gauges"], {})
+
+    def test_apply_pipeline_stopped(self):
+        """A proposal applied after the replica stopped is not answered and does not change its state"""
+        self.replica.stop()
+        execute_fn = mock.Mock(side_effect=lambda state, input_value: (state + "!", input_value.upper()))
+        replica = Replica(self.node, execute_fn, state="state", slot=2, decisions={1: PROPOSAL1},
+                          peers=["p1", "F999"], apply_queue_size=1)
+        self.node.fake_message(Decision(slot=2, proposal=PROPOSAL2))
+        replica.stop()
+        self.network.run_posted(block=True)
+        execute_fn.assert_called_once_with("state", "dos")
+        self.assertEqual(replica.state, "state")
+        self.assertNoMessages()
+
+    @mock.patch.object(Replica, "commit")
+    def test_decision_lost_slot(self, commit: mock.Mock):
+        """On DECISION for a slot our proposal lost, the proposal moves to a new slot, where repeat invokes find it"""
+        self.replica.propose(PROPOSAL2)
+        self.assertMessage(["F999"], Propose(slot=2, proposal=PROPOSAL2))
+        self.node.fake_message(Decision(slot=2, proposal=PROPOSAL3))
+        self.assertMessage(["F999"], Propose(slot=3, proposal=PROPOSAL2))
+        self.node.fake_message(
+            Invoke(caller=PROPOSAL2.caller, client_id=PROPOSAL2.client_id, input_value=PROPOSAL2.input))
+        self.assertMessage(["F999"], Propose(slot=3, proposal=PROPOSAL2))
+
+    def test_active_unknown_leader(self):
+        """An ACTIVE heartbeat makes its sender the leader when no leader is known"""
+        self.node.fake_message(Active(), sender="p1")
+        self.assertEqual(self.replica.latest_leader, "p1")
+        self.node.fake_message(Active(), sender="F999")
+        self.assertEqual(self.replica.latest_leader, "p1")
+
+    def test_active_suspected_leader(self):
+        """An ACTIVE heartbeat from the previous leader, after it timed out, makes it the leader again"""
+        self.node.fake_message(Active(), sender="p1")
+        self.network.tick(LEADER_TIMEOUT * 2)
+        self.assertEqual(self.replica.latest_leader, "F999")
+        self.assertTrue(self.replica.leader_suspected)
+        self.node.fake_message(Active(), sender="p1")
+        self.assertEqual(self.replica.latest_leader, "p1")
+        self.assertFalse(self.replica.leader_suspected)
+
+    def test_accept_heartbeat(self):
+        """ACCEPT and DECISIONRANGE messages from the leader keep it alive without replacing the timeout timer"""
+        self.node.fake_message(Active(), sender="p1")
+        timers = self.network.get_times()
+        for _ in range(4):
+            self.network.tick(LEADER_TIMEOUT * 0.75)
+            self.node.fake_message(Accept(slot=2, ballot_num=Ballot(0, 1), proposal=PROPOSAL2), sender="p1")
+            self.node.fake_message(DecisionRange(first_slot=2, last_slot=2, ballot_num=Ballot(0, 1)), sender="p1")
+        self.assertEqual(self.replica.latest_leader, "p1")
+        self.assertFalse(self.replica.leader_suspected)
+        self.assertEqual(len(self.network.get_times()), len(timers))
+
+    def test_prevote_leader_alive(self):
+        """A PREVOTE from another node is refused while the leader is heard from, naming the leader"""
+        self.node.fake_message(Active(), sender="p1")
+        self.node.fake_message(PreVote(ballot_num=Ballot(3, 9)), sender="F999")
+        self.assertMessage(["F999"], PreVoteReply(ballot_num=Ballot(3, 9), granted=False, leader="p1"))
+        self.node.fake_message(PreVote(ballot_num=Ballot(3, 1)), sender="p1")
+        self.assertMessage(["p1"], PreVoteReply(ballot_num=Ballot(3, 1), granted=True, leader="p1"))
+
+    def test_prevote_leader_suspected(self):
+        """A PREVOTE is granted once the leader has timed out, or when there is no leader"""
+        self.node.fake_message(PreVote(ballot_num=Ballot(3, 9)), sender="F999")
+        self.assertMessage(["F999"], PreVoteReply(ballot_num=Ballot(3, 9), granted=True, leader=None))
+        self.node.fake_message(Active(), sender="p1")
+        self.network.tick(LEADER_TIMEOUT * 2)
+        self.node.sent.clear()
+        self.node.fake_message(PreVote(ballot_num=Ballot(3, 1)), sender="p1")
+        self.assertMessage(["p1"], PreVoteReply(ballot_num=Ballot(3, 1), granted=True, leader="F999"))
+
+    @mock.patch.object(Replica, "commit")
+    def test_catchup(self, commit: mock.Mock):
+        """A replica missing decisions before its latest one asks a peer for them every CATCHUP_INTERVAL"""
+        self.network.tick(CATCHUP_INTERVAL)
+        self.assertNoMessages()
+        self.node.fake_message(Decision(slot=5, proposal=PROPOSAL3))
+        self.network.tick(CATCHUP_INTERVAL)
+        self.assertMessage(["p1"], DecisionRequest(slots=[2, 3, 4]))
+        self.node.fake_message(Decision(slot=3, proposal=PROPOSAL2))
+        self.network.tick(CATCHUP_INTERVAL)
+        self.assertMessage(["p1"], DecisionRequest(slots=[2, 4]))
+
+    def test_decision_request(self):
+        """A DecisionRequest is answered with the decisions the replica holds"""
+        self.node.fake_message(DecisionRequest(slots=[1, 2]), sender="p1")
+        self.assertMessage(["p1"], Decision(slot=1, proposal=PROPOSAL1))
+
+    def test_decision_request_span(self):
+        """A DecisionRequest is answered in slot order, with only the requested slots the replica holds"""
+        self.replica.decisions.update({3: PROPOSAL3, 4: PROPOSAL4})
+        self.node.fake_message(DecisionRequest(slots=[4, 0, 1, 5]), sender="p1")
+        self.assertMessage(["p1"], Decision(slot=1, proposal=PROPOSAL1))
+        self.assertMessage(["p1"], Decision(slot=4, proposal=PROPOSAL4))
+
+    def test_propose_committed(self):
+        """A PROPOSE for a slot the replica has committed is answered with its decision"""
+        self.node.fake_message(Propose(slot=1, proposal=PROPOSAL2), sender="p1")
+        self.assertMessage(["p1"], Decision(slot=1, proposal=PROPOSAL1))
+        self.node.fake_message(Propose(slot=2, proposal=PROPOSAL2), sender="p1")
+        self.assertNoMessages()
 
     def test_join(self):
         """A JOIN from a cluster member gets a warm WELCOME"""
         self.node.fake_message(Join(), sender="F999")
-        self.assertMessage(["F999"], Welcome(state="state", slot=2, decisions={1: PROPOSAL1}))
+        self.assertMessage(["F999"], Welcome(state="state", slot=2, decisions={1: PROPOSAL1},
+                                                 configs=[(0, ["p1", "F999"])], directory=["p1", "F999"]))
+
+    def test_reconfigure(self):
+        """A committed RECONFIGURE changes the peers from ALPHA slots later, answers its caller and admits new nodes"""
+        reconfigure = Proposal(caller='cli', client_id=126, input=Reconfigure(peers=["p1", "F999", "p2"]))
+        self.node.fake_message(Decision(slot=2, proposal=reconfigure))
+        self.assertFalse(self.execute_fn.called)
+        self.assertMessage(["cli"], Invoked(client_id=126, output=["p1", "F999", "p2"]))
+        self.assertEqual(self.replica.membership.peers_at(2 + ALPHA), ["p1", "F999", "p2"])
+        self.assertEqual(self.replica.membership.horizon, 3 + ALPHA)
+        self.node.fake_message(Join(), sender="p2")
+        self.assertMessage(["p2"], Welcome(state="state", slot=3, decisions={1: PROPOSAL1, 2: reconfigure},
+                                                 configs=[(0, ["p1", "F999"]), (2 + ALPHA, ["p1", "F999", "p2"])],
+                                                 directory=["p1", "F999", "p2"]))
+
+    def test_reconfigure_leader_fills(self):
+        """The replica of the leader fills the slots before new peers take over with no-ops"""
+        self.node.fake_message(Adopted(ballot_num=None, accepted_proposals={}))
+        reconfigure = Proposal(caller='cli', client_id=126, input=Reconfigure(peers=["p1", "F999", "p2"]))
+        self.node.fake_message(Decision(slot=2, proposal=reconfigure))
+        self.node.sent.pop(0)
+        for slot in range(3, 2 + ALPHA):
+            self.assertMessage(["F999"], Propose(slot=slot, proposal=NOOP_PROPOSAL))
+        self.assertNoMessages()
+
+    def test_join_within_alpha(self):
+        """A node welcomed before a reconfiguration takes over knows that the slots until then keep the old peers"""
+        grown = ["p1", "F999", "p2"]
+        reconfigure = Proposal(caller='cli', client_id=126, input=Reconfigure(peers=grown))
+        self.node.fake_message(Decision(slot=2, proposal=reconfigure))
+        self.assertMessage(["cli"], Invoked(client_id=126, output=grown))
+        self.node.fake_message(Join(), sender="p2")
+        _, welcome = self.node.sent.pop(0)
+        self.assertLess(welcome.slot, 2 + ALPHA)
+        self.replica.stop()
+        joined = Replica(self.node, self.execute_fn, state=welcome.state, slot=welcome.slot,
+                         decisions=welcome.decisions, peers=grown, configs=welcome.configs)
+        self.assertEqual(joined.membership.peers_at(welcome.slot), ["p1", "F999"])
+        self.assertEqual(joined.membership.peers_at(2 + ALPHA), grown)
+        self.assertEqual(joined.membership.configs, self.replica.membership.configs)
+
+    def test_membership_from_decisions(self):
+        """A replica welcomed with decisions rebuilds the membership from them"""
+        reconfigure = Proposal(caller='cli', client_id=126, input=Reconfigure(peers=["p1", "F999", "p2"]))
+        replica = Replica(self.node, self.execute_fn, state="state", slot=3, decisions={1: PROPOSAL1, 2: reconfigure},
+                          peers=["p1", "F999"])
+        self.assertEqual(replica.membership.latest(), ["p1", "F999", "p2"])
+
+    def test_sessions_from_decisions(self):
+        """A replica welcomed with decisions knows the requests they committed, but not their outputs"""
+        self.assertEqual(self.replica.sessions.lookup("test", 111), (True, UNKNOWN))
+        self.assertEqual(self.replica.sessions.lookup("test", 222), (False, UNKNOWN))
+
+    def test_learn(self):
+        """A LEARN from outside the cluster is welcomed"""
+        self.node.fake_message(Learn(), sender="999")
+        self.assertMessage(["999"], Welcome(state="state", slot=2, decisions={1: PROPOSAL1},
+                                                 configs=[(0, ["p1", "F999"])], directory=["p1", "F999"]))
+
+    def test_learner_subscribes(self):
+        """A learner subscribes with every peer, and again when no leader has been heard from"""
+        self.replica.stop()
+        self.replica = Replica(self.node, self.execute_fn, state="state", slot=2, decisions={1: PROPOSAL1},
+                               peers=["p1", "p2"], learner=True)
+        self.assertMessage(["p1", "p2"], Subscribe())
+        self.network.tick(LEADER_TIMEOUT / 2.0)
+        self.node.fake_message(Active(), sender="p1")
+        self.network.tick(LEADER_TIMEOUT / 2.0)
+        self.assertNoMessages()
+        self.network.tick(LEADER_TIMEOUT)
+        self.assertMessage(["p1", "p2"], Subscribe())
+
+    def test_learner_read(self):
+        """A learner answers a read from its own state, without sending any message"""
+        self.replica.stop()
+        self.replica = Replica(self.node, self.execute_fn, state="state", slot=2, decisions={1: PROPOSAL1},
+                               peers=["p1", "p2"], learner=True)
+        self.assertMessage(["p1", "p2"], Subscribe())
+        self.assertEqual(self.replica.read(str.upper), "STATE")
+        self.assertNoMessages()
 
     def test_join_unknown(self):
         """A JOIN from elsewhere gets nothing"""
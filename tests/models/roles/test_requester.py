@@ -2,9 +2,9 @@ import unittest
 import unittest.mock as mock
 from unittest.mock import patch
 import pytest
-from konsensus.models.roles.requester import Requester
-from konsensus.entities.messages_types import Invoke, Invoked
-from konsensus.constants import INVOKE_RETRANSMIT
+from konsensus.models.roles.requester import ExpiredError, OverloadedError, Requester
+from konsensus.entities.messages_types import Expired, Invoke, Invoked, Overloaded
+from konsensus.constants import INVOKE_RETRANSMIT, RETRANSMIT_JITTER
 from tests.base_test_case import BaseTestCase
 
 CLIENT_ID = 999999
@@ -42,5 +42,60 @@ class RequesterTestCase(BaseTestCase):
         self.assertUnregistered()
 
 
+class RequesterExpiredTestCase(BaseTestCase):
+    def test_expired(self):
+        """An EXPIRED response stops the retransmissions and calls back with an ExpiredError"""
+        callback = mock.Mock(name="callback")
+        requester = Requester(self.node, 10, callback)
+        requester.start()
+        self.assertMessage(["F999"], Invoke(caller="F999", client_id=requester.client_id, input_value=10))
+        self.node.fake_message(Expired(client_id=requester.client_id + 1))
+        self.assertFalse(callback.called)
+        self.node.fake_message(Expired(client_id=requester.client_id))
+        (error,) = callback.call_args.args
+        self.assertIsInstance(error, ExpiredError)
+        self.assertUnregistered()
+        self.network.tick(INVOKE_RETRANSMIT * 10)
+        self.assertNoMessages()
+
+
+class RequesterOverloadTestCase(BaseTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.callback = mock.Mock(name="callback")
+
+    def start(self, **kwargs):
+        requester = Requester(self.node, 10, self.callback, **kwargs)
+        requester.start()
+        self.assertMessage(["F999"], Invoke(caller="F999", client_id=requester.client_id, input_value=10))
+        return requester
+
+    def test_overloaded_backs_off(self):
+        """An OVERLOADED response holds off retransmissions until retry_after has passed, then retries with a new id"""
+        requester = self.start()
+        rejected_id = requester.client_id
+        self.node.fake_message(Overloaded(client_id=rejected_id, retry_after=5.0))
+        self.assertGreater(requester.client_id, rejected_id)
+        self.network.tick(5.0)
+        self.assertNoMessages()
+        self.network.tick(5.0 * RETRANSMIT_JITTER)
+        self.assertMessage(["F999"], Invoke(caller="F999", client_id=requester.client_id, input_value=10))
+        self.node.fake_message(Invoked(client_id=requester.client_id, output=20))
+        self.callback.assert_called_once_with(20)
+        self.assertUnregistered()
+
+    def test_overloaded_fail_fast(self):
+        """A fail_fast requester calls back with an OverloadedError on OVERLOADED"""
+        requester = self.start(fail_fast=True)
+        self.node.fake_message(Overloaded(client_id=requester.client_id, retry_after=5.0))
+        (error,) = self.callback.call_args.args
+        self.assertIsInstance(error, OverloadedError)
+        self.assertEqual(error.retry_after, 5.0)
+        self.assertUnregistered()
+        self.network.tick(INVOKE_RETRANSMIT * 10)
+        self.assertNoMessages()
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -58,6 +58,20 @@ class ScoutTestCase(BaseTestCase):
         self.node.fake_message(Promise(ballot_num=Ballot(99, 99), accepted_proposals=accepted_proposals), sender="p2")
         self.assertMessage(["F999"], Preempted(slot=None, preempted_by=Ballot(99, 99)))
 
+    def test_promise_joint(self):
+        """With several configurations, the scout is adopted only once enough peers of each of them have promised"""
+        peers = ["p1", "p2", "p3", "p4", "p5"]
+        self.scout.stop()
+        self.scout = Scout(self.node, Ballot(10, 10), peers=peers, configs=[peers[:3], peers[2:]])
+        self.scout.send_prepare()
+        self.assertMessage(peers, Prepare(ballot_num=Ballot(10, 10)))
+        for acceptor in peers[:4]:
+            self.node.fake_message(Promise(ballot_num=Ballot(10, 10), accepted_proposals={}), sender=acceptor)
+        self.assertNoMessages()
+        self.node.fake_message(Promise(ballot_num=Ballot(10, 10), accepted_proposals={}), sender="p5")
+        self.assertMessage(["F999"], Adopted(ballot_num=Ballot(10, 10), accepted_proposals={}))
+        self.assertUnregistered()
+
     def test_update_accepted_empty(self):
         """update_accepted does nothing with an empty set of accepted proposals"""
         self.scout.update_accepted({})
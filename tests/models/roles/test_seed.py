@@ -21,11 +21,13 @@ class SeedTestCase(BaseTestCase):
         self.node.fake_message(Join(), sender="p1")
         self.assertNoMessages()
         self.node.fake_message(Join(), sender="p3")
-        self.assertMessage(["p1", "p3"], Welcome(state="state", slot=1, decisions={}))
+        self.assertMessage(["p1", "p3"], Welcome(state="state", slot=1, decisions={}, configs=[(0, ["p1", "p2", "p3"])],
+                                                 directory=["p1", "p2", "p3"]))
 
         self.network.tick(JOIN_RETRANSMIT)
         self.node.fake_message(Join(), sender="p2")
-        self.assertMessage(["p1", "p2", "p3"], Welcome(state="state", slot=1, decisions={}))
+        self.assertMessage(["p1", "p2", "p3"], Welcome(state="state", slot=1, decisions={},
+                                                       configs=[(0, ["p1", "p2", "p3"])], directory=["p1", "p2", "p3"]))
 
         self.network.tick(JOIN_RETRANSMIT * 2)
         self.assertNoMessages()
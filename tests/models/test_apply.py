@@ -0,0 +1,68 @@
+import threading
+import unittest
+import unittest.mock as mock
+from konsensus.entities.data_types import Proposal
+from konsensus.models.apply import ApplyPipeline
+from tests.utils.fake_network import FakeNetwork, FakeNode
+
+PROPOSAL1 = Proposal(caller='test', client_id=111, input=1)
+PROPOSAL2 = Proposal(caller='test', client_id=222, input=2)
+
+
+class ApplyPipelineTestCases(unittest.TestCase):
+    def setUp(self):
+        self.network = FakeNetwork()
+        self.node = FakeNode(self.network)
+        self.on_applied = mock.Mock()
+
+    def wait_applied(self, count):
+        while self.on_applied.call_count < count:
+            self.network.run_posted(block=True)
+
+    def test_in_order(self):
+        """Proposals are executed in submission order and their results are handed back on the protocol thread"""
+        pipeline = ApplyPipeline(self.node, lambda state, n: (state + n, state + n), 0, self.on_applied, 2)
+        pipeline.submit(1, PROPOSAL1)
+        pipeline.submit(2, PROPOSAL2)
+        self.assertTrue(pipeline.full())
+        self.wait_applied(2)
+        self.assertEqual(self.on_applied.call_args_list, [mock.call(1, PROPOSAL1, 1, 1), mock.call(2, PROPOSAL2, 3, 3)])
+        self.assertTrue(pipeline.idle())
+        pipeline.stop()
+
+    def test_batch(self):
+        """Proposals queued together are executed as one batch by state machines with execute_batch"""
+        started, release = threading.Event(), threading.Event()
+
+        def execute_fn(state, n):
+            started.set()
+            release.wait()
+            return state, n
+
+        execute_fn.execute_batch = mock.Mock(return_value=("batched", ["a", "b"]))
+        pipeline = ApplyPipeline(self.node, execute_fn, 0, self.on_applied, 3)
+        pipeline.submit(1, PROPOSAL1)
+        started.wait()
+        pipeline.submit(2, PROPOSAL1)
+        pipeline.submit(3, PROPOSAL2)
+        release.set()
+        self.wait_applied(3)
+        execute_fn.execute_batch.assert_called_once_with(0, [1, 2])
+        self.assertEqual(self.on_applied.call_args_list[1:],
+                         [mock.call(2, PROPOSAL1, "batched", "a"), mock.call(3, PROPOSAL2, "batched", "b")])
+        pipeline.stop()
+
+    def test_error(self):
+        """An exception raised by the state machine is re-raised on the protocol thread"""
+
+        def execute_fn(state, n):
+            raise ValueError(n)
+
+        pipeline = ApplyPipeline(self.node, execute_fn, 0, self.on_applied, 1)
+        pipeline.submit(1, PROPOSAL1)
+        self.assertRaises(ValueError, lambda: self.network.run_posted(block=True))
+        self.assertFalse(self.on_applied.called)
+
+
+if __name__ == '__main__':
+    unittest.main()
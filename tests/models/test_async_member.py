@@ -0,0 +1,60 @@
+import asyncio
+import unittest
+from konsensus.async_network import AsyncNetwork
+from konsensus.models.async_member import AsyncMember
+
+
+def add(state, input_):
+    state += input_
+    return state, state
+
+
+class AsyncMemberTestCases(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.network = AsyncNetwork(1234)
+        self.network.DROP_PROB = 0.0
+        self.network.PROP_DELAY = 0.001
+        self.network.PROP_JITTER = 0.0
+        peers = ["N0", "N1", "N2"]
+        self.members = []
+        for peer in peers:
+            self.network.new_node = lambda peer=peer, new_node=self.network.new_node: new_node(peer)
+            self.members.append(AsyncMember(add, self.network, peers, seed=0 if peer == "N0" else None))
+        for member in self.members:
+            member.start()
+
+    async def asyncTearDown(self):
+        self.network.stop()
+
+    async def test_concurrent_invokes(self):
+        """Thousands of coroutines can await invokes at once on one thread"""
+        outputs = await asyncio.wait_for(
+            asyncio.gather(*(self.members[1].invoke(1) for _ in range(1000))), timeout=60
+        )
+        self.assertEqual(sorted(outputs), list(range(1, 1001)))
+
+    async def test_cancel(self):
+        """An invoke given up on is cancelled with its request, and later outputs for it are ignored"""
+        errors = []
+        self.network.loop.set_exception_handler(lambda loop, context: errors.append(context))
+        self.assertEqual(await asyncio.wait_for(self.members[1].invoke(1), timeout=10), 1)
+        with self.assertRaises(asyncio.TimeoutError):
+            await asyncio.wait_for(self.members[1].invoke(10), timeout=0.001)
+        self.assertEqual(self.members[1].client.requests, {})
+        # the cancelled request had reached the replica, so it may still have been executed
+        await asyncio.sleep(0.5)
+        self.assertIn(await asyncio.wait_for(self.members[1].invoke(100), timeout=10), (101, 111))
+        self.assertEqual(errors, [])
+
+    async def test_read(self):
+        """AsyncMember.read reads the local replica's state on the loop, once the write has been applied there"""
+        self.assertEqual(await asyncio.wait_for(self.members[1].invoke(5), timeout=10), 5)
+        self.assertEqual(self.members[1].read(lambda state: state * 2), 10)
+
+    async def test_reconfigure(self):
+        """AsyncMember.reconfigure commits a change of peers"""
+        self.assertEqual(await asyncio.wait_for(self.members[2].reconfigure(["N0", "N1"]), timeout=10), ["N0", "N1"])
+
+
+if __name__ == '__main__':
+    unittest.main()
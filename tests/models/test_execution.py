@@ -0,0 +1,71 @@
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from konsensus.models.execution import ParallelExecution
+
+
+def key_value(state, input_value):
+    if input_value[0] == "get":
+        return state, state.get(input_value[1])
+    if input_value[0] == "set":
+        state[input_value[1]] = input_value[2]
+        return state, input_value[2]
+    state.clear()
+    return state, None
+
+
+def keys(input_value):
+    if input_value[0] == "clear":
+        return None
+    return [input_value[1]]
+
+
+class ParallelExecutionTestCases(unittest.TestCase):
+    def setUp(self):
+        self.execution = ParallelExecution(key_value, keys, max_workers=4)
+
+    def tearDown(self):
+        self.execution.shutdown()
+
+    def test_call(self):
+        """The wrapper executes single commands like the wrapped state machine"""
+        self.assertEqual(self.execution({}, ("set", "a", 1)), ({"a": 1}, 1))
+
+    def test_waves_disjoint(self):
+        """Commands on disjoint keys share a wave"""
+        self.assertEqual(self.execution.waves([("set", "a", 1), ("set", "b", 2), ("get", "c")]), [[0, 1, 2]])
+
+    def test_waves_conflict(self):
+        """A command runs in the wave after the last command touching one of its keys"""
+        inputs = [("set", "a", 1), ("set", "b", 2), ("get", "a"), ("set", "c", 3), ("get", "a")]
+        self.assertEqual(self.execution.waves(inputs), [[0, 1, 3], [2], [4]])
+
+    def test_waves_barrier(self):
+        """A command without keys runs alone, after everything before it and before everything after it"""
+        inputs = [("set", "a", 1), ("clear",), ("set", "b", 2), ("get", "a")]
+        self.assertEqual(self.execution.waves(inputs), [[0], [1], [2, 3]])
+
+    def test_execute_batch(self):
+        """A batch gives the same state and outputs, in order, as executing the commands one by one"""
+        inputs = [("set", k, i) for i, k in enumerate("abcdefgh")] + [("get", k) for k in "hgfedcba"]
+        inputs += [("clear",), ("get", "a"), ("set", "a", 10), ("get", "a")]
+        expected_state, expected_outputs = {}, []
+        for input_value in inputs:
+            expected_state, output = key_value(expected_state, input_value)
+            expected_outputs.append(output)
+        self.assertEqual(self.execution.execute_batch({}, inputs), (expected_state, expected_outputs))
+
+    def test_execute_batch_in_place(self):
+        """Commands executed in parallel must not replace the state"""
+        execution = ParallelExecution(lambda state, input_value: (dict(state), None), lambda input_value: [input_value])
+        self.assertRaises(AssertionError, lambda: execution.execute_batch({}, ["a", "b"]))
+        execution.shutdown()
+
+    def test_process_pool_rejected(self):
+        """A process pool cannot share the state with the commands it runs, so it is rejected"""
+        executor = ProcessPoolExecutor(max_workers=1)
+        self.assertRaises(TypeError, lambda: ParallelExecution(key_value, keys, executor=executor))
+        executor.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import unittest
+from konsensus.entities.data_types import Proposal
+from konsensus.models.interning import Interner
+
+
+class InternerTestCases(unittest.TestCase):
+    def setUp(self):
+        self.interner = Interner(size=2)
+
+    def test_intern(self):
+        """Equal proposals intern to the copy seen first"""
+        proposal = Proposal("cli", 1, ["INC"])
+        self.assertIs(self.interner.intern(proposal), proposal)
+        self.assertIs(self.interner.intern(Proposal("cli", 1, ["INC"])), proposal)
+        self.assertIs(self.interner.intern(proposal), proposal)
+        self.assertEqual(len(self.interner), 1)
+
+    def test_different_contents(self):
+        """A proposal with the same caller and client id but other contents is not replaced"""
+        proposal = Proposal("cli", 1, "INC")
+        other = Proposal("cli", 1, "DEC")
+        self.interner.intern(proposal)
+        self.assertIs(self.interner.intern(other), other)
+        self.assertIs(self.interner.intern(Proposal("cli", 1, "INC")), proposal)
+
+    def test_window(self):
+        """Only the most recently interned proposals are remembered"""
+        proposals = [Proposal("cli", client_id, "INC") for client_id in range(3)]
+        self.interner.intern(proposals[0])
+        self.interner.intern(proposals[1])
+        self.interner.intern(Proposal("cli", 0, "INC"))
+        self.interner.intern(proposals[2])
+        self.assertEqual(len(self.interner), 2)
+        self.assertIs(self.interner.intern(Proposal("cli", 0, "INC")), proposals[0])
+        copy = Proposal("cli", 1, "INC")
+        self.assertIs(self.interner.intern(copy), copy)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,13 @@
+import threading
 import unittest
 import unittest.mock as mock
 from konsensus.models.node import Node
 from konsensus.models.roles.bootstrap import Bootstrap
 from konsensus.models.roles.seed import Seed
+from konsensus.models.roles.replica import Replica
+from konsensus.models.roles.requester import ExpiredError, OverloadedError
 from konsensus.models.member import Member
+from konsensus.entities.data_types import Reconfigure
 from tests.utils.fake_request import FakeRequest
 from tests.utils.fake_network import FakeNetwork
 
@@ -25,6 +29,13 @@ class MemberTestCases(unittest.TestCase):
             self.network.node, execute_fn=self.state_machine, peers=["p1", "p2"]
         )
 
+    def test_learner(self):
+        """A learner Member builds a learner Bootstrap"""
+        _ = Member(self.state_machine, network=self.network, peers=['p1', 'p2'], learner=True, **self.cls_args)
+        self.MockBootstrap.assert_called_with(
+            self.network.node, execute_fn=self.state_machine, peers=["p1", "p2"], learner=True
+        )
+
     def test_member(self):
         """With a seed, the Member constructor builds a node and a ClusterSeed"""
         _ = Member(self.state_machine, network=self.network, peers=['p1', 'p2'], seed=44, **self.cls_args)
@@ -48,6 +59,67 @@ class MemberTestCases(unittest.TestCase):
         self.assertEqual(member.requester, None)
         self.assertEqual(result, ("ROTATED", member.node, "ROTATE"))
 
+    def test_invoke_expired(self):
+        """Member.invoke raises the ExpiredError of a request whose output expired"""
+        member = Member(self.state_machine, network=self.network, peers=['p1', 'p2'], **self.cls_args)
+        error = ExpiredError("expired")
+        request_cls = lambda node, input_value, callback: mock.Mock(start=lambda: callback(error))
+        with self.assertRaises(ExpiredError):
+            member.invoke("ROTATE", request_cls=request_cls)
+
+    def test_invoke_fail_fast(self):
+        """Member.invoke with fail_fast raises the OverloadedError its request calls back with"""
+        member = Member(self.state_machine, network=self.network, peers=['p1', 'p2'], **self.cls_args)
+
+        def overloaded_request(node, input_value, callback, fail_fast=False):
+            request = mock.Mock(name="request")
+            request.start.side_effect = lambda: callback(OverloadedError(1.0) if fail_fast else "OUT")
+            return request
+
+        self.assertEqual(member.invoke("ROTATE", request_cls=overloaded_request), "OUT")
+        with self.assertRaises(OverloadedError):
+            member.invoke("ROTATE", request_cls=overloaded_request, fail_fast=True)
+        self.assertEqual(member.requester, None)
+
+    def test_reconfigure(self):
+        """Member.reconfigure invokes a Reconfigure of the cluster to the new peers"""
+        member = Member(self.state_machine, network=self.network, peers=['p1', 'p2'], **self.cls_args)
+        result = member.reconfigure(('p1', 'p2', 'p3'), request_cls=FakeRequest)
+        self.assertEqual(result, ("ROTATED", member.node, Reconfigure(["p1", "p2", "p3"])))
+
+    def test_learner_read(self):
+        """A learner Member answers a read from its replica on the protocol thread, without any message to the leader"""
+        member = Member(self.state_machine, network=self.network, peers=['p1', 'p2'], learner=True, **self.cls_args)
+        self.assertRaises(RuntimeError, member.replica)
+        replica = Replica(member.node, self.state_machine, state={"x": 1}, slot=3, decisions={}, peers=['p1', 'p2'],
+                          learner=True)
+        member.node.sent.clear()
+        results = []
+        reader = threading.Thread(target=lambda: results.append(member.read(lambda state: state["x"])))
+        reader.start()
+        self.network.run_posted(block=True)
+        reader.join()
+        self.assertEqual(results, [1])
+        self.assertEqual(member.node.sent, [])
+        replica.stop()
+
+    def test_read_error(self):
+        """Errors raised while evaluating a read are raised in the caller"""
+        member = Member(self.state_machine, network=self.network, peers=['p1', 'p2'], learner=True, **self.cls_args)
+        errors = []
+
+        def read():
+            try:
+                member.read(len)
+            except RuntimeError as error:
+                errors.append(error)
+
+        reader = threading.Thread(target=read)
+        reader.start()
+        self.network.run_posted(block=True)
+        reader.join()
+        self.assertEqual(len(errors), 1)
+
 
 if __name__ == '__main__':
     unittest.main()
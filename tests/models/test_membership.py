@@ -0,0 +1,60 @@
+import unittest
+from konsensus.constants import ALPHA
+from konsensus.models.membership import Membership
+
+
+class MembershipTestCases(unittest.TestCase):
+    def setUp(self):
+        self.membership = Membership(["p1", "p2", "p3"], slot=5)
+
+    def test_static(self):
+        """Without reconfigurations, every slot is decided by the initial peers"""
+        self.assertEqual(self.membership.peers_at(100), ["p1", "p2", "p3"])
+        self.assertEqual(self.membership.window(), [["p1", "p2", "p3"]])
+        self.assertEqual(self.membership.everyone(), ["p1", "p2", "p3"])
+
+    def test_reconfigure(self):
+        """A reconfiguration decided at a slot applies from ALPHA slots later"""
+        self.membership.reconfigure(4, ["p1", "p2", "p4"])
+        self.assertEqual(self.membership.peers_at(4 + ALPHA - 1), ["p1", "p2", "p3"])
+        self.assertEqual(self.membership.peers_at(4 + ALPHA), ["p1", "p2", "p4"])
+        self.assertEqual(self.membership.latest(), ["p1", "p2", "p4"])
+        self.assertEqual(self.membership.window(), [["p1", "p2", "p3"], ["p1", "p2", "p4"]])
+        self.assertEqual(self.membership.everyone(), ["p1", "p2", "p3", "p4"])
+        self.assertEqual(self.membership.window(4 + ALPHA), [["p1", "p2", "p4"]])
+
+    def test_configs_given(self):
+        """A membership given configurations takes them rather than its peers, and keeps its own copy"""
+        configs = [(0, ["p1", "p2", "p3"]), (1 + ALPHA, ["p3", "p4"])]
+        membership = Membership(["p3", "p4"], slot=5, configs=configs)
+        self.assertEqual(membership.peers_at(5), ["p1", "p2", "p3"])
+        self.assertEqual(membership.peers_at(1 + ALPHA), ["p3", "p4"])
+        self.assertEqual(membership.directory, ["p1", "p2", "p3", "p4"])
+        membership.reconfigure(6, ["p4"])
+        self.assertEqual(len(configs), 2)
+
+    def test_directory(self):
+        """Addresses are indexed in the order they first were peers, and never removed"""
+        self.membership.reconfigure(4, ["p4", "p2"])
+        self.membership.reconfigure(6, ["p4", "p5"])
+        self.assertEqual(self.membership.directory, ["p1", "p2", "p3", "p4", "p5"])
+        self.assertEqual(self.membership.index("p4"), 3)
+        self.assertEqual(self.membership.address(4), "p5")
+        self.assertIsNone(self.membership.address(5))
+
+    def test_directory_given(self):
+        """A membership given a directory indexes addresses by it rather than by its peers"""
+        membership = Membership(["p3"], slot=5, directory=["p1", "p2", "p3"])
+        self.assertEqual(membership.index("p3"), 2)
+        self.assertEqual(membership.index("x"), 3)
+        self.assertEqual(membership.directory, ["p1", "p2", "p3", "x"])
+
+    def test_horizon(self):
+        """Slots are known up to ALPHA slots past the next slot to commit, or all of them without a slot"""
+        self.assertTrue(self.membership.known(5 + ALPHA - 1))
+        self.assertFalse(self.membership.known(5 + ALPHA))
+        self.assertTrue(Membership(["p1"]).known(10 ** 6))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+from konsensus.models.retransmitter import Retransmitter
+from konsensus.models.roles import Role
+from konsensus.entities.messages_types import Join
+from tests.base_test_case import BaseTestCase
+
+
+class RetransmitterTestCases(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.role = Role(self.node)
+        self.retransmitter = Retransmitter(self.role, Join(), ["p1", "p2", "p3"], 1.0)
+
+    def test_backoff_to_outstanding(self):
+        """Retransmissions only go to destinations that have not acknowledged, with a doubling timeout"""
+        self.retransmitter.start()
+        self.assertMessage(["p1", "p2", "p3"], Join())
+        self.network.tick(1.0)
+        self.assertMessage(["p1", "p2", "p3"], Join())
+        self.retransmitter.ack("p2")
+        self.network.tick(1.0)
+        self.assertNoMessages()
+        self.network.tick(1.0)
+        self.assertMessage(["p1", "p3"], Join())
+
+    def test_jitter_shortens(self):
+        """Jitter only ever shortens the timeout"""
+        self.retransmitter.start()
+        self.assertMessage(["p1", "p2", "p3"], Join())
+        (timer,) = [t for t in self.network.timers if not t.cancelled]
+        self.assertTrue(0.9 <= timer.expires - self.network.now <= 1.0)
+        self.retransmitter.cancel()
+
+    def test_pause(self):
+        """A paused retransmitter sends again to the outstanding destinations once the pause is over"""
+        self.retransmitter.start()
+        self.assertMessage(["p1", "p2", "p3"], Join())
+        self.retransmitter.ack("p1")
+        self.retransmitter.pause(5.0)
+        self.network.tick(4.9)
+        self.assertNoMessages()
+        self.network.tick(0.1)
+        self.assertMessage(["p2", "p3"], Join())
+        self.retransmitter.cancel()
+
+    def test_all_acknowledged(self):
+        """The timer is cancelled once every destination acknowledged"""
+        self.retransmitter.start()
+        self.assertMessage(["p1", "p2", "p3"], Join())
+        for dest in "p1", "p2", "p3":
+            self.retransmitter.ack(dest)
+        self.assertTrue(all(t.cancelled for t in self.network.timers))
+
+    def test_karn(self):
+        """Only acknowledgements of a message sent once are sampled"""
+        self.retransmitter.start()
+        self.assertMessage(["p1", "p2", "p3"], Join())
+        self.network.tick(0.2)
+        self.retransmitter.ack("p1")
+        self.network.tick(1.0)
+        self.assertMessage(["p2", "p3"], Join())
+        self.retransmitter.ack("p2")
+        self.assertAlmostEqual(self.node.rtt.peers["p1"].srtt, 0.2)
+        self.assertNotIn("p2", self.node.rtt.peers)
+        self.retransmitter.cancel()
+
+    def test_select(self):
+        """A select function picks the destinations of each attempt"""
+        peers = iter(["p1", "p2"])
+        retransmitter = Retransmitter(self.role, Join(), ["p1", "p2"], 1.0, select=lambda: [next(peers)])
+        retransmitter.start()
+        self.assertMessage(["p1"], Join())
+        self.network.tick(1.0)
+        self.assertMessage(["p2"], Join())
+        retransmitter.cancel()
+        self.assertTrue(all(t.cancelled for t in self.network.timers))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,24 @@
+import unittest
+from konsensus.models.router import KeyRangeRouter
+
+
+class KeyRangeRouterTestCases(unittest.TestCase):
+    def setUp(self):
+        self.router = KeyRangeRouter(["g", "p"], key_fn=lambda input_value: input_value[1])
+
+    def test_groups(self):
+        """n split keys make n + 1 groups"""
+        self.assertEqual(self.router.groups, 3)
+
+    def test_route(self):
+        """Each group owns the keys from its split key up to the next one"""
+        routes = [self.router.route(("get", key)) for key in ["a", "f", "g", "o", "p", "z"]]
+        self.assertEqual(routes, [0, 0, 1, 1, 2, 2])
+
+    def test_unsorted(self):
+        """Split keys must be sorted"""
+        self.assertRaises(AssertionError, lambda: KeyRangeRouter(["p", "g"], key_fn=str))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+from konsensus.models.rtt import RttEstimator
+
+
+class RttEstimatorTestCases(unittest.TestCase):
+    def setUp(self):
+        self.rtt = RttEstimator(min_rto=0.01, max_rto=5.0)
+
+    def test_default_until_measured(self):
+        """Peers that have not been measured use the caller's default timeout"""
+        self.assertEqual(self.rtt.rto("p1", 0.7), 0.7)
+
+    def test_first_sample(self):
+        """The first sample sets srtt to the sample and rttvar to half of it"""
+        self.rtt.sample("p1", 0.1)
+        self.assertAlmostEqual(self.rtt.rto("p1", 0.7), 0.1 + 4 * 0.05)
+
+    def test_smoothing(self):
+        """Later samples are smoothed with the RFC 6298 gains"""
+        self.rtt.sample("p1", 0.1)
+        self.rtt.sample("p1", 0.2)
+        state = self.rtt.peers["p1"]
+        self.assertAlmostEqual(state.rttvar, 0.75 * 0.05 + 0.25 * 0.1)
+        self.assertAlmostEqual(state.srtt, 0.875 * 0.1 + 0.125 * 0.2)
+
+    def test_bounds(self):
+        """The timeout is bounded by min_rto and max_rto"""
+        self.rtt.sample("fast", 0.0001)
+        self.rtt.sample("slow", 30.0)
+        self.assertEqual(self.rtt.rto("fast", 1.0), 0.01)
+        self.assertEqual(self.rtt.rto("slow", 1.0), 5.0)
+
+    def test_backoff(self):
+        """Each unanswered attempt doubles the timeout, up to max_rto"""
+        self.assertEqual(self.rtt.rto("p1", 0.5, attempt=1), 1.0)
+        self.assertEqual(self.rtt.rto("p1", 0.5, attempt=2), 2.0)
+        self.assertEqual(self.rtt.rto("p1", 0.5, attempt=10), 5.0)
+        self.rtt.sample("p1", 0.1)
+        self.assertAlmostEqual(self.rtt.rto("p1", 0.5, attempt=1), 0.6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+from unittest import mock
+from konsensus.models.sessions import EXPIRED, UNKNOWN, SessionTable
+
+
+class SessionTableTestCases(unittest.TestCase):
+    def setUp(self):
+        self.sessions = SessionTable()
+
+    def test_commit(self):
+        """A request is committed once; its output is cached once known"""
+        self.assertEqual(self.sessions.lookup("cli", 1), (False, None))
+        self.assertTrue(self.sessions.commit("cli", 1, slot=1))
+        self.assertEqual(self.sessions.lookup("cli", 1), (True, UNKNOWN))
+        self.sessions.output("cli", 1, "out")
+        self.assertEqual(self.sessions.lookup("cli", 1), (True, "out"))
+        self.assertFalse(self.sessions.commit("cli", 1, slot=2))
+        self.assertEqual(self.sessions.lookup("cli", 2), (False, UNKNOWN))
+
+    def test_out_of_order(self):
+        """Requests of a caller may be committed out of order"""
+        self.assertTrue(self.sessions.commit("cli", 2, slot=1))
+        self.assertTrue(self.sessions.commit("cli", 1, slot=2))
+        self.assertFalse(self.sessions.commit("cli", 2, slot=3))
+
+    @mock.patch("konsensus.models.sessions.SESSION_OUTPUTS", 2)
+    def test_bounded_outputs(self):
+        """Only the latest outputs are kept; older requests are still known to be committed"""
+        for client_id in 1, 2, 3:
+            self.sessions.commit("cli", client_id, slot=client_id)
+            self.sessions.output("cli", client_id, client_id * 10)
+        self.assertEqual(self.sessions.lookup("cli", 1), (True, EXPIRED))
+        self.assertEqual(self.sessions.lookup("cli", 3), (True, 30))
+        self.assertFalse(self.sessions.commit("cli", 1, slot=4))
+
+    @mock.patch("konsensus.models.sessions.SESSION_EXPIRY", 10)
+    def test_expiry(self):
+        """Sessions of callers that have not committed anything for SESSION_EXPIRY slots are dropped"""
+        self.sessions.commit("old", 1, slot=1)
+        self.sessions.commit("cli", 1, slot=5)
+        self.sessions.commit("cli", 2, slot=12)
+        self.assertEqual(len(self.sessions), 1)
+        self.assertEqual(self.sessions.lookup("old", 1), (False, None))
+        self.assertEqual(self.sessions.lookup("cli", 1), (True, UNKNOWN))
+
+
+if __name__ == '__main__':
+    unittest.main()
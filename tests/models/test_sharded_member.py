@@ -0,0 +1,69 @@
+import unittest
+import unittest.mock as mock
+from konsensus.models.roles.bootstrap import Bootstrap
+from konsensus.models.roles.requester import ExpiredError
+from konsensus.models.roles.seed import Seed
+from konsensus.models.router import KeyRangeRouter
+from konsensus.models.sharded_member import ShardedMember
+from konsensus.network import Network
+from tests.utils.fake_request import FakeRequest
+
+
+class ShardedMemberTestCases(unittest.TestCase):
+    def setUp(self):
+        self.MockBootstrap = mock.create_autospec(Bootstrap)
+        self.MockSeed = mock.create_autospec(Seed)
+        self.network = Network(1234)
+        self.state_machine = mock.Mock(name="state_machine")
+        self.router = KeyRangeRouter([10, 20], key_fn=lambda input_value: input_value)
+        self.cls_args = dict(bootstrap=self.MockBootstrap, seed_cls=self.MockSeed)
+
+    def test_group_nodes(self):
+        """A node is created for each group, addressed after the member and the group"""
+        member = ShardedMember(self.state_machine, self.network, "p2", ["p1", "p2"], self.router, **self.cls_args)
+        self.assertEqual([node.address for node in member.nodes.values()], ["p2/g0", "p2/g1", "p2/g2"])
+        self.assertEqual(sorted(self.network.nodes), ["p2/g0", "p2/g1", "p2/g2"])
+
+    def test_no_seed(self):
+        """With no seed, each group gets a Bootstrap with the group's peers, eagerly leading every other group"""
+        member = ShardedMember(self.state_machine, self.network, "p2", ["p1", "p2"], self.router, **self.cls_args)
+        self.assertFalse(self.MockSeed.called)
+        self.assertEqual(self.MockBootstrap.call_count, 3)
+        for group in (0, 2):
+            self.MockBootstrap.assert_any_call(
+                member.nodes[group], execute_fn=self.state_machine, peers=[f"p1/g{group}", f"p2/g{group}"]
+            )
+        eager = self.MockBootstrap.call_args_list[1]
+        self.assertEqual(eager.args, (member.nodes[1],))
+        self.assertEqual(eager.kwargs["peers"], ["p1/g1", "p2/g1"])
+        self.assertTrue(eager.kwargs["leader"].keywords["eager"])
+
+    def test_seed(self):
+        """With a seed, each group gets a Seed with its own copy of the initial state"""
+        seed = {"key": "value"}
+        member = ShardedMember(self.state_machine, self.network, "p1", ["p1", "p2"], self.router, seed=seed,
+                               **self.cls_args)
+        self.assertFalse(self.MockBootstrap.called)
+        self.assertEqual(self.MockSeed.call_count, 3)
+        states = [call.kwargs["initial_state"] for call in self.MockSeed.call_args_list]
+        self.assertEqual(states, [seed] * 3)
+        self.assertTrue(all(state is not seed for state in states))
+        self.assertEqual(self.MockSeed.call_args_list[1].args, (member.nodes[1],))
+
+    def test_invoke(self):
+        """ShardedMember.invoke makes the request on the node of the group that owns its key"""
+        member = ShardedMember(self.state_machine, self.network, "p1", ["p1", "p2"], self.router, **self.cls_args)
+        result = member.invoke(15, request_cls=FakeRequest)
+        self.assertEqual(result, ("ROTATED", member.nodes[1], 15))
+
+    def test_invoke_expired(self):
+        """ShardedMember.invoke raises the ExpiredError of a request whose output expired"""
+        member = ShardedMember(self.state_machine, self.network, "p1", ["p1", "p2"], self.router, **self.cls_args)
+        error = ExpiredError("expired")
+        request_cls = lambda node, input_value, callback: mock.Mock(start=lambda: callback(error))
+        with self.assertRaises(ExpiredError):
+            member.invoke(15, request_cls=request_cls)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import copy
+import pickle
+import unittest
+from konsensus.entities.data_types import Ballot, Proposal
+from konsensus.models.slot_log import BallotLog, SlotLog
+
+PROPOSAL1 = Proposal("cli", 1, "INC")
+PROPOSAL2 = Proposal("cli", 2, "DEC")
+
+
+class SlotLogTestCases(unittest.TestCase):
+    def setUp(self):
+        self.log = SlotLog(chunk_size=4)
+
+    def test_mapping(self):
+        """A slot log behaves like a dict of slots, iterated over in slot order"""
+        for slot in 9, 2, 5:
+            self.log[slot] = slot * 10
+        self.assertEqual(self.log, {2: 20, 5: 50, 9: 90})
+        self.assertEqual(list(self.log), [2, 5, 9])
+        self.assertEqual(len(self.log), 3)
+        self.assertIn(5, self.log)
+        self.assertNotIn(6, self.log)
+        self.assertNotIn(100, self.log)
+        self.assertEqual(self.log.get(6, "none"), "none")
+        self.assertEqual(self.log.last(), 9)
+        del self.log[9]
+        self.assertEqual(self.log.last(), 5)
+        self.assertEqual(self.log.pop(2), 20)
+        self.assertEqual(self.log, {5: 50})
+        with self.assertRaises(KeyError):
+            del self.log[2]
+
+    def test_grows_down(self):
+        """Slots below the first chunk prepend chunks"""
+        self.log[10] = "a"
+        self.log[1] = "b"
+        self.assertEqual(list(self.log.items()), [(1, "b"), (10, "a")])
+
+    def test_range(self):
+        """range iterates over the slots held between two slots"""
+        self.log.update({slot: slot for slot in range(1, 20) if slot % 3})
+        self.assertEqual(list(self.log.range(6, 11)), [(7, 7), (8, 8), (10, 10), (11, 11)])
+        self.assertEqual(list(self.log.range(last=2)), [(1, 1), (2, 2)])
+        self.assertEqual(list(self.log.range(100)), [])
+
+    def test_truncate(self):
+        """truncate drops the slots below a slot"""
+        self.log.update({slot: slot for slot in range(1, 20)})
+        self.log.truncate(10)
+        self.assertEqual(list(self.log), list(range(10, 20)))
+        self.assertEqual(len(self.log), 10)
+        self.assertEqual(len(self.log.chunks), 3)
+        self.log.truncate(5)
+        self.assertEqual(len(self.log), 10)
+        self.log.truncate(30)
+        self.assertEqual(self.log, {})
+
+    def test_copy(self):
+        """Slot logs survive being copied and pickled, as they are in messages"""
+        self.log.update({1: PROPOSAL1, 6: PROPOSAL2})
+        self.assertEqual(copy.deepcopy(self.log), self.log)
+        self.assertEqual(pickle.loads(pickle.dumps(self.log)), self.log)
+
+
+class BallotLogTestCases(unittest.TestCase):
+    def test_ballots(self):
+        """A ballot log holds (ballot, proposal) pairs"""
+        log = BallotLog(chunk_size=4)
+        log[3] = (Ballot(5, 1), PROPOSAL1)
+        log[7] = (Ballot(-1, 0), PROPOSAL2)
+        log[3] = (Ballot(6, 2), PROPOSAL2)
+        self.assertEqual(log, {3: (Ballot(6, 2), PROPOSAL2), 7: (Ballot(-1, 0), PROPOSAL2)})
+        self.assertEqual(pickle.loads(pickle.dumps(log)), log)
+
+
+if __name__ == "__main__":
+    unittest.main()
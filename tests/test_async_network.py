@@ -0,0 +1,53 @@
+import asyncio
+import unittest
+from konsensus.async_network import AsyncNetwork
+from konsensus.entities.messages_types import Join
+
+
+class AsyncNetworkTestCases(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.network = AsyncNetwork(1234)
+        self.network.start()
+        self.network.DROP_PROB = 0.0
+        self.network.PROP_DELAY = 0.001
+        self.network.PROP_JITTER = 0.0
+
+    async def test_timers(self):
+        """Timers fire on the event loop in order of expiry, and cancelled timers do not fire"""
+        fired = []
+        done = self.network.loop.create_future()
+        self.network.set_timer(None, 0.02, lambda: done.set_result(fired))
+        self.network.set_timer(None, 0.01, lambda: fired.append("second"))
+        self.network.set_timer(None, 0.0, lambda: fired.append("first"))
+        self.network.set_timer(None, 0.005, lambda: fired.append("cancelled")).cancel()
+        self.assertEqual(await done, ["first", "second"])
+        self.assertEqual(self.network.pending, {})
+
+    async def test_deliver(self):
+        """Messages are delivered to nodes after the link's delay"""
+        sender = self.network.new_node("S")
+        receiver = self.network.new_node("R")
+        received = self.network.loop.create_future()
+        receiver.receive = lambda sender, message: received.set_result((sender, message, self.network.now))
+        sent_at = self.network.now
+        sender.send(["R"], Join())
+        got_sender, message, at = await received
+        self.assertEqual((got_sender, message), ("S", Join()))
+        self.assertGreaterEqual(at - sent_at, 0.001)
+
+    async def test_run(self):
+        """An AsyncNetwork cannot be run like a Network, as it runs on the event loop"""
+        with self.assertRaises(RuntimeError):
+            self.network.run()
+
+    async def test_stop(self):
+        """Stopping the network cancels the timers that have not fired"""
+        timer = self.network.set_timer(None, 0.01, self.fail)
+        self.network.stop()
+        self.assertEqual(self.network.pending, {})
+        timer.cancel()
+        await asyncio.sleep(0.02)
+
+
+if __name__ == '__main__':
+    unittest.main()
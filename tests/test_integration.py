@@ -2,12 +2,18 @@ from typing import List, Callable, Optional
 import unittest
 import itertools
 import pytest
+from functools import partial
 from konsensus.network import Network
+from konsensus.infra.metrics import Metrics
 from konsensus.models.node import Node
 from konsensus.models.roles.seed import Seed
 from konsensus.models.roles.requester import Requester
 from konsensus.models.roles.bootstrap import Bootstrap
 from konsensus.models.roles.leader import Leader
+from konsensus.models.roles.replica import Replica
+from konsensus.entities.data_types import Reconfigure
+from konsensus.models.router import KeyRangeRouter
+from konsensus.models.sharded_member import ShardedMember
 
 
 class IntegrationTestCases(unittest.TestCase):
@@ -156,6 +162,171 @@ class IntegrationTestCases(unittest.TestCase):
         self.network.run()
         self.assertEqual(set(results), set(range(1, N + 1)))
 
+    def test_partition(self):
+        """Requests made on the majority side of a partition complete, and the minority catches up once it heals"""
+        nodes = self.setup_network(5)
+        results = []
+
+        def request(n):
+            Requester(nodes[4], n, results.append).start()
+
+        self.network.set_timer(None, 2.0, partial(request, 1))
+        self.network.set_timer(None, 3.0, partial(self.network.partition, ["N0", "N1"], ["N2", "N3", "N4"]))
+        for n in range(2, 6):
+            self.network.set_timer(None, n + 2.0, partial(request, n))
+        self.network.set_timer(None, 15.0, self.network.heal)
+        # the minority learns that it is behind from the next decision
+        self.network.set_timer(None, 16.0, partial(request, 6))
+        self.network.set_timer(None, 30.0, self.network.stop)
+        self.network.run()
+        self.assertEqual(sorted(results), [1, 3, 6, 10, 15, 21])
+        states = [role.state for node in nodes for role in node.roles if isinstance(role, Replica)]
+        self.assertEqual(states, [21] * 5)
+
+    def test_isolated_node_rejoins(self):
+        """A node cut off from a healthy leader neither preempts it while isolated nor once it is back"""
+        nodes = self.setup_network(3)
+        results = []
+
+        def leaders():
+            return [role for node in nodes for role in node.roles if isinstance(role, Leader)]
+
+        self.network.set_timer(None, 2.0, lambda: Requester(nodes[0], 1, results.append).start())
+        self.network.set_timer(None, 6.0, partial(self.network.partition, ["N1"], ["N0", "N2"]))
+        # the isolated node's replica times out on its leader and proposes to its own
+        self.network.set_timer(None, 7.0, lambda: Requester(nodes[1], 2, results.append).start())
+        self.network.set_timer(None, 15.0, self.network.heal)
+        self.network.set_timer(None, 25.0, self.network.stop)
+        self.network.run()
+        self.assertEqual(sorted(results), [1, 3])
+        self.assertEqual([leader.node.address for leader in leaders() if leader.active], ["N0"])
+        self.assertEqual([leader.ballot_num.n for leader in leaders()], [0, 0, 0])
+
+    def test_reconfiguration(self):
+        """Nodes added and removed through the log take over the cluster while requests keep completing"""
+        nodes = self.setup_network(3)
+        results = []
+        reconfigured = []
+
+        def add(state, input_):
+            return state + input_, state + input_
+
+        def request(n):
+            Requester(nodes[0], n, results.append).start()
+
+        def reconfigure(peers):
+            Requester(nodes[0], Reconfigure(peers), reconfigured.append).start()
+
+        def join(address, peers):
+            Bootstrap(self.add_node(address), execute_fn=add, peers=peers).start()
+
+        for n in range(1, 31):
+            self.network.set_timer(None, n * 0.5 + 1.0, partial(request, n))
+        grown = ["N0", "N1", "N2", "N3", "N4"]
+        self.network.set_timer(None, 3.0, partial(reconfigure, grown))
+        self.network.set_timer(None, 4.0, partial(join, "N3", grown))
+        self.network.set_timer(None, 4.0, partial(join, "N4", grown))
+        self.network.set_timer(None, 7.0, partial(reconfigure, ["N0", "N3", "N4"]))
+        # once the removal has taken effect, the old nodes are no longer needed for a quorum
+        self.network.set_timer(None, 11.0, lambda: [self.kill(node) for node in nodes[1:3]])
+        self.network.set_timer(None, 30.0, self.network.stop)
+        self.network.run()
+        self.assertEqual(reconfigured, [grown, ["N0", "N3", "N4"]])
+        self.assertEqual(len(results), 30)
+        states = [role.state for node in self.network.nodes.values() for role in node.roles if isinstance(role, Replica)]
+        self.assertEqual(states, [465] * 3)
+
+    def test_learners(self):
+        """Learners follow the decisions and take requests without counting towards quorums"""
+        nodes = self.setup_network(3)
+        learners = [self.add_node("L%d" % n) for n in range(2)]
+        results = []
+
+        def add(state, input_):
+            return state + input_, state + input_
+
+        def request(node, n):
+            Requester(node, n, results.append).start()
+
+        for learner in learners:
+            Bootstrap(learner, execute_fn=add, peers=["N0", "N1", "N2"], learner=True).start()
+        for n in range(1, 11):
+            self.network.set_timer(None, n * 0.5 + 2.0, partial(request, learners[0] if n % 2 else nodes[1], n))
+        # a majority of the three voters is still two, however many learners there are
+        self.network.set_timer(None, 4.0, partial(self.kill, nodes[2]))
+        self.network.set_timer(None, 15.0, self.network.stop)
+        self.network.run()
+        self.assertEqual(len(results), 10)
+        states = [[role.state for role in node.roles if isinstance(role, Replica)] for node in nodes[:2] + learners]
+        self.assertEqual(states, [[55]] * 4)
+        self.assertEqual([[type(role).__name__ for role in learner.roles] for learner in learners], [["Replica"]] * 2)
+        leaders = [role for node in nodes for role in node.roles if isinstance(role, Leader) and role.active]
+        self.assertEqual([sorted(leader.learners) for leader in leaders], [["L0", "L1"]])
+
+    def test_backpressure(self):
+        """A burst of requests beyond a replica's limits is queued or rejected, and every request completes"""
+        self.network = Network(1234, metrics=Metrics())
+        peers = ["N0", "N1", "N2"]
+        nodes = [self.add_node(p) for p in peers]
+        results = []
+
+        def add(state, input_):
+            return state + input_, state + input_
+
+        replica = partial(Replica, max_outstanding=2, max_pending=3)
+        bootstrap = partial(Bootstrap, replica=replica)
+        Seed(nodes[0], initial_state=0, peers=peers, execute_fn=add, bootstrap_cls=bootstrap)
+        for node in nodes[1:]:
+            bootstrap(node, execute_fn=add, peers=peers).start()
+
+        for n in range(1, 11):
+            self.network.set_timer(None, 2.0, Requester(nodes[1], n, results.append).start)
+        self.network.set_timer(None, 20.0, self.network.stop)
+        self.network.run()
+        self.assertEqual(len(results), 10)
+        self.assertEqual(max(results), 55)
+        self.assertGreater(self.network.metrics.snapshot()["counters"]['invokes_rejected{node="N1"}'], 0)
+
+    def test_sharded_requests(self):
+        """Requests to a sharded cluster are decided by the group that owns their key, each with its own leader"""
+
+        def key_value(state, input_):
+            state[input_[0]] = state.get(input_[0], 0) + input_[1]
+            return state, state[input_[0]]
+
+        peers = ["N%d" % n for n in range(3)]
+        router = KeyRangeRouter(["m"], key_fn=lambda input_: input_[0])
+        members = [
+            ShardedMember(key_value, self.network, peer, peers, router, seed={} if peer == "N0" else None)
+            for peer in peers
+        ]
+        for member in members:
+            for startup_role in member.startup_roles:
+                startup_role.start()
+
+        def active_leaders():
+            return sorted(
+                node.address
+                for member in members
+                for node in member.nodes.values()
+                for role in node.roles
+                if isinstance(role, Leader) and role.active
+            )
+
+        # the leader of each group is started on a different member
+        leaders = []
+        self.network.set_timer(None, 4.0, lambda: leaders.extend(active_leaders()))
+
+        results = []
+        for n, key in enumerate("akzq", start=1):
+            for member in members:
+                node = member.nodes[router.route((key, n))]
+                self.network.set_timer(None, 5.0, Requester(node, (key, n), results.append).start)
+
+        self.network.set_timer(None, 15.0, self.network.stop)
+        self.network.run()
+        self.assertEqual(leaders, ["N0/g0", "N1/g1"])
+        self.assertEqual(sorted(results), [1, 2, 2, 3, 3, 4, 4, 6, 6, 8, 9, 12])
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,28 @@
+import random
+import unittest
+from konsensus.links import ExponentialLatency, LogNormalLatency, UniformLatency
+
+
+class LinksTestCases(unittest.TestCase):
+    def setUp(self):
+        self.rnd = random.Random(1234)
+
+    def test_uniform(self):
+        """Uniform latencies stay within the jitter around the delay"""
+        latencies = [UniformLatency(0.03, 0.02)(self.rnd) for _ in range(1000)]
+        self.assertTrue(all(0.01 <= latency <= 0.05 for latency in latencies))
+
+    def test_exponential(self):
+        """Exponential latencies never drop below the minimum and average the minimum plus the mean extra delay"""
+        latencies = [ExponentialLatency(0.01, 0.02)(self.rnd) for _ in range(10000)]
+        self.assertGreaterEqual(min(latencies), 0.01)
+        self.assertAlmostEqual(sum(latencies) / len(latencies), 0.03, places=2)
+
+    def test_lognormal(self):
+        """Log-normal latencies have the given median"""
+        latencies = sorted(LogNormalLatency(0.1, 0.5)(self.rnd) for _ in range(10001))
+        self.assertAlmostEqual(latencies[5000], 0.1, places=2)
+
+
+if __name__ == '__main__':
+    unittest.main()
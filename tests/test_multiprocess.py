@@ -0,0 +1,115 @@
+import unittest
+from konsensus.multiprocess import ProcessCluster, ProcessNetwork, RecordTooLargeError, SharedRing
+from konsensus.entities.messages_types import Invoke
+from konsensus.infra.metrics import Metrics
+
+
+def add(state, input_):
+    state += input_
+    return state, state
+
+
+class SharedRingTestCases(unittest.TestCase):
+    def setUp(self):
+        self.ring = SharedRing(capacity=256)
+
+    def tearDown(self):
+        self.ring.close(unlink=True)
+
+    def test_put_get(self):
+        """Objects come out of a ring in the order they were put in, once"""
+        message = Invoke(caller="N1", client_id=1, input_value=2)
+        self.assertTrue(self.ring.put(("N1", message)))
+        self.assertTrue(self.ring.put(None))
+        self.assertEqual(self.ring.get(), [("N1", message), None])
+        self.assertEqual(self.ring.get(), [])
+
+    def test_full(self):
+        """An object that does not fit is refused until the consumer makes room"""
+        self.assertTrue(self.ring.put(b"x" * 200))
+        self.assertFalse(self.ring.put(b"y" * 200))
+        self.assertEqual(self.ring.get(), [b"x" * 200])
+        self.assertTrue(self.ring.put(b"y" * 200))
+        self.assertEqual(self.ring.get(), [b"y" * 200])
+
+    def test_too_large(self):
+        """An object that could never fit is rejected, even in an empty ring"""
+        with self.assertRaises(RecordTooLargeError):
+            self.ring.put(b"x" * 300)
+        self.assertTrue(self.ring.put(b"x" * 200))
+        self.assertEqual(self.ring.get(), [b"x" * 200])
+
+    def test_wrap_around(self):
+        """Records wrap around the end of the buffer"""
+        for n in range(10):
+            self.assertTrue(self.ring.put(str(n) * 100))
+            self.assertEqual(self.ring.get(), [str(n) * 100])
+
+    def test_attach(self):
+        """A ring attached by name and lock shares the segment"""
+        other = SharedRing(self.ring.shm.name, lock=self.ring.lock)
+        try:
+            other.put("hello")
+            self.assertEqual(self.ring.get(), ["hello"])
+        finally:
+            other.close()
+
+
+class ProcessNetworkTestCases(unittest.TestCase):
+    def setUp(self):
+        self.inbound = SharedRing(capacity=256)
+        self.outbound = SharedRing(capacity=256)
+        self.network = ProcessNetwork(1, {"N1": self.inbound}, {"N1": self.outbound}, metrics=Metrics())
+
+    def tearDown(self):
+        self.inbound.close(unlink=True)
+        self.outbound.close(unlink=True)
+
+    def test_single_node(self):
+        """A process network hosts one node, which receives everything on its inbound rings"""
+        node = self.network.new_node("N0")
+        with self.assertRaises(AssertionError):
+            self.network.new_node("N2")
+        received = []
+        node.receive = lambda sender, message: received.append((sender, message))
+        message = Invoke(caller="N1", client_id=1, input_value=2)
+        self.inbound.put(("N1", message))
+        self.assertTrue(self.network.poll())
+        for timer in self.network.timers:
+            timer.callback()
+        self.assertEqual(received, [("N1", message)])
+
+    def test_send_too_large(self):
+        """A message too large for the ring to its destination is dropped"""
+        node = self.network.new_node("N0")
+        self.network.send(node, ["N1"], Invoke(caller="N0", client_id=1, input_value="x" * 300))
+        self.assertEqual(self.outbound.get(), [])
+        self.assertEqual(self.network.metrics.snapshot()["counters"]['messages_dropped{type="Invoke"}'], 1)
+
+
+class ProcessClusterTestCases(unittest.TestCase):
+    def test_requests(self):
+        """Requests on any node of a cluster of processes are executed in order"""
+        cluster = ProcessCluster(add, ["N0", "N1", "N2"], initial_state=0)
+        cluster.start()
+        try:
+            outputs = [cluster.invoke(n, peer) for n, peer in zip(range(1, 7), ["N0", "N1", "N2"] * 2)]
+        finally:
+            cluster.stop()
+        self.assertEqual(outputs, [1, 3, 6, 10, 15, 21])
+        self.assertEqual([process.exitcode for process in cluster.processes], [0, 0, 0])
+
+    def test_request_too_large(self):
+        """A request too large for the ring to its node raises rather than waiting forever"""
+        cluster = ProcessCluster(add, ["N0", "N1", "N2"], initial_state="", ring_capacity=4096)
+        cluster.start()
+        try:
+            with self.assertRaises(RecordTooLargeError):
+                cluster.invoke("x" * 5000)
+            self.assertEqual(cluster.invoke("y"), "y")
+        finally:
+            cluster.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,13 @@
+import threading
+import time
 import unittest
 import unittest.mock as mock
 from konsensus.network import Network
+from konsensus.infra.metrics import Metrics
+from konsensus.links import UniformLatency
 from konsensus.models.node import Node
 from konsensus.models.roles import Role
-from konsensus.entities.messages_types import Join
+from konsensus.entities.messages_types import Join, Welcome
 
 
 class TestRole(Role):
@@ -55,6 +59,119 @@ class NetworkTestCases(unittest.TestCase):
         self.network.run()
         self.failUnless(cb.called)
 
+    def test_compact_cancelled_timers(self):
+        """Cancelled timers are dropped from the heap once they outnumber live ones"""
+        node = self.network.new_node('K')
+        timers = [self.network.set_timer(node.address, 1, mock.Mock()) for _ in range(100)]
+        for timer in timers[:self.network.COMPACT_THRESHOLD]:
+            timer.cancel()
+        self.assertEqual(len(self.network.timers), 100)
+        timers[self.network.COMPACT_THRESHOLD].cancel()
+        self.assertEqual(len(self.network.timers), 100 - self.network.COMPACT_THRESHOLD - 1)
+        self.assertEqual(self.network.tombstones, 0)
+
+    def test_post_from_thread(self):
+        """Run waits for expected posts from other threads once no timers are left"""
+        cb = mock.Mock()
+        self.network.expect_post()
+        thread = threading.Thread(target=lambda: (time.sleep(0.05), self.network.post(cb)))
+        thread.start()
+        self.network.run()
+        thread.join()
+        cb.assert_called_once_with()
+        self.assertEqual(self.network.expected_posts, 0)
+
+    def test_metrics(self):
+        """Messages sent, dropped and received are counted by type"""
+        self.network = Network(1234, metrics=Metrics())
+        sender = self.network.new_node("S")
+        receiver = self.network.new_node("R")
+        for _ in range(100):
+            sender.send([receiver.address], Join())
+        self.network.run()
+        counters = self.network.metrics.snapshot()["counters"]
+        self.assertEqual(counters['messages_sent{type="Join"}'], 100)
+        self.assertEqual(
+            counters['messages_received{type="Join"}'] + counters['messages_dropped{type="Join"}'], 100)
+        self.assertEqual(self.network.metrics.snapshot()["gauges"], {"timer_heap_size": 0, "timer_tombstone_ratio": 0.0})
+
+    def test_metrics_disabled(self):
+        """Without metrics, sending and receiving messages does not call the registry"""
+        sender = self.network.new_node("S")
+        receiver = self.network.new_node("R")
+        with mock.patch.object(self.network.metrics, "inc") as inc:
+            sender.send([receiver.address], Join())
+            self.network.run()
+        inc.assert_not_called()
+
+
+    def deliveries(self, sender, receiver, count=100):
+        received = []
+        receiver.receive = lambda sender, message: received.append(self.network.now)
+        start = self.network.now
+        for _ in range(count):
+            sender.send([receiver.address], Join())
+        self.network.run()
+        return [time - start for time in received]
+
+    def test_partition(self):
+        """Partitions cut the links between groups until they heal, leaving other links alone"""
+        a, b, c = (self.network.new_node(address) for address in "ABC")
+        self.network.DROP_PROB = 0.0
+        self.network.partition(["A"], ["B"])
+        self.assertEqual(self.deliveries(a, b), [])
+        self.assertEqual(self.deliveries(b, a), [])
+        self.assertEqual(len(self.deliveries(a, c)), 100)
+        self.network.heal()
+        self.assertEqual(len(self.deliveries(a, b)), 100)
+
+    def test_set_link(self):
+        """Links can be given their own loss and latency, in one direction only"""
+        a, b = self.network.new_node("A"), self.network.new_node("B")
+        self.network.set_link("A", "B", drop_prob=1.0)
+        self.assertEqual(self.deliveries(a, b), [])
+        self.assertGreater(len(self.deliveries(b, a)), 0)
+        self.network.set_link("A", "B", drop_prob=0.0, latency=UniformLatency(2.0, 0.0))
+        self.assertEqual(set(self.deliveries(a, b)), {2.0})
+        self.assertEqual(self.network.link("A", "B").drop_prob, 0.0)
+        self.assertIs(self.network.link("A", "B"), self.network.links[("A", "B")])
+
+
+    def test_bandwidth(self):
+        """Messages take size / bandwidth to transmit and queue behind the messages sent before them on the link"""
+        a, b = self.network.new_node("A"), self.network.new_node("B")
+        self.network.message_size = lambda message: 1000
+        self.network.set_link("A", "B", drop_prob=0.0, latency=UniformLatency(0.5, 0.0), bandwidth=1000.0)
+        self.assertEqual([round(d, 6) for d in self.deliveries(a, b, count=3)], [1.5, 2.5, 3.5])
+        self.network.set_link("A", "B", bandwidth=10000.0)
+        self.assertAlmostEqual(self.deliveries(a, b, count=1)[0], 0.6)
+
+    def test_bandwidth_reset(self):
+        """A link's bandwidth is kept when other settings change, and set_link with a bandwidth of None lifts it"""
+        a, b = self.network.new_node("A"), self.network.new_node("B")
+        self.network.message_size = lambda message: 1000
+        self.network.set_link("A", "B", drop_prob=0.0, latency=UniformLatency(0.5, 0.0), bandwidth=1000.0)
+        self.network.set_link("A", "B", latency=UniformLatency(1.0, 0.0))
+        self.assertEqual(self.network.link("A", "B").bandwidth, 1000.0)
+        self.network.set_link("A", "B", bandwidth=None)
+        self.assertIsNone(self.network.link("A", "B").bandwidth)
+        self.assertEqual(self.deliveries(a, b, count=3), [1.0, 1.0, 1.0])
+
+    def test_message_size(self):
+        """Large messages take longer to deliver on links with a bandwidth"""
+        a, b = self.network.new_node("A"), self.network.new_node("B")
+        self.network.set_link("A", "B", drop_prob=0.0, latency=UniformLatency(0.0, 0.0), bandwidth=1e6)
+        (small,) = self.deliveries(a, b, count=1)
+        big = Welcome(state=0, slot=1, decisions={slot: f"{slot:04}" * 250 for slot in range(1000)}, configs=[],
+                      directory=[])
+        received = []
+        b.receive = lambda sender, message: received.append(self.network.now)
+        start = self.network.now
+        a.send(["B"], big)
+        self.network.run()
+        self.assertGreater(received[0] - start, 1.0)
+        self.assertLess(small, 0.001)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,60 @@
+import io
+import unittest
+from functools import partial
+from konsensus.simulation import Simulation
+from konsensus.replay import ReplayNetwork
+from konsensus.infra.trace import Checkpoint, TraceRecorder, iter_trace
+from konsensus.models.roles.replica import Replica
+
+
+def replicas(network):
+    return {
+        address: (role.slot, role.state)
+        for address, node in network.nodes.items()
+        for role in node.roles
+        if isinstance(role, Replica)
+    }
+
+
+class ReplayTestCases(unittest.TestCase):
+    def setUp(self):
+        output = io.BytesIO()
+        self.recorded = Simulation(3, 3, drop_prob=0.1, trace=TraceRecorder(output, checkpoint_interval=2.0))
+        self.recorded.run_requests(40, clients=2)
+        self.events = list(iter_trace(io.BytesIO(output.getvalue())))
+
+    def test_replay(self):
+        """Replaying a trace with the same cluster gives the same results"""
+        replayed = Simulation(3, 3, drop_prob=0.1, network_cls=partial(ReplayNetwork, events=self.events))
+        self.assertEqual(replayed.run_requests(40, clients=2), 40)
+        self.assertEqual(replayed.outputs, self.recorded.outputs)
+        self.assertEqual(replayed.latencies, self.recorded.latencies)
+        self.assertEqual(replicas(replayed.network), replicas(self.recorded.network))
+
+    def test_seek(self):
+        """Seeking restores a checkpoint and replays from there, without building the cluster"""
+        checkpoints = [event.time for event in self.events if isinstance(event, Checkpoint)]
+        self.assertGreater(len(checkpoints), 2)
+        network = ReplayNetwork(3, events=self.events)
+        network.seek(checkpoints[-1] + 0.01)
+        self.assertGreater(network.position, self.events.index(
+            next(event for event in self.events if event.time == checkpoints[-1])))
+        self.assertEqual(network.now, checkpoints[-1] + 0.01)
+        network.run()
+        self.assertEqual(replicas(network), replicas(self.recorded.network))
+
+    def test_seek_same_as_replay(self):
+        """The state reached by seeking is the state reached by replaying from the start"""
+        until = self.events[len(self.events) // 2].time
+        replayed = Simulation(3, 3, drop_prob=0.1, network_cls=partial(ReplayNetwork, events=self.events))
+        replayed.network.set_timer(None, 2.0, replayed.begin)
+        replayed.network.set_timer(None, 3600.0, replayed.network.stop)
+        replayed.count, replayed.clients = 40, 2
+        replayed.network.run(until)
+        network = ReplayNetwork(3, events=self.events)
+        network.seek(until)
+        self.assertEqual(replicas(network), replicas(replayed.network))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+from konsensus.simulation import Simulation, percentile
+from konsensus.models.roles.replica import Replica
+from benchmarks.cluster import compare, run
+
+
+class SimulationTestCases(unittest.TestCase):
+    def test_requests(self):
+        """All requests complete, each adding its input to the total"""
+        simulation = Simulation(1, 3)
+        self.assertEqual(simulation.run_requests(20, clients=2), 20)
+        self.assertEqual(max(simulation.outputs), sum(range(1, 21)))
+        results = simulation.results()
+        self.assertEqual(results["commits"], 20)
+        self.assertGreater(results["commits_per_sim_second"], 0)
+        self.assertLessEqual(results["latency_p50"], results["latency_p99"])
+
+    def test_deterministic(self):
+        """Simulations with the same parameters give the same simulated results"""
+        first, second = Simulation(7, 5, drop_prob=0.1), Simulation(7, 5, drop_prob=0.1)
+        first.run_requests(30, clients=3)
+        second.run_requests(30, clients=3)
+        self.assertEqual(first.latencies, second.latencies)
+        self.assertEqual(first.finished_at, second.finished_at)
+
+    def test_violations(self):
+        """Replicas that disagree on a decision or on the state violate the invariants"""
+        simulation = Simulation(1, 3)
+        simulation.run_requests(5)
+        self.assertEqual(simulation.violations(), [])
+        first, second = [
+            role for node in simulation.nodes[:2] for role in node.roles if isinstance(role, Replica)]
+        slot = min(set(first.decisions) & set(second.decisions))
+        second.decisions[slot] = second.decisions[slot]._replace(input=99)
+        second.slot, second.state = first.slot, first.state + 1
+        self.assertEqual(len(simulation.violations()), 2)
+        simulation.count = 6
+        self.assertIn("only 5 of 6 requests completed", simulation.violations())
+
+    def test_percentile(self):
+        """Percentiles use the nearest rank"""
+        values = list(range(1, 101))
+        self.assertEqual((percentile(values, 50), percentile(values, 99), percentile([3], 99)), (50, 99, 3))
+        self.assertIsNone(percentile([], 50))
+
+
+class BenchmarkTestCases(unittest.TestCase):
+    def test_run(self):
+        """A benchmark run reports its parameters and results"""
+        result = run(1, 3, 0.0, 0.03, requests=10, clients=1, memory=True)
+        self.assertEqual((result["size"], result["commits"]), (3, 10))
+        self.assertIn("bytes_per_10k_commits", result)
+
+    def test_compare(self):
+        """Runs whose wall-clock throughput dropped beyond the tolerance fail the comparison"""
+        baseline = [run(1, 3, 0.0, 0.03, requests=10, clients=1)]
+        slower = dict(baseline[0], commits_per_wall_second=baseline[0]["commits_per_wall_second"] / 2)
+        self.assertTrue(compare(baseline, baseline, 0.2))
+        self.assertFalse(compare([slower], baseline, 0.2))
+
+    def test_compare_empty_baseline(self):
+        """A baseline run without commits has no throughput ratio and does not fail the comparison"""
+        results = [run(1, 3, 0.0, 0.03, requests=10, clients=1)]
+        empty = [dict(results[0], commits=0, commits_per_wall_second=0.0)]
+        self.assertTrue(compare(results, empty, 0.2))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+from konsensus.sweep import aggregate, grid, run, sweep
+
+
+def failing_run(params):
+    return dict(params, violations=["slot 1 decided twice"] if params["seed"] == 0 else [])
+
+
+class SweepTestCases(unittest.TestCase):
+    def test_grid(self):
+        """Grids hold every combination of a seed and the values of each axis"""
+        self.assertEqual(grid(range(2), size=[3, 5]), [
+            {"seed": 0, "size": 3}, {"seed": 0, "size": 5}, {"seed": 1, "size": 3}, {"seed": 1, "size": 5},
+        ])
+
+    def test_run(self):
+        """A run reports its parameters, results and violations"""
+        summary = run({"seed": 1, "size": 3, "drop_prob": 0.1, "requests": 10})
+        self.assertEqual((summary["seed"], summary["commits"], summary["violations"]), (1, 10, []))
+
+    def test_sweep(self):
+        """Runs are spread over worker processes and summarized per configuration"""
+        summaries = list(sweep(grid(range(4), size=[3], requests=[5]), workers=2))
+        self.assertEqual(sorted(s["seed"] for s in summaries), [0, 1, 2, 3])
+        (result,) = aggregate(summaries)
+        self.assertEqual((result["size"], result["runs"], result["failed"]), (3, 4, 0))
+        distribution = result["latency_p99"]
+        self.assertLessEqual(distribution["min"], distribution["p50"])
+        self.assertLessEqual(distribution["p99"], distribution["max"])
+
+    def test_stop_on_violation(self):
+        """The sweep stops at the first run with violations, unless told to keep going"""
+        summaries = list(sweep(grid(range(50)), workers=1, run_fn=failing_run))
+        self.assertEqual(summaries[-1]["violations"], ["slot 1 decided twice"])
+        self.assertLess(len(summaries), 50)
+        summaries = list(sweep(grid(range(50)), workers=1, stop_on_violation=False, run_fn=failing_run))
+        self.assertEqual(len(summaries), 50)
+
+
+if __name__ == '__main__':
+    unittest.main()